@@ -1,3 +1,4 @@
+from .item_batch import ItemBatch
 from .itembase import Edge, ItemBase  # noqa: F405, type: ignore
 from .schema import *  # noqa: F405, type: ignore
 from .schema import get_schema_cls
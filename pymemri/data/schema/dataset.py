@@ -25,7 +25,7 @@ class Dataset(Dataset):
             raise ValueError("Dataset does not have associated PodClient.")
         if not len(self.entry):
             for e in self._client.get_edges(self.id):
-                self.add_edge(e["name"], e["item"])
+                self._add_synced_edge(e["name"], e["item"])
 
         return self.entry
 
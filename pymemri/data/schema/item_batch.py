@@ -0,0 +1,299 @@
+import sys
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+
+from .itembase import ItemBase, _parse_pod_datetime
+
+T = TypeVar("T", bound=ItemBase)
+
+# numpy dtype of each property type, text properties are stored in lists
+COLUMN_DTYPES: Dict[type, Any] = {
+    bool: np.bool_,
+    int: np.int64,
+    float: np.float64,
+    datetime: "datetime64[ms]",
+}
+
+Column = Union[np.ndarray, List[Optional[str]]]
+
+
+def _timestamp(value: Any) -> int:
+    """Converts a datetime, Pod timestamp or datetime string to a Pod timestamp"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[ms]").astype(np.int64))
+    if not isinstance(value, datetime):
+        value = _parse_pod_datetime(value)
+    return ItemBase._datetime_to_timestamp(value)
+
+
+def _to_column(
+    name: str, type_: type, values: Sequence[Any]
+) -> Tuple[Column, Optional[np.ndarray]]:
+    """Returns the column for `values` of a property, and the mask of rows that are None."""
+    if type_ is str:
+        # Ids are unique, all other text is interned to share repeated values
+        if name == "id":
+            return list(values), None
+        return [v if v is None else sys.intern(v) for v in values], None
+
+    dtype = COLUMN_DTYPES[type_]
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(dtype, copy=False), None
+    missing = np.fromiter((v is None for v in values), dtype=np.bool_, count=len(values))
+    if type_ is datetime:
+        values = [0 if v is None else _timestamp(v) for v in values]
+        column = np.array(values, dtype=np.int64).astype(dtype)
+    else:
+        column = np.array([0 if v is None else v for v in values], dtype=dtype)
+    return column, missing if missing.any() else None
+
+
+class ItemBatch(Generic[T]):
+    """
+    The properties and edges of many items of `item_cls`, stored as columns instead of items.
+
+    Bool, int, float and datetime properties are numpy arrays, `missing` masks the rows where
+    they are None. Datetimes are stored with millisecond precision, in UTC. Text properties are
+    lists of interned strings. Properties that are None for all items have no column.
+    Edges are stored per edge name, as an array of source rows and an array of target ids.
+    `new_ids` masks the rows that got a new id in `from_columns`, if any.
+
+    Batches are written with `PodClient.bulk_action` and returned by `PodClient.search`
+    with `batch=True`, without creating items. Use `to_items` to create the items.
+    """
+
+    def __init__(
+        self,
+        item_cls: Type[T],
+        columns: Dict[str, Column],
+        missing: Optional[Dict[str, np.ndarray]] = None,
+        edges: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        new_ids: Optional[np.ndarray] = None,
+    ) -> None:
+        """Creates a batch from columns in the format above, see `from_columns`."""
+        self.item_cls = item_cls
+        self.columns = columns
+        self.missing = missing if missing is not None else {}
+        self.edges = edges if edges is not None else {}
+        self.new_ids = new_ids
+
+    @classmethod
+    def from_columns(
+        cls,
+        item_cls: Type[T],
+        ids: Optional[Sequence[Optional[str]]] = None,
+        **properties: Sequence[Any],
+    ) -> "ItemBatch[T]":
+        """
+        Creates a batch from a sequence of values per property, with None for missing values.
+        Datetimes can be datetimes, numpy datetimes or Pod timestamps.
+
+        Rows without id get a new id.
+        """
+        n = len(ids) if ids is not None else len(next(iter(properties.values()), []))
+        ids = ids if ids is not None else [None] * n
+        new_ids = np.fromiter((id is None for id in ids), dtype=np.bool_, count=n)
+        properties["id"] = [id if id is not None else ItemBase.create_id() for id in ids]
+
+        property_fields = item_cls.__property_fields__
+        columns = {}
+        missing = {}
+        for name, values in properties.items():
+            if name not in property_fields:
+                raise ValueError(f"{name} is not a property of {item_cls.__name__}")
+            if len(values) != n:
+                raise ValueError(f"Column {name} has {len(values)} values, expected {n}")
+            column, column_missing = _to_column(name, property_fields[name].type_, values)
+            if column_missing is not None and column_missing.all():
+                continue
+            if isinstance(column, list) and all(v is None for v in column):
+                continue
+            columns[name] = column
+            if column_missing is not None:
+                missing[name] = column_missing
+        return cls(item_cls, columns, missing, new_ids=new_ids if new_ids.any() else None)
+
+    @classmethod
+    def from_items(cls, items: Sequence[T], item_cls: Optional[Type[T]] = None) -> "ItemBatch[T]":
+        """
+        Creates a batch from `items` of `item_cls`, and their edges.
+
+        Items and edge targets without id get a new id, as in `PodClient.add_to_store`.
+        """
+        item_cls = item_cls or (type(items[0]) if len(items) else None)
+        if item_cls is None:
+            raise ValueError("Cannot infer the item class of an empty batch")
+        for item in items:
+            if not isinstance(item, item_cls):
+                raise ValueError(f"{item} is not a {item_cls.__name__}")
+            item.create_id_if_not_exists()
+
+        properties = {
+            name: [item.__dict__.get(name) for item in items]
+            for name in item_cls.__property_fields__
+        }
+        batch = cls.from_columns(item_cls, ids=properties.pop("id"), **properties)
+
+        for name in item_cls.__edge_fields__:
+            rows, target_ids = [], []
+            for row, item in enumerate(items):
+                for edge in item.__edges__[name]:
+                    edge.target.create_id_if_not_exists()
+                    rows.append(row)
+                    target_ids.append(edge.target.id)
+            if rows:
+                batch.add_edges(name, rows, target_ids)
+        return batch
+
+    @classmethod
+    def from_json(cls, item_cls: Type[T], data: Sequence[Dict[str, Any]]) -> "ItemBatch[T]":
+        """
+        Creates a batch from Pod JSON of items of `item_cls`, as returned by `/search` or
+        GraphQL. Only the ids of edge targets are kept.
+        """
+        type_name = item_cls.__name__
+        for item_json in data:
+            if item_json.get("type", type_name) != type_name:
+                raise ValueError(f"Cannot add a {item_json['type']} to a batch of {type_name}")
+
+        properties = {
+            name: [item_json.get(name) for item_json in data]
+            for name in item_cls.__property_fields__
+        }
+        batch = cls.from_columns(item_cls, ids=properties.pop("id"), **properties)
+
+        edges: Dict[str, Tuple[List[int], List[str]]] = {}
+        for row, item_json in enumerate(data):
+            # Edges of /search results, and of GraphQL results
+            if "[[edges]]" in item_json:
+                targets = [(e["_edge"], e["_item"]) for e in item_json["[[edges]]"]]
+            else:
+                targets = [
+                    (name, target)
+                    for name in item_cls.__edge_fields__
+                    for target in item_json.get(name) or []
+                ]
+            for name, target in targets:
+                if name in item_cls.__edge_fields__ and "id" in target:
+                    rows, target_ids = edges.setdefault(name, ([], []))
+                    rows.append(row)
+                    target_ids.append(target["id"])
+        for name, (rows, target_ids) in edges.items():
+            batch.add_edges(name, rows, target_ids)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}[{self.item_cls.__name__}]({len(self)} items)"
+
+    @property
+    def ids(self) -> List[str]:
+        return self.columns["id"]
+
+    @property
+    def n_edges(self) -> int:
+        return sum(len(rows) for rows, _ in self.edges.values())
+
+    def add_edges(self, name: str, rows: Sequence[int], target_ids: Sequence[str]) -> None:
+        """Adds edges with name `name` from the items in `rows` to the items with `target_ids`."""
+        if name not in self.item_cls.__edge_fields__:
+            raise ValueError(f"{name} is not an edge on {self.item_cls.__name__}")
+        if len(rows) != len(target_ids):
+            raise ValueError("rows and target_ids should have the same length")
+        rows = np.asarray(rows, dtype=np.int64)
+        target_ids = np.array(target_ids, dtype=object)
+        if name in self.edges:
+            prev_rows, prev_target_ids = self.edges[name]
+            rows = np.concatenate([prev_rows, rows])
+            target_ids = np.concatenate([prev_target_ids, target_ids])
+        self.edges[name] = (rows, target_ids)
+
+    def replace_ids(self, ids: Mapping[str, str]) -> None:
+        """Replaces the ids of items and of edge targets that are in `ids` (old id -> new id)."""
+        self.columns["id"] = [ids.get(id, id) for id in self.ids]
+        for name, (rows, target_ids) in self.edges.items():
+            target_ids = np.array([ids.get(id, id) for id in target_ids.tolist()], dtype=object)
+            self.edges[name] = (rows, target_ids)
+
+    def edge_targets(self, name: str) -> List[List[str]]:
+        """Returns the target ids of the edges with name `name`, for every row."""
+        targets: List[List[str]] = [[] for _ in range(len(self))]
+        if name in self.edges:
+            rows, target_ids = self.edges[name]
+            for row, target_id in zip(rows.tolist(), target_ids.tolist()):
+                targets[row].append(target_id)
+        return targets
+
+    def _column_values(self, name: str, datetime_to_timestamp: bool) -> List[Any]:
+        column = self.columns.get(name)
+        if column is None:
+            return [None] * len(self)
+        if isinstance(column, list):
+            return list(column)
+
+        if column.dtype.kind == "M":
+            values = column.astype(np.int64).tolist()
+            if not datetime_to_timestamp:
+                values = [datetime.fromtimestamp(v / 1000, tz=timezone.utc) for v in values]
+        else:
+            values = column.tolist()
+        if name in self.missing:
+            for row in np.flatnonzero(self.missing[name]).tolist():
+                values[row] = None
+        return values
+
+    def values(self, name: str) -> List[Any]:
+        """Returns the values of property `name` as they are on the items, None if missing."""
+        return self._column_values(name, datetime_to_timestamp=False)
+
+    def iter_json(self) -> Iterator[Dict[str, Any]]:
+        """Yields the JSON of every item in the Pod format, see `ItemBase.to_json`."""
+        names = list(self.columns)
+        columns = [self._column_values(name, datetime_to_timestamp=True) for name in names]
+        type_name = self.item_cls.__name__
+        for row_values in zip(*columns):
+            item_json = {name: v for name, v in zip(names, row_values) if v is not None}
+            item_json["type"] = type_name
+            yield item_json
+
+    def iter_edge_json(self) -> Iterator[Dict[str, str]]:
+        """Yields the JSON of every edge in the format of the Pod `bulk` endpoint."""
+        ids = self.ids
+        for name, (rows, target_ids) in self.edges.items():
+            for row, target_id in zip(rows.tolist(), target_ids.tolist()):
+                yield {"_source": ids[row], "_target": target_id, "_name": name}
+
+    def to_items(self, targets: Optional[Mapping[str, ItemBase]] = None) -> List[T]:
+        """
+        Creates the items in this batch, without validation, see `ItemBase.from_pod_json`.
+
+        Edges are added to the targets in `targets` (id -> item), edges to other targets
+        are skipped. Items and edges are in sync with the Pod, as in search results.
+        """
+        items = [self.item_cls.from_pod_json(item_json) for item_json in self.iter_json()]
+        if targets:
+            for name, (rows, target_ids) in self.edges.items():
+                for row, target_id in zip(rows.tolist(), target_ids.tolist()):
+                    target = targets.get(target_id)
+                    if target is not None:
+                        items[row]._add_synced_edge(name, target)
+        return items
@@ -1,7 +1,10 @@
 import sys
+import time
 import uuid
+import weakref
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from types import MemberDescriptorType
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -9,6 +12,8 @@ from typing import (
     Dict,
     Generic,
     List,
+    Optional,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -16,9 +21,10 @@ from typing import (
     no_type_check,
 )
 
-from pydantic import BaseModel, Extra, PrivateAttr, validator
+from pydantic import BaseModel, Extra, PrivateAttr, ValidationError, create_model
+from pydantic.datetime_parse import parse_datetime
+from pydantic.error_wrappers import ErrorWrapper
 from pydantic.fields import Field, FieldInfo, ModelField
-from pydantic.generics import GenericModel
 from pydantic.main import ModelMetaclass
 from typing_extensions import dataclass_transform
 
@@ -26,6 +32,7 @@ from .utils import get_args, get_origin, type_or_union_to_tuple, type_to_str
 
 if TYPE_CHECKING:
     from ...pod.client import PodClient
+    from ...pod.db import DB
 
 SOURCE, TARGET, TYPE, EDGE_TYPE, LABEL, SEQUENCE, ALL_EDGES = (
     "_source",
@@ -65,6 +72,71 @@ def _field_is_edge(field: ModelField) -> bool:
         return False
 
 
+def _parse_pod_datetime(value: Any) -> datetime:
+    if isinstance(value, (int, float)):
+        # Pod timestamps are in milliseconds
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    return parse_datetime(value)
+
+
+def _parse_pod_float(value: Any) -> float:
+    return float(value)
+
+
+def _pod_parsers(property_fields: Dict[str, ModelField]) -> Dict[str, Any]:
+    """Conversions from Pod JSON values for `ItemBase.from_pod_json`, by property name"""
+    parsers = {}
+    for name, field in property_fields.items():
+        if field.type_ is datetime:
+            parsers[name] = _parse_pod_datetime
+        elif field.type_ is float:
+            parsers[name] = _parse_pod_float
+    return parsers
+
+
+def _pod_defaults(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, Any]]]:
+    """
+    Returns the default values of model fields or private attributes that can be shared between
+    items, and (name, factory) of the defaults that have to be created for every item.
+    """
+    shared = {}
+    factories = []
+    for name, field in fields.items():
+        if field.default_factory is not None:
+            factories.append((name, field.default_factory))
+        elif isinstance(field.default, (type(None), bool, int, float, str, datetime)):
+            shared[name] = field.default
+        elif field.default == [] or field.default == {}:
+            factories.append((name, type(field.default)))
+        else:
+            factories.append((name, field.get_default))
+    return shared, factories
+
+
+class _EdgeDescriptor:
+    """
+    Returns the targets of the edges with name `name` of an item.
+
+    Installed on item classes for each edge field by `_ItemMeta`, such that edge access does
+    not go through `__getattribute__`. On the class it returns None, as pydantic checks
+    inherited field names are not set on the base classes.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Optional["ItemBase"], owner: Any = None) -> Any:
+        if obj is None:
+            return None
+        return [edge.traverse(obj) for edge in obj.__dict__["__edges__"][self.name]]
+
+    def __set__(self, obj: "ItemBase", value: Any) -> None:
+        # Only reached via object.__setattr__, BaseModel.__setattr__ writes __dict__ directly
+        obj.__dict__[self.name] = value
+
+
 # @dataclass_transform(kw_only_default=True, field_descriptors=(Field, FieldInfo))
 # class _EdgeMeta(ModelMetaclass):
 #     def __call__(cls, *args: Any, **kwds: Any) -> Any:
@@ -95,9 +167,11 @@ class _ItemMeta(ModelMetaclass):
     _itembase_private_attrs = {
         "_in_pod": PrivateAttr(False),
         "__edges__": PrivateAttr(default_factory=dict),
+        "_edge_keys": PrivateAttr(default_factory=set),
         "_new_edges": PrivateAttr(default_factory=list),
         "_date_local_modified": PrivateAttr(default_factory=dict),
         "_original_properties": PrivateAttr(default_factory=dict),
+        "_db": PrivateAttr(None),
     }
 
     @no_type_check  # noqa C901
@@ -110,41 +184,107 @@ class _ItemMeta(ModelMetaclass):
         cls.properties = list(cls.__property_fields__.keys())
         cls.edges = list(cls.__edge_fields__.keys())
 
+        for edge_name in cls.__edge_fields__:
+            setattr(cls, edge_name, _EdgeDescriptor(edge_name))
+        # Properties are set without BaseModel.__setattr__, unless assignments are checked
+        config = cls.__config__
+        cls.__assign_directly__ = (
+            config.allow_mutation and not config.frozen and not config.validate_assignment
+        )
+
+        # Used by `ItemBase.from_pod_json`
+        cls.__pod_parsers__ = _pod_parsers(cls.__property_fields__)
+        cls.__pod_defaults__ = _pod_defaults(cls.__fields__)
+
         # Add private instance attributes from _itembase_private_attrs
         cls.__private_attributes__ = {
             **cls.__private_attributes__,
             **mcs._itembase_private_attrs,
         }
         cls.__slots__ = cls.__slots__ | mcs._itembase_private_attrs.keys()
+        # Private attributes are stored in __dict__, unless pydantic created a slot for them
+        cls.__pod_private_defaults__ = _pod_defaults(cls.__private_attributes__)
+        cls.__pod_private_slots__ = [
+            name
+            for name in cls.__private_attributes__
+            if isinstance(getattr(cls, name, None), MemberDescriptorType)
+        ]
         return cls
 
 
 TargetType = TypeVar("TargetType", bound="ItemBase")
 
+# Model of the ValidationErrors raised by Edge
+_EdgeModel = create_model("Edge")
 
-class Edge(GenericModel, Generic[TargetType], smart_union=True, copy_on_model_validation=False):
-    source: "ItemBase"
-    target: TargetType
-    name: str
+
+class Edge(Generic[TargetType]):
+    """
+    Edge with name `name` from item `source` to item `target`.
+
+    `Edge[T]` only accepts targets of type `T`, or one of the types of `Union[...]`. Targets are
+    checked with `isinstance`, which is done once per target class.
+    """
+
+    __slots__ = ("source", "target", "name")
+
+    # Set on the classes created by Edge[T]
+    __target_type__: ClassVar[Any] = None
+    __valid_target_types__: ClassVar[Set[type]] = set()
+    __parametrized__: ClassVar[Dict[Any, Type["Edge"]]] = {}
 
     def __init__(self, source: Any = None, target: TargetType = None, name: str = None) -> None:
-        super().__init__(source=source, target=target, name=name)
-        # Workaround, occasionally validators will set source or target with a clone
+        cls = type(self)
+        errors = []
+        if not isinstance(source, ItemBase):
+            errors.append(ErrorWrapper(TypeError("source is not an item"), loc="source"))
+        if type(target) not in cls.__valid_target_types__:
+            try:
+                cls.validate_target(target)
+                cls.__valid_target_types__.add(type(target))
+            except (TypeError, ValueError) as e:
+                errors.append(ErrorWrapper(e, loc="target"))
+        if not isinstance(name, str):
+            errors.append(ErrorWrapper(TypeError("name is not a str"), loc="name"))
+        if errors:
+            raise ValidationError(errors, _EdgeModel)
+
         self.source = source
         self.target = target
+        self.name = name
+
+    def __class_getitem__(cls, target_type: Any) -> Type["Edge"]:
+        if cls.__target_type__ is not None:
+            raise TypeError(f"{cls.__name__} is already parametrized")
+        edge_cls = cls.__parametrized__.get(target_type)
+        if edge_cls is None:
+            type_names = ", ".join(
+                type_to_str(t) or str(t) for t in type_or_union_to_tuple(target_type)
+            )
+            edge_cls = type(
+                f"{cls.__name__}[{type_names}]",
+                (cls,),
+                {
+                    "__slots__": (),
+                    "__module__": cls.__module__,
+                    "__target_type__": target_type,
+                    "__valid_target_types__": set(),
+                },
+            )
+            cls.__parametrized__[target_type] = edge_cls
+        return edge_cls
 
     @classmethod
     def get_target_types(cls) -> Tuple[type]:
-        target_annotation = cls.__annotations__["target"]
-        if target_annotation == TargetType:
+        if cls.__target_type__ is None:
             return tuple()
-        return type_or_union_to_tuple(target_annotation)
+        return type_or_union_to_tuple(cls.__target_type__)
 
     @classmethod
     def get_target_types_as_str(cls) -> Tuple[str]:
         return tuple(type_to_str(t) for t in cls.get_target_types())
 
-    @validator("target", pre=True, allow_reuse=True)
+    @classmethod
     def validate_target(cls, val: Any) -> TargetType:
         """
         To allow for overwriting schema classes on a different place, validator
@@ -152,13 +292,15 @@ class Edge(GenericModel, Generic[TargetType], smart_union=True, copy_on_model_va
 
         i.e. `Edge[schema.MyItem](target=plugin.MyItem(), ...)` is allowed.
         """
+        if not isinstance(val, ItemBase):
+            raise TypeError("target is not an item")
         target_types = cls.get_target_types()
         if len(target_types) == 0:
             # cls has no target type annotations, validator always succeeds
             return val
         if isinstance(val, target_types):
             return val
-        ttype_display = cls.__fields__["target"]._type_display()
+        ttype_display = " | ".join(cls.get_target_types_as_str())
         raise ValueError(f"target with type `{type(val).__name__}` is not a `{ttype_display}`")
 
     def __eq__(self, other):
@@ -174,8 +316,21 @@ class Edge(GenericModel, Generic[TargetType], smart_union=True, copy_on_model_va
             return True
         return False
 
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(source={self.source!r}, target={self.target!r}, "
+            f"name={self.name!r})"
+        )
+
     def traverse(self, start: Any) -> Any:
-        if start == self.source:
+        # Compare by reference first, comparing items by value is slow
+        if start is self.source:
+            return self.target
+        elif start is self.target:
+            return self.source
+        elif start == self.source:
             return self.target
         elif start == self.target:
             return self.source
@@ -207,10 +362,14 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
         if TYPE_CHECKING:
             # instance variables populated by the metaclass, defined here to help IDEs only
             self.__edges__: Dict[str, List[Edge[Any]]] = {}
+            # (edge name, id(target)) of all edges in __edges__
+            self._edge_keys: Set[Tuple[str, int]] = set()
             self._in_pod: bool = True
             self._new_edges: List[str] = []
-            self._date_local_modified: Dict[str, datetime] = {}
+            self._date_local_modified: Dict[str, float] = {}
             self._original_properties: Dict[str, PodType] = {}
+            # Weak reference to the local DB that holds self
+            self._db: Optional[weakref.ref] = None
 
         # Edges are added after super().__init__
         edge_data = {}
@@ -222,6 +381,7 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
 
     def _init_edges(self, **data: Dict[str, List["ItemBase"]]) -> None:
         self.__edges__ = {k: list() for k in self.__edge_fields__.keys()}
+        self._edge_keys = set()
         for edge_name, edge_targets in data.items():
             if edge_targets is not None:
                 for edge_target in edge_targets:
@@ -229,12 +389,29 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
         self._new_edges = []
 
     def __setattr__(self, name: str, value: Any) -> None:
-        prev_val = getattr(self, name, None)
-        super().__setattr__(name, value)
-        if name in self.__property_fields__ and value != prev_val:
-            self._date_local_modified[name] = datetime.now(timezone.utc)
+        if name not in self.__property_fields__:
+            return super().__setattr__(name, value)
+        values = self.__dict__
+        prev_val = values.get(name)
+        if self.__assign_directly__:
+            values[name] = value
+            self.__fields_set__.add(name)
+        else:
+            super().__setattr__(name, value)
+        if value != prev_val:
+            self._update_index(name, prev_val, value)
+            # Timestamps are only converted to datetime when read, see `_local_modified_time`
+            self._date_local_modified[name] = time.time()
             if name not in self._original_properties:
                 self._original_properties[name] = prev_val
+                self._update_dirty()
+
+    def _set_synced_property(self, name: str, value: Any) -> None:
+        """Set a property to a value that is already in the Pod, without marking it as updated."""
+        prev_val = self.__dict__.get(name)
+        super().__setattr__(name, value)
+        if value != prev_val:
+            self._update_index(name, prev_val, value)
 
     def get_edges(self, name: str) -> List[Edge]:
         return self.__edges__[name]
@@ -242,12 +419,6 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
     def get_all_edges(self) -> List[Edge]:
         return [edge for edge_list in self.__edges__.values() for edge in edge_list]
 
-    def __getattribute__(self, __name: str) -> Any:
-        edge_fields = super().__getattribute__("__edge_fields__")
-        if __name in edge_fields:
-            return [e.traverse(self) for e in super().__getattribute__("__edges__")[__name]]
-        return super().__getattribute__(__name)
-
     def add_edge(self, edge_name: str, target: "ItemBase") -> Edge:
         """Add a new edge between `self` and `target` with name `edge_name`
 
@@ -261,22 +432,41 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
         field = self.__edge_fields__.get(edge_name, None)
         if field is not None:
             edge = Edge[field.type_](name=edge_name, source=self, target=target)
-            existing_edges = self.__edges__[field.name]
-            if edge not in existing_edges:
-                existing_edges.append(edge)
+            if self._add_edge_record(edge):
                 self._new_edges.append(edge)
+                self._update_dirty()
             return edge
         else:
             raise ValueError(f"{edge_name} is not an edge on {type(self).__name__}")
 
+    def _add_synced_edge(self, edge_name: str, target: "ItemBase") -> Edge:
+        """Add an edge that already exists in the Pod, it is not created on sync."""
+        edge = self.add_edge(edge_name, target)
+        if len(self._new_edges) and self._new_edges[-1] is edge:
+            self._new_edges.pop()
+            self._update_dirty()
+        return edge
+
+    def _add_edge_record(self, edge: Edge) -> bool:
+        """Adds `edge` to the edges of self, returns False if self already has the edge."""
+        key = (edge.name, id(edge.target))
+        if key in self._edge_keys:
+            return False
+        self._edge_keys.add(key)
+        self.__edges__[edge.name].append(edge)
+        return True
+
     def remove_edge(self, edge_name: str, target: "ItemBase"):
         field = self.__edge_fields__.get(edge_name, None)
         if field is not None:
             edge = Edge[field.type_](name=edge_name, source=self, target=target)
-            existing_edges = self.__edges__[field.name]
-            if edge in existing_edges:
-                existing_edges.remove(edge)
+            key = (edge_name, id(target))
+            if key in self._edge_keys:
+                self._edge_keys.remove(key)
+                self.__edges__[edge_name].remove(edge)
+            if edge in self._new_edges:
                 self._new_edges.remove(edge)
+                self._update_dirty()
             return True
         else:
             raise ValueError(f"{edge_name} is not an edge on {type(self).__name__}")
@@ -301,6 +491,13 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
 
         return ItemSchema(cls.__name__, properties, edges)
 
+    def _local_modified_time(self, name: str) -> Optional[datetime]:
+        """Time at which property `name` was last modified locally, None if it is in sync."""
+        timestamp = self._date_local_modified.get(name, None)
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
     @property
     def _updated_properties(self):
         return set(self._original_properties.keys())
@@ -312,6 +509,40 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
         self._original_properties = dict()
         self._date_local_modified = dict()
         self._in_pod = True
+        self._update_dirty()
+
+    @property
+    def _is_dirty(self) -> bool:
+        """True if self has local changes that are not in the Pod yet."""
+        return not self._in_pod or bool(self._original_properties) or bool(self._new_edges)
+
+    def _local_db(self) -> Optional["DB"]:
+        """The local DB that holds self, if any."""
+        return self._db() if self._db is not None else None
+
+    def _update_dirty(self) -> None:
+        db = self._local_db()
+        if db is not None:
+            db.update_dirty(self)
+
+    def _update_index(self, name: str, prev_val: Any, value: Any) -> None:
+        db = self._local_db()
+        if db is not None:
+            db.update_index(self, name, prev_val, value)
+
+    def copy(self, **kwargs: Any) -> "ItemBase":
+        """Copies self, see `BaseModel.copy`. The copy is not in the local DB of self."""
+        item = super().copy(**kwargs)
+        object.__setattr__(item, "_db", None)
+        return item
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The local DB is not pickled with its items
+        state = super().__getstate__()
+        # Private attributes are stored in __dict__, see `_ItemMeta`
+        state["__dict__"] = {**state["__dict__"], "_db": None}
+        state["__private_attribute_values__"]["_db"] = None
+        return state
 
     @staticmethod
     def create_id() -> str:
@@ -383,14 +614,19 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
                 res[k] = self._datetime_to_timestamp(v)
         return res
 
-    def to_json(self) -> Dict[str, PodType]:
+    def to_json(self, datetime_to_timestamp: bool = True) -> Dict[str, PodType]:
         """Returns dict of property values along with the type of self.
         This is the format as expected by the Pod.
 
+        Args:
+            datetime_to_timestamp (bool, optional): convert datetime values to timestamp in
+                milliseconds. Set to False if the dict is encoded by a `JSONCodec`,
+                which encodes datetime values as timestamps. Defaults to True.
+
         Returns:
             Dict[str, PodType]: Dictionary of all property values
         """
-        res = self.property_dict()
+        res = self.property_dict(datetime_to_timestamp=datetime_to_timestamp)
         res["type"] = type(self).__name__
         return res
 
@@ -404,9 +640,43 @@ class ItemBase(BaseModel, metaclass=_ItemMeta, extra=Extra.forbid):
         cls: Type[ItemType], json: Dict[str, Any], properties_only: bool = True
     ) -> ItemType:
         if properties_only:
-            json = {k: v for k, v in json.items() if k in cls.properties}
+            json = {k: v for k, v in json.items() if k in cls.__property_fields__}
         return cls(**json)
 
+    @classmethod
+    def from_pod_json(cls: Type[ItemType], json: Dict[str, Any]) -> ItemType:
+        """
+        Creates an item from JSON returned by the Pod, without validation.
+
+        Pod timestamps are converted to datetimes, other values are set as they are, and keys
+        that are not properties are ignored. The item is in sync with the Pod and has no edges.
+        Only use this for trusted data, use `from_json` to validate the data.
+        """
+        property_fields = cls.__property_fields__
+        parsers = cls.__pod_parsers__
+        shared, factories = cls.__pod_defaults__
+        private_shared, private_factories = cls.__pod_private_defaults__
+        values = {**shared, **private_shared}
+        for name, factory in factories:
+            values[name] = factory()
+        for name, factory in private_factories:
+            values[name] = factory()
+        values["__edges__"] = {k: [] for k in cls.__edge_fields__}
+        values["_in_pod"] = True
+        fields_set = set()
+        for k, v in json.items():
+            if k in property_fields:
+                if v is not None and k in parsers:
+                    v = parsers[k](v)
+                values[k] = v
+                fields_set.add(k)
+
+        item = cls.__new__(cls)
+        object.__setattr__(item, "__dict__", values)
+        object.__setattr__(item, "__fields_set__", fields_set)
+        for name in cls.__pod_private_slots__:
+            object.__setattr__(item, name, values.pop(name))
+        return item
+
 
-Edge.update_forward_refs()
 ItemBase.update_forward_refs()
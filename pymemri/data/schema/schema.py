@@ -34,9 +34,9 @@ def get_schema_cls(cls_name: str, extra: Optional[Dict[str, type]] = None) -> ty
     if extra and cls_name in extra:
         return extra[cls_name]
 
-    pymemri_schema = get_schema()
-    if cls_name in pymemri_schema:
-        return pymemri_schema[cls_name]
+    schema_cls = globals().get(cls_name)
+    if inspect.isclass(schema_cls) and issubclass(schema_cls, Item):
+        return schema_cls
     else:
         raise TypeError(f"{cls_name} is not a known schema model")
 
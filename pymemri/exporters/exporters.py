@@ -1,4 +1,6 @@
-from typing import TYPE_CHECKING, Any, List
+from typing import TYPE_CHECKING, Any, List, Union
+
+from ..data.schema.item_batch import ItemBatch
 
 if TYPE_CHECKING:
     from ..data.schema import Item
@@ -13,6 +15,8 @@ class Query:
         Given a list of `properties`, the `execute` method queries the pod for a set of given items,
         and retrieves the properties for each item if it exists. Note that a properties can be nested behind
         multiple edges, such as "sender.owner.firstName".
+        Items can be a list of items or an `ItemBatch`, of which the properties are read
+        from its columns.
         """
         self.properties = list(properties)
 
@@ -47,13 +51,29 @@ class Query:
                     items[i] = None
         return items
 
-    def get_property_values(self, client: "PodClient", prop: str, items: List["Item"]) -> list:
+    def get_property_values(
+        self, client: "PodClient", prop: str, items: Union[List["Item"], ItemBatch]
+    ) -> list:
         edges, prop_name = self.parse_property(prop)
+        if isinstance(items, ItemBatch):
+            if not edges:
+                return items.values(prop_name)
+            items = self.batch_edge_targets(client, items, edges[0])
+            edges = edges[1:]
         target_items = self.traverse_edges(client, items, edges)
 
         result = [getattr(item, prop_name, None) for item in target_items]
         return result
 
+    def batch_edge_targets(self, client: "PodClient", batch: ItemBatch, edge: str) -> List["Item"]:
+        """Returns the first target of `edge` for every item in `batch`, None if it has none."""
+        if edge not in batch.item_cls.__edge_fields__:
+            return [None] * len(batch)
+        target_ids = [targets[0] if targets else None for targets in batch.edge_targets(edge)]
+        ids_to_query = list({id for id in target_ids if id is not None})
+        targets = {item.id: item for item in client.search({"ids": ids_to_query})}
+        return [targets.get(id) for id in target_ids]
+
     @staticmethod
     def parse_property(prop: str):
         prop = prop.split(".")
@@ -77,6 +97,8 @@ class Query:
         else:
             raise ValueError(f"Unknown dtype: {dtype}")
 
-    def execute(self, client: "PodClient", items: List["Item"], dtype="dict") -> Any:
+    def execute(
+        self, client: "PodClient", items: Union[List["Item"], ItemBatch], dtype="dict"
+    ) -> Any:
         result = {prop: self.get_property_values(client, prop, items) for prop in self.properties}
         return self.convert_dtype(result, dtype)
@@ -2,18 +2,38 @@ import fnmatch
 import json
 import logging
 import os
-import platform
-import socket
 import urllib
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from typing import Any, Deque, Dict, Generator, List, Optional, Union
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    ContextManager,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import requests
 from loguru import logger
-from urllib3.connection import HTTPConnection
+from urllib3.response import HTTPResponse
 
+from .codec import DEFAULT_CODEC, JSONCodec
+from .compression import Compression
+from .files import DEFAULT_CHUNK_SIZE, FileData, file_sha256, read_range, write_chunks
 from .graphql_utils import GQLQuery
+from .pagination import keyset_pages, prefetch
+from .transport import DEFAULT_TRANSPORTS, TransportRegistry
 
 logging.getLogger("requests").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -27,6 +47,8 @@ logging.basicConfig(
 DEFAULT_POD_ADDRESS = os.environ.get("POD_ADDRESS") or "http://localhost:3030"
 POD_VERSION = "v4"
 POD_ALLOWED_ORIGINS = os.environ.get("POD_ALLOWED_ORIGINS", "*").split(",")
+# Response status codes for which a request can be retried
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
 
 
 class PodError(Exception):
@@ -38,15 +60,14 @@ class PodError(Exception):
     def __str__(self) -> str:
         return " ".join([str(a) for a in self.args if a])
 
+    @property
+    def is_transient(self) -> bool:
+        return self.status in TRANSIENT_STATUS_CODES
 
-def get_platform_specific_keepalive_option():
-    if platform.system() == "Darwin":
-        return (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-    else:
-        return (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
 
+class BasePodAPI:
+    """Pod urls and authentication, shared by `PodAPI` and `AsyncPodAPI`."""
 
-class PodAPI:
     def __init__(
         self,
         database_key: str,
@@ -55,8 +76,16 @@ class PodAPI:
         version: str = POD_VERSION,
         auth_json: dict = None,
         verbose: bool = True,
+        codec: Optional[JSONCodec] = None,
+        compression: Optional[Union[str, Compression]] = None,
     ) -> None:
         self._check_origin(url)
+        # Encodes request bodies and decodes responses, see `get_codec`
+        self.codec = codec if codec is not None else DEFAULT_CODEC
+        # Optional compression of large request bodies, a `Compression` or an encoding name
+        if compression is not None and not isinstance(compression, Compression):
+            compression = Compression(compression)
+        self.compression = compression
 
         self.verbose = verbose
         self.database_key = database_key
@@ -68,28 +97,6 @@ class PodAPI:
         self.base_url_v5 = f"{url}/v5/{self.owner_key}"
         self.auth_json = self._create_auth(auth_json)
 
-        # Class uses requests Session to communicate with the POD.
-        # That creates a pool of TCP connections, over which HTTP requests
-        # with Keep-Alive header are sent. While idle, there is no traffic
-        # on those connections, that gets detected by the network balancer
-        # of the AWS infrastructure and makes those connection dropped,
-        # resulting with "connection reset by peer", or similar errors
-        # visible on the client side.
-        # Enabling TCP keep-alive packets resets the network balancer idle timer
-        # resulting in persistent connection as it was originally intended.
-        HTTPConnection.default_socket_options = HTTPConnection.default_socket_options + [
-            # Enable TCP keepalive packet transmission
-            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
-            # Start sending after 60 sec of idleness
-            get_platform_specific_keepalive_option(),
-            # Send keep-alive at 60 sec interval
-            (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 60),
-            # Close connection after 5 failed keep-alive pings (5 minutes)
-            (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 5),
-        ]
-
-        self.session = requests.Session()
-
     def _check_origin(self, url):
         for origin in POD_ALLOWED_ORIGINS:
             if fnmatch.fnmatch(url, origin):
@@ -106,17 +113,88 @@ class PodAPI:
         else:
             return {"type": "ClientAuth", "databaseKey": self.database_key}
 
-    def create_account(self):
-        response = self.session.post(
-            f"{self._url}/{self.version}/account",
-            json={"ownerKey": self.owner_key, "databaseKey": self.database_key},
+    def _encode_body(self, payload: Any) -> bytes:
+        return self.codec.dumps({"auth": self.auth_json, "payload": payload})
+
+    def _encode_body_encoded(self, payload: bytes) -> bytes:
+        """Same as `_encode_body`, for a `payload` that is already JSON encoded."""
+        return b'{"auth": ' + self.codec.dumps(self.auth_json) + b', "payload": ' + payload + b"}"
+
+    def _compress_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Returns the request body and the headers to send it with."""
+        headers = {"Content-Type": "application/json"}
+        if self.compression is None:
+            return body, headers
+        body, compression_headers = self.compression.compress_body(body)
+        return body, {**headers, **compression_headers}
+
+    def _record_response(self, headers: Mapping[str, str], size: int) -> None:
+        """Records the compression ratio of a response, from its headers and decoded `size`."""
+        if self.compression is None or not headers.get("Content-Encoding"):
+            return
+        content_length = headers.get("Content-Length")
+        if content_length is not None:
+            self.compression.record_response(size, int(content_length))
+
+    @staticmethod
+    def _bulk_payload(
+        create_items: List[dict] = None,
+        update_items: List[dict] = None,
+        create_edges: List[dict] = None,
+        delete_items: List[str] = None,
+        search: List[dict] = None,
+    ) -> Dict[str, Any]:
+        payload = {
+            "createItems": create_items,
+            "updateItems": update_items,
+            "createEdges": create_edges,
+            "deleteItems": delete_items,
+            "search": search,
+        }
+        return {k: v for k, v in payload.items() if v is not None}
+
+
+class PodAPI(BasePodAPI):
+    def __init__(
+        self,
+        database_key: str,
+        owner_key: str,
+        url: str = DEFAULT_POD_ADDRESS,
+        version: str = POD_VERSION,
+        auth_json: dict = None,
+        verbose: bool = True,
+        codec: Optional[JSONCodec] = None,
+        compression: Optional[Union[str, Compression]] = None,
+        transports: Optional[TransportRegistry] = None,
+    ) -> None:
+        super().__init__(
+            database_key, owner_key, url, version, auth_json, verbose, codec, compression
         )
+
+        # Sessions are shared by all PodAPIs for the same Pod, see `TransportRegistry`
+        self.transports = transports if transports is not None else DEFAULT_TRANSPORTS
+        self._headers = {}
+        if self.compression is not None:
+            # Accept every response encoding that urllib3 can decode in this environment
+            self._headers["Accept-Encoding"] = ", ".join(HTTPResponse.CONTENT_DECODERS)
+
+    def session(self) -> ContextManager[requests.Session]:
+        """Context in which the shared session for this Pod is in use, see `TransportRegistry`."""
+        return self.transports.session(self._url)
+
+    def create_account(self):
+        with self.session() as session:
+            response = session.post(
+                f"{self._url}/{self.version}/account",
+                json={"ownerKey": self.owner_key, "databaseKey": self.database_key},
+            )
         # if response.status_code != 200:
         #     raise PodError(response.status_code, response.text)
 
     def test_connection(self) -> bool:
         try:
-            res = self.session.get(self._url)
+            with self.session() as session:
+                res = session.get(self._url)
             if self.verbose:
                 logger.info("Successfully connected to pod")
             return True
@@ -126,68 +204,98 @@ class PodAPI:
 
     @property
     def pod_version(self) -> dict:
-        response = self.session.get(f"{self._url}/version")
+        with self.session() as session:
+            response = session.get(f"{self._url}/version")
         if response.status_code != 200:
             raise PodError(response.status_code, response.text)
-        return response.json()
-
-    def post(self, endpoint: str, payload: Any) -> Any:
-        body = {"auth": self.auth_json, "payload": payload}
-        response = self.session.post(f"{self.base_url}/{endpoint}", json=body)
-        if response.status_code != 200:
+        return self._decode(response)
+
+    def _post_body(
+        self, url: str, body: bytes, headers: Optional[dict] = None, stream: bool = False
+    ) -> requests.Response:
+        body, body_headers = self._compress_body(body)
+        headers = {**self._headers, **body_headers, **(headers or {})}
+        transport = self.transports.acquire(self._url)
+        try:
+            response = transport.session.post(url, data=body, headers=headers, stream=stream)
+        except BaseException:
+            self.transports.release(transport)
+            raise
+        if stream and response.status_code in (200, 206):
+            # The session is in use until the streamed response is read and closed
+            self.transports.release_on_close(transport, response)
+        else:
+            self.transports.release(transport)
+        if response.status_code not in (200, 206):
             raise PodError(response.status_code, response.text)
+        if not stream:
+            self._record_response(response.headers, len(response.content))
         return response
 
+    def _decode(self, response: requests.Response) -> Any:
+        return self.codec.loads(response.content)
+
+    def post(self, endpoint: str, payload: Any) -> Any:
+        return self._post_body(f"{self.base_url}/{endpoint}", self._encode_body(payload))
+
+    def post_encoded(self, endpoint: str, payload: bytes) -> Any:
+        """Same as `post`, for a `payload` that is already JSON encoded."""
+        body = self._encode_body_encoded(payload)
+        return self._post_body(f"{self.base_url}/{endpoint}", body)
+
     def post_v5(self, endpoint: str, payload: Any) -> Any:
-        body = {"auth": self.auth_json, "payload": payload}
-        response = self.session.post(f"{self.base_url_v5}/{endpoint}", json=body)
-        if response.status_code != 200:
-            raise PodError(response.status_code, response.text)
-        return response
+        return self._post_body(f"{self.base_url_v5}/{endpoint}", self._encode_body(payload))
 
     def create_schema(self, item: dict) -> str:
-        return self.post_v5("schema", item).json()
+        return self._decode(self.post_v5("schema", item))
 
     def get_item(self, uid: str) -> dict:
-        return self.post("get_item", uid).json()
+        return self._decode(self.post("get_item", uid))
 
     def create_item(self, item: dict) -> str:
-        return self.post("create_item", item).json()
+        return self._decode(self.post("create_item", item))
 
     def update_item(self, item: dict) -> list:
-        return self.post("update_item", item).json()
+        return self._decode(self.post("update_item", item))
 
     def get_edges(
         self, uid: str, direction: str = "Outgoing", expand_items: bool = True
     ) -> List[dict]:
         payload = {"item": uid, "direction": direction, "expandItems": expand_items}
-        return self.post("get_edges", payload).json()
+        return self._decode(self.post("get_edges", payload))
 
     def create_edge(self, edge: dict) -> str:
-        return self.post("create_edge", edge).json()
+        return self._decode(self.post("create_edge", edge))
 
     def delete_item(self, uid) -> list:
-        return self.post("delete_item", uid).json()
+        return self._decode(self.post("delete_item", uid))
 
     def delete_edge(self, edge: dict) -> str:
-        return self.post("delete_edge_by_source_target", edge).json()
+        return self._decode(self.post("delete_edge_by_source_target", edge))
 
     def delete_file(self, id: str) -> str:
-        return self.post("delete_file", {"id": id}).json()
+        return self._decode(self.post("delete_file", {"id": id}))
 
     def search(self, query: dict) -> List[dict]:
-        return self.post("search", query).json()
+        return self._decode(self.post("search", query))
 
-    def search_paginate(self, query: dict, limit: int = 32, even_page_size=True) -> Generator:
+    def search_paginate(
+        self, query: dict, limit: int = 32, even_page_size=True, prefetch_pages=True
+    ) -> Generator:
         """
         The Pod returns uneven page sizes when paginating, which can be an issue for some applications.
-        `search_paginate` wraps the pagination, and always returns pages of size `limit` by storing overflow items
-        in a queue.
+        `search_paginate` wraps the pagination, and always returns pages of size `limit`
+        by storing overflow items in a queue.
+
+        Pages are requested by `dateServerModified` instead of by offset, see `keyset_pages`.
+        With `prefetch_pages`, the next page is requested on a background thread
+        while the caller processes the current page.
         """
-        paginator = self._paginate(query, limit)
+        paginator = self._paginate(query, limit, prefetch_pages=prefetch_pages)
 
         if not even_page_size:
             yield from paginator
+            return
 
         remaining: Deque[Dict[str, Any]] = deque()
         while True:
@@ -202,35 +310,22 @@ class PodAPI:
         while len(remaining):
             yield [remaining.popleft() for _ in range(min(limit, len(remaining)))]
 
-    def _paginate(self, query: dict, limit: int = 32) -> Generator:
+    def _paginate(self, query: dict, limit: int = 32, prefetch_pages: bool = True) -> Iterator:
         if (
             "_limit" in query
+            or "_offset" in query
             or "dateServerModified" in query
             or "dateServerModified>=" in query
             or "dateServerModified<" in query
         ):
-            raise ValueError("Cannot paginate query that contains a date or limit.")
+            raise ValueError("Cannot paginate query that contains a date, limit or offset.")
         if "_sortOrder" in query:
             raise NotImplementedError("Only 'Asc' order is supported.")
 
-        query = {**query, "_limit": limit}
-        response = self.search(query)
-        if not len(response):
-            return
-            yield
-
-        offset = 0
-        query = {**query, "_limit": limit}
-
-        while True:
-            query["_offset"] = offset
-
-            response = self.search(query)
-            if not len(response):
-                break
-
-            offset += limit
-            yield response
+        pages = keyset_pages(self.search, query, limit)
+        if prefetch_pages:
+            pages = prefetch(pages)
+        return pages
 
     def bulk(
         self,
@@ -240,15 +335,12 @@ class PodAPI:
         delete_items: List[str] = None,
         search: List[dict] = None,
     ) -> Dict[str, Any]:
-        payload = {
-            "createItems": create_items,
-            "updateItems": update_items,
-            "createEdges": create_edges,
-            "deleteItems": delete_items,
-            "search": search,
-        }
-        payload = {k: v for k, v in payload.items() if v is not None}
-        return self.post("bulk", payload).json()
+        payload = self._bulk_payload(create_items, update_items, create_edges, delete_items, search)
+        return self._decode(self.post("bulk", payload))
+
+    def bulk_encoded(self, payload: bytes) -> Dict[str, Any]:
+        """`bulk` for a JSON encoded payload, as created by `BulkBatch.to_bytes`"""
+        return self._decode(self.post_encoded("bulk", payload))
 
     def graphql(
         self, query: Union[str, GQLQuery], variables: Optional[Dict[str, Any]] = None
@@ -256,30 +348,38 @@ class PodAPI:
         if isinstance(query, str):
             query = GQLQuery(query)
         query.format(variables)
-        return self.post("graphql", query.data).json()
+        return self._decode(self.post("graphql", query.data))
 
     def oauth(self, service: str, callback_url: str):
         payload = {"service": service, "callbackUrl": callback_url}
-        return self.post("oauth", payload).json()
+        return self._decode(self.post("oauth", payload))
+
+    def upload_file(self, file: FileData, sha: Optional[str] = None) -> Any:
+        """
+        Uploads `file`, which is either bytes, a path or a binary file object.
 
-    def upload_file(self, file: bytes) -> Any:
+        Paths and file objects are not read into memory: the SHA-256 is computed in a
+        streaming pass, after which the file is streamed to the Pod from its current position.
+        `sha` skips computing the SHA-256, if it is already known.
+        """
         if self.auth_json.get("type") == "PluginAuth":
             # alternative file upload for plugins, with different authentication
-            return self.upload_file_b(file)
+            return self.upload_file_b(file, sha=sha)
+        return self._post_file(f"{self.base_url}/upload_file/{self.database_key}", file, sha)
 
-        sha = sha256(file).hexdigest()
-        result = self.session.post(
-            f"{self.base_url}/upload_file/{self.database_key}/{sha}", data=file
-        )
-        if result.status_code != 200:
-            raise PodError(result.status_code, result.text)
+    def upload_file_b(self, file: FileData, sha: Optional[str] = None) -> Any:
+        auth = urllib.parse.quote(json.dumps(self.auth_json))
+        return self._post_file(f"{self.base_url}/upload_file_b/{auth}", file, sha)
 
-        return result
+    def _post_file(self, url: str, file: FileData, sha: Optional[str] = None) -> Any:
+        if isinstance(file, (str, Path)):
+            with open(file, "rb") as f:
+                return self._post_file(url, f, sha)
 
-    def upload_file_b(self, file: bytes) -> Any:
-        sha = sha256(file).hexdigest()
-        auth = urllib.parse.quote(json.dumps(self.auth_json))
-        result = self.session.post(f"{self.base_url}/upload_file_b/{auth}/{sha}", data=file)
+        if sha is None:
+            sha = file_sha256(file)
+        with self.session() as session:
+            result = session.post(f"{url}/{sha}", data=file)
         if result.status_code != 200:
             raise PodError(result.status_code, result.text)
 
@@ -288,6 +388,73 @@ class PodAPI:
     def get_file(self, sha: str) -> bytes:
         return self.post("get_file", {"sha256": sha}).content
 
+    def file_exists(self, sha: str) -> bool:
+        """
+        Returns `True` if the Pod has the file with hash `sha`, without downloading the file.
+        Transient errors are raised, as it is unknown if the Pod has the file.
+        """
+        try:
+            self.read_file_range(sha, 0, 1)
+            return True
+        except PodError as e:
+            if e.is_transient:
+                raise
+            # 416 = RANGE NOT SATISFIABLE, the file exists and is empty
+            return e.status == 416
+
+    def files_exist(self, shas: Iterable[str], max_workers: int = 8) -> Set[str]:
+        """Returns the hashes in `shas` of files the Pod has, checked concurrently."""
+        shas = list(set(shas))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            exists = executor.map(self.file_exists, shas)
+            return {sha for sha, sha_exists in zip(shas, exists) if sha_exists}
+
+    def _stream_file(self, sha: str, headers: Optional[dict] = None) -> requests.Response:
+        body = self._encode_body({"sha256": sha})
+        return self._post_body(f"{self.base_url}/get_file", body, headers=headers, stream=True)
+
+    def download_file(
+        self,
+        sha: str,
+        out: Union[str, Path, BinaryIO, bytearray, memoryview],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        verify: bool = True,
+    ) -> int:
+        """
+        Streams the file with hash `sha` into `out`, a path, a writable binary file object
+        or a writable buffer, in chunks of `chunk_size` bytes.
+
+        With `verify`, the SHA-256 of the data is checked while streaming, and a `PodError`
+        is raised if it does not match `sha`.
+
+        Returns:
+            int: the number of bytes written
+        """
+        if isinstance(out, (str, Path)):
+            with open(out, "wb") as f:
+                return self.download_file(sha, f, chunk_size=chunk_size, verify=verify)
+
+        hash = sha256() if verify else None
+        with self._stream_file(sha) as response:
+            size = write_chunks(out, response.iter_content(chunk_size), hash=hash)
+        if hash is not None and hash.hexdigest() != sha:
+            raise PodError(message=f"Downloaded file does not match sha256 {sha}")
+        return size
+
+    def read_file_range(
+        self, sha: str, start: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> bytes:
+        """
+        Returns `length` bytes of the file with hash `sha`, from byte `start`.
+        Only the requested range is downloaded, if the Pod supports range requests.
+        """
+        headers = {"Range": f"bytes={start}-{start + length - 1}"}
+        with self._stream_file(sha, headers=headers) as response:
+            if response.status_code == 206:
+                return response.content[:length]
+            # Full response, skip to the start of the range
+            return read_range(response.iter_content(chunk_size), start, length)
+
     def send_email(self, to: str, subject: str = "", body: str = "") -> Any:
         payload = {"to": to, "subject": subject, "body": body}
         return self.post("send_email", payload)
@@ -300,56 +467,64 @@ class PodAPI:
         self,
         platform: str,
     ) -> Dict:
-        return self.post(
-            "oauth2/access_token",
-            {"platform": platform},
-        ).json()
+        return self._decode(
+            self.post(
+                "oauth2/access_token",
+                {"platform": platform},
+            )
+        )
 
     def oauth2authorize(
         self, *, platform: str, code: str, redirect_uri: str, pkce_verifier: str
     ) -> Dict[str, str]:
-        return self.post(
-            "oauth2/authorize",
-            {
-                "platform": platform,
-                "authCode": code,
-                "redirectUri": redirect_uri,
-                "pkceVerifier": pkce_verifier,
-            },
-        ).json()
+        return self._decode(
+            self.post(
+                "oauth2/authorize",
+                {
+                    "platform": platform,
+                    "authCode": code,
+                    "redirectUri": redirect_uri,
+                    "pkceVerifier": pkce_verifier,
+                },
+            )
+        )
 
     def oauth2get_authorization_url(
         self, platform: str, scopes: str, redirect_uri: str
     ) -> Dict[str, str]:
-        return self.post(
-            "oauth2/auth_url",
-            {
-                "platform": platform,
-                "scopes": scopes,
-                "redirectUri": redirect_uri,
-            },
-        ).json()
+        return self._decode(
+            self.post(
+                "oauth2/auth_url",
+                {
+                    "platform": platform,
+                    "scopes": scopes,
+                    "redirectUri": redirect_uri,
+                },
+            )
+        )
 
     def oauth1_request_token(self, platform: str, callback_url: str) -> Any:
-        return self.post(
-            "oauth1_request_token", {"service": platform, "callbackUrl": callback_url}
-        ).json()
+        return self._decode(
+            self.post("oauth1_request_token", {"service": platform, "callbackUrl": callback_url})
+        )
 
     def oauth1_access_token(self, *, oauth_token, oauth_token_secret, oauth_verifier) -> Any:
-        return self.post(
-            "oauth1_access_token",
-            {
-                "oauthVerifier": oauth_verifier,
-                "oauthToken": oauth_token,
-                "oauthTokenSecret": oauth_token_secret,
-            },
-        ).json()
+        return self._decode(
+            self.post(
+                "oauth1_access_token",
+                {
+                    "oauthVerifier": oauth_verifier,
+                    "oauthToken": oauth_token,
+                    "oauthTokenSecret": oauth_token_secret,
+                },
+            )
+        )
 
     def plugin_status(self, plugins: List[str]) -> Any:
-        return self.post("plugin/status", {"plugins": plugins}).json()
+        return self._decode(self.post("plugin/status", {"plugins": plugins}))
 
     def plugin_api(self, plugin_id: str) -> Any:
-        return self.post("plugin/api", {"id": plugin_id}).json()
+        return self._decode(self.post("plugin/api", {"id": plugin_id}))
 
     def plugin_api_call(
         self,
@@ -367,4 +542,4 @@ class PodAPI:
             "jsonBody": jsonBody,
         }
 
-        return self.post("plugin/api/call", payload).json()
+        return self._decode(self.post("plugin/api/call", payload))
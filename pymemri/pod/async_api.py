@@ -0,0 +1,192 @@
+import asyncio
+import json
+import urllib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .api import DEFAULT_POD_ADDRESS, POD_VERSION, BasePodAPI, PodError
+from .codec import JSONCodec
+from .compression import Compression
+from .files import FileData, file_sha256
+from .graphql_utils import GQLQuery
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError(
+            "aiohttp is not installed. "
+            "Please install aiohttp (pip install pymemri[async]) to use the async Pod API."
+        )
+    return aiohttp
+
+
+class AsyncPodAPI(BasePodAPI):
+    """
+    asyncio version of `PodAPI`, on a pooled aiohttp session of at most `max_connections`
+    connections. The session is created on the first request, and closed by `close`.
+
+    Requests return the decoded JSON response. Connection errors and timeouts
+    are raised as `ConnectionError`.
+
+    Usage:
+        async with AsyncPodAPI(database_key, owner_key) as api:
+            items = await api.search({"type": "Person"})
+    """
+
+    def __init__(
+        self,
+        database_key: str,
+        owner_key: str,
+        url: str = DEFAULT_POD_ADDRESS,
+        version: str = POD_VERSION,
+        auth_json: dict = None,
+        verbose: bool = True,
+        codec: Optional[JSONCodec] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        compression: Optional[Union[str, Compression]] = None,
+    ) -> None:
+        super().__init__(
+            database_key, owner_key, url, version, auth_json, verbose, codec, compression
+        )
+        self._aiohttp = _import_aiohttp()
+        self.max_connections = max_connections
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = self._aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = self._aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncPodAPI":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> bytes:
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                body = await response.read()
+        except (self._aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ConnectionError(f"Could not connect to {url}: {e}") from e
+        if response.status != 200:
+            raise PodError(response.status, body.decode("utf-8", errors="replace"))
+        self._record_response(response.headers, len(body))
+        return body
+
+    async def create_account(self) -> None:
+        try:
+            await self._request(
+                "POST",
+                f"{self._url}/{self.version}/account",
+                json={"ownerKey": self.owner_key, "databaseKey": self.database_key},
+            )
+        except PodError:
+            pass
+
+    async def test_connection(self) -> bool:
+        try:
+            await self._request("GET", self._url)
+            return True
+        except (ConnectionError, PodError):
+            return False
+
+    async def pod_version(self) -> dict:
+        return self.codec.loads(await self._request("GET", f"{self._url}/version"))
+
+    async def _post_body(self, url: str, body: bytes) -> bytes:
+        body, headers = self._compress_body(body)
+        return await self._request("POST", url, data=body, headers=headers)
+
+    async def post_bytes(self, endpoint: str, payload: Any) -> bytes:
+        return await self._post_body(f"{self.base_url}/{endpoint}", self._encode_body(payload))
+
+    async def post(self, endpoint: str, payload: Any) -> Any:
+        return self.codec.loads(await self.post_bytes(endpoint, payload))
+
+    async def post_encoded(self, endpoint: str, payload: bytes) -> Any:
+        """Same as `post`, for a `payload` that is already JSON encoded."""
+        body = self._encode_body_encoded(payload)
+        return self.codec.loads(await self._post_body(f"{self.base_url}/{endpoint}", body))
+
+    async def get_item(self, uid: str) -> List[dict]:
+        return await self.post("get_item", uid)
+
+    async def create_item(self, item: dict) -> str:
+        return await self.post("create_item", item)
+
+    async def update_item(self, item: dict) -> list:
+        return await self.post("update_item", item)
+
+    async def get_edges(
+        self, uid: str, direction: str = "Outgoing", expand_items: bool = True
+    ) -> List[dict]:
+        payload = {"item": uid, "direction": direction, "expandItems": expand_items}
+        return await self.post("get_edges", payload)
+
+    async def create_edge(self, edge: dict) -> str:
+        return await self.post("create_edge", edge)
+
+    async def delete_item(self, uid: str) -> list:
+        return await self.post("delete_item", uid)
+
+    async def delete_edge(self, edge: dict) -> str:
+        return await self.post("delete_edge_by_source_target", edge)
+
+    async def search(self, query: dict) -> List[dict]:
+        return await self.post("search", query)
+
+    async def bulk(
+        self,
+        create_items: List[dict] = None,
+        update_items: List[dict] = None,
+        create_edges: List[dict] = None,
+        delete_items: List[str] = None,
+        search: List[dict] = None,
+    ) -> Dict[str, Any]:
+        payload = self._bulk_payload(create_items, update_items, create_edges, delete_items, search)
+        return await self.post("bulk", payload)
+
+    async def bulk_encoded(self, payload: bytes) -> Dict[str, Any]:
+        """`bulk` for a JSON encoded payload, as created by `BulkBatch.to_bytes`"""
+        return await self.post_encoded("bulk", payload)
+
+    async def graphql(
+        self, query: Union[str, GQLQuery], variables: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        if isinstance(query, str):
+            query = GQLQuery(query)
+        query.format(variables)
+        return await self.post("graphql", query.data)
+
+    async def upload_file(self, file: FileData, sha: Optional[str] = None) -> None:
+        """
+        Uploads `file`, which is either bytes, a path or a binary file object.
+        The SHA-256 is computed on a worker thread, paths and file objects are streamed.
+        """
+        if isinstance(file, (str, Path)):
+            with open(file, "rb") as f:
+                return await self.upload_file(f, sha=sha)
+
+        if sha is None:
+            sha = await asyncio.get_running_loop().run_in_executor(None, file_sha256, file)
+        if self.auth_json.get("type") == "PluginAuth":
+            auth = urllib.parse.quote(json.dumps(self.auth_json))
+            url = f"{self.base_url}/upload_file_b/{auth}/{sha}"
+        else:
+            url = f"{self.base_url}/upload_file/{self.database_key}/{sha}"
+        await self._request("POST", url, data=file)
+
+    async def get_file(self, sha: str) -> bytes:
+        return await self.post_bytes("get_file", {"sha256": sha})
@@ -0,0 +1,359 @@
+import asyncio
+from functools import partial
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+
+from loguru import logger
+
+from ..data.schema.itembase import Edge, ItemBase
+from .api import DEFAULT_POD_ADDRESS, POD_VERSION, PodError
+from .async_api import DEFAULT_MAX_CONNECTIONS, AsyncPodAPI
+from .batching import (
+    CREATE_EDGES,
+    BatchResult,
+    BulkBatch,
+    BulkBatcher,
+    BulkCheckpoint,
+    BulkResult,
+    drop_failed_edges,
+    failed_created_items,
+    server_timestamp,
+    timestamp_query,
+)
+from .client import BasePodClient
+from .db import DB, Priority
+from .files import FileData
+from .graphql_utils import GQLQuery
+from .utils import DEFAULT_POD_KEY_PATH, read_pod_key
+
+T = TypeVar("T", bound=ItemBase)
+
+
+class AsyncPodClient(BasePodClient):
+    """
+    asyncio version of `PodClient`, for running many concurrent Pod requests on one thread.
+
+    Items are hydrated and merged into `local_db` in the same way as `PodClient`.
+    The client does not connect on creation, call `create_account` to create the account
+    for new keys, and `close` (or use `async with`) to close the connection pool.
+
+    Usage:
+        async with AsyncPodClient(owner_key=owner_key, database_key=database_key) as client:
+            persons = await asyncio.gather(*[client.get(id) for id in ids])
+    """
+
+    def __init__(
+        self,
+        url=DEFAULT_POD_ADDRESS,
+        version=POD_VERSION,
+        database_key=None,
+        owner_key=None,
+        auth_json=None,
+        verbose=False,
+        default_priority=Priority.local,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        compression=None,
+    ):
+        self.verbose = verbose
+        self.database_key = database_key if database_key is not None else self.generate_random_key()
+        self.owner_key = owner_key if owner_key is not None else self.generate_random_key()
+        self.api = AsyncPodAPI(
+            database_key=self.database_key,
+            owner_key=self.owner_key,
+            url=url,
+            version=version,
+            auth_json=auth_json,
+            verbose=verbose,
+            max_connections=max_connections,
+            compression=compression,
+        )
+        self.default_priority = Priority(default_priority)
+        self.local_db = DB()
+        self.registered_classes = dict()
+
+    @classmethod
+    def from_local_keys(cls, path=DEFAULT_POD_KEY_PATH, **kwargs):
+        return cls(
+            database_key=read_pod_key("database_key", path),
+            owner_key=read_pod_key("owner_key", path),
+            **kwargs,
+        )
+
+    async def close(self) -> None:
+        await self.api.close()
+
+    async def __aenter__(self) -> "AsyncPodClient":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def create_account(self) -> None:
+        await self.api.create_account()
+
+    async def create(self, item: ItemBase) -> bool:
+        self.add_to_store(item)
+        try:
+            response = await self.api.bulk(
+                create_items=[item.to_json()], search=[timestamp_query(item.id)]
+            )
+            item.reset_local_sync_state()
+            self._set_server_timestamps([item], {item.id: server_timestamp(response)})
+            if hasattr(item, "requires_client_ref") and item.requires_client_ref:
+                item._client = self
+            return True
+        except (PodError, ConnectionError) as e:
+            logger.error(e)
+            return False
+
+    async def update_item(self, item: ItemBase, partial_update: bool = True) -> bool:
+        data = self.get_update_dict(item, partial_update=partial_update)
+        try:
+            response = await self.api.bulk(update_items=[data], search=[timestamp_query(item.id)])
+            item.reset_local_sync_state()
+            self._set_server_timestamps([item], {item.id: server_timestamp(response)})
+            return True
+        except (PodError, ConnectionError) as e:
+            logger.error(e)
+            return False
+
+    async def get(self, id: str, expanded: bool = True) -> ItemBase:
+        try:
+            if expanded:
+                result, edges = await asyncio.gather(
+                    self.api.get_item(str(id)), self.api.get_edges(str(id))
+                )
+            else:
+                result, edges = await self.api.get_item(str(id)), []
+        except PodError as e:
+            logger.error(e)
+            result = []
+        if not len(result):
+            raise ValueError(f"Item with id {id} does not exist")
+
+        item = self.item_from_json(result[0])
+        item.reset_local_sync_state()
+        for edge in edges:
+            if edge["name"] in item.edges:
+                edge_item = self.item_from_json(edge["item"])
+                edge_item.reset_local_sync_state()
+                item._add_synced_edge(edge["name"], edge_item)
+            else:
+                logger.debug(f"Could not add edge {edge['name']}: Edge is not defined on Item.")
+        return item
+
+    async def get_edges(self, id: str) -> Optional[List[dict]]:
+        try:
+            result = await self.api.get_edges(id)
+        except PodError as e:
+            logger.error(e)
+            return None
+        for edge in result:
+            edge_item = self.item_from_json(edge["item"])
+            edge_item.reset_local_sync_state()
+            edge["item"] = edge_item
+        return result
+
+    async def search(
+        self,
+        fields_data: Dict[str, Any],
+        include_edges: bool = True,
+        add_to_local_db: bool = True,
+        priority=None,
+        edges: Optional[List[str]] = None,
+        properties: Optional[List[str]] = None,
+        depth: Optional[int] = None,
+        lazy: bool = False,
+        read_only: bool = False,
+        batch: bool = False,
+    ) -> List[ItemBase]:
+        priority = Priority(priority) if priority else None
+        batch_type = self._batch_type(fields_data, batch)
+        if edges is not None or properties is not None or depth is not None:
+            # Only load the selected edges and properties, see `PodClient.search`
+            query = self._projected_search_query(fields_data, edges, properties, depth)
+            try:
+                response = await self.api.graphql(query)
+            except PodError as e:
+                logger.error(e)
+                return []
+            hydrate = partial(
+                self._item_from_graphql,
+                add_to_local_db=add_to_local_db,
+                priority=priority,
+                partial=True,
+            )
+            return self._search_result(response["data"], hydrate, lazy, read_only, batch_type)
+
+        extra_fields = {"[[edges]]": {}} if include_edges else {}
+        query = {**fields_data, **extra_fields}
+        result = []
+
+        # Special key "ids" for searching a list of ids, see `PodClient.search`
+        try:
+            if "ids" in query:
+                ids = query.pop("ids")
+                response = await self.api.bulk(search=[{"id": uid, **query} for uid in ids])
+                result = [item for sublist in response["search"] for item in sublist]
+            else:
+                result = await self.api.search(query)
+        except PodError as e:
+            logger.error(e)
+
+        hydrate = partial(
+            self._item_from_search, add_to_local_db=add_to_local_db, priority=priority, hydrated={}
+        )
+        return self._search_result(result, hydrate, lazy, read_only, batch_type)
+
+    async def search_typed(
+        self,
+        item_type: Type[T],
+        fields_data: Optional[Dict[str, Any]] = None,
+        *args,
+        **kwargs,
+    ) -> List[T]:
+        fields_data = fields_data or {}
+        item_type_name = item_type.__qualname__.split(".")[-1]
+        return await self.search({**fields_data, "type": item_type_name}, *args, **kwargs)
+
+    async def search_graphql(
+        self, query: Union[str, GQLQuery], variables: Optional[Dict[str, Any]] = None
+    ) -> List[ItemBase]:
+        response = await self.api.graphql(query, variables)
+        return [self._item_from_graphql(d) for d in response["data"]]
+
+    async def create_edges(self, edges: List[Edge]) -> BulkResult:
+        return await self.bulk_action(create_edges=edges)
+
+    async def delete_items(self, items: List[ItemBase]) -> BulkResult:
+        return await self.bulk_action(delete_items=items)
+
+    async def bulk_action(
+        self,
+        create_items=None,
+        update_items=None,
+        create_edges=None,
+        delete_items=None,
+        partial_update=True,
+        priority=None,
+        max_in_flight=4,
+        retries=0,
+        retry_backoff=1.0,
+        split_failed=False,
+        checkpoint=None,
+    ) -> BulkResult:
+        """
+        Create, update and delete items and create edges in batched requests to the Pod,
+        see `PodClient.bulk_action`.
+
+        Up to `max_in_flight` batches are sent concurrently, failed batches do not abort
+        the bulk action. Edges are only sent after all batches with created items are written,
+        edges from or to items that could not be created are not sent. With `split_failed`,
+        batches that fail on non-transient errors are split in halves to isolate the payloads
+        that cannot be written.
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight should be at least 1, got {max_in_flight}")
+        priority = Priority(priority) if priority else None
+        checkpoint = BulkCheckpoint(checkpoint) if checkpoint is not None else None
+        batcher = BulkBatcher(checkpoint=checkpoint, codec=self.api.codec, with_timestamp=True)
+        batches, n_total = self._prepare_bulk_action(
+            batcher,
+            create_items,
+            update_items,
+            create_edges,
+            delete_items,
+            partial_update,
+            priority,
+        )
+
+        tasks = []
+        pending = set()
+        failed = None
+        dropped = []
+        n = 0
+        for batch in batches:
+            n += len(batch)
+            if batch.payloads[CREATE_EDGES]:
+                if failed is None:
+                    # Edges can only be created after all their items exist
+                    if pending:
+                        await asyncio.wait(pending)
+                    pending = set()
+                    failed = failed_created_items(
+                        batch_result for task in tasks for batch_result in task.result()
+                    )
+                batch, batch_dropped = drop_failed_edges(batch, failed)
+                dropped.extend(batch_dropped)
+                if not len(batch):
+                    continue
+            while len(pending) >= max_in_flight:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            logger.info(f"BULK: Writing {n}/{n_total} items/edges")
+            task = asyncio.ensure_future(
+                self._send_batch(batch, retries, retry_backoff, split_failed, checkpoint)
+            )
+            tasks.append(task)
+            pending.add(task)
+
+        results = await asyncio.gather(*tasks)
+        result = BulkResult(
+            [batch_result for task_results in results for batch_result in task_results]
+        )
+        result.add_dropped(dropped)
+        for batch_result in result.failed_batches:
+            logger.error(
+                f"could not write batch of {len(batch_result.batch)}: {batch_result.error}"
+            )
+        self._complete_bulk_action(result, batcher, create_items, update_items, create_edges)
+        return result
+
+    async def _send_batch(
+        self,
+        batch: BulkBatch,
+        retries: int = 0,
+        retry_backoff: float = 1.0,
+        split_failed: bool = False,
+        checkpoint: Optional[BulkCheckpoint] = None,
+    ) -> List[BatchResult]:
+        error = None
+        response = None
+        for attempt in range(retries + 1):
+            if attempt > 0:
+                logger.warning(f"BULK: Retrying batch of {len(batch)} after error: {error}")
+                await asyncio.sleep(retry_backoff * 2 ** (attempt - 1))
+            try:
+                response = await self.api.bulk_encoded(batch.to_bytes())
+                error = None
+                break
+            except (PodError, ConnectionError) as e:
+                error = e
+                if isinstance(e, PodError) and not e.is_transient:
+                    break
+
+        if error is None:
+            if checkpoint is not None:
+                # Commits are fsynced, which should not block the event loop
+                await asyncio.get_running_loop().run_in_executor(None, checkpoint.commit, batch)
+            return [BatchResult(batch, timestamp=server_timestamp(response))]
+
+        is_transient = not isinstance(error, PodError) or error.is_transient
+        if split_failed and len(batch) > 1 and not is_transient:
+            results = []
+            for half in batch.split():
+                results.extend(
+                    await self._send_batch(half, retries, retry_backoff, split_failed, checkpoint)
+                )
+            return results
+        return [BatchResult(batch, error=error)]
+
+    async def upload_file(self, file: FileData, sha: Optional[str] = None) -> bool:
+        try:
+            await self.api.upload_file(file, sha=sha)
+            return True
+        except PodError as e:
+            # 409 = CONFLICT, file already exists
+            return e.status == 409
+
+    async def get_file(self, sha: str) -> bytes:
+        return await self.api.get_file(sha)
@@ -0,0 +1,404 @@
+import json
+import os
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+
+from .codec import DEFAULT_CODEC, JSONCodec
+
+# Maximum size in bytes of the encoded payload of a single bulk request
+DEFAULT_MAX_BATCH_SIZE = 5000000
+
+CREATE_ITEMS = "createItems"
+UPDATE_ITEMS = "updateItems"
+DELETE_ITEMS = "deleteItems"
+CREATE_EDGES = "createEdges"
+
+# Order in which payloads are packed into batches. Edges go last,
+# such that they are only sent once all created items are written.
+BULK_KEYS = (CREATE_ITEMS, UPDATE_ITEMS, DELETE_ITEMS, CREATE_EDGES)
+
+# Encoded size of '{}', '"<key>": []' and ', '
+_OBJECT_OVERHEAD = 2
+_KEY_OVERHEAD = 6
+_SEPARATOR_SIZE = 2
+
+
+class BulkBatch:
+    """
+    The payload of a single request to the Pod `bulk` endpoint.
+
+    Every payload is stored together with its JSON encoding, `size` is the exact
+    size in bytes of the encoded batch as returned by `to_bytes`.
+
+    If `with_timestamp`, the batch includes a search for the first created or updated item,
+    `timestamp_id`, to read the `dateServerModified` of the written items from the response,
+    see `server_timestamp`.
+    """
+
+    def __init__(self, with_timestamp: bool = False) -> None:
+        self.payloads: Dict[str, List[Any]] = {key: [] for key in BULK_KEYS}
+        self.encoded: Dict[str, List[bytes]] = {key: [] for key in BULK_KEYS}
+        self.size = _OBJECT_OVERHEAD
+        self.with_timestamp = with_timestamp
+        self.timestamp_id: Optional[str] = None
+
+    def __len__(self) -> int:
+        return sum(len(payloads) for payloads in self.payloads.values())
+
+    def _timestamp_id(self, key: str, payload: Any) -> Optional[str]:
+        """Returns the id of `payload` if it is the item of the timestamp search when added."""
+        if (
+            self.with_timestamp
+            and self.timestamp_id is None
+            and key in (CREATE_ITEMS, UPDATE_ITEMS)
+        ):
+            return payload.get("id")
+        return None
+
+    def cost(self, key: str, encoded: bytes, payload: Any = None) -> int:
+        """
+        Returns the number of bytes `to_bytes` grows by when `encoded` is added under `key`,
+        including the timestamp search if `payload` becomes the item it searches for.
+        """
+        if self.encoded[key]:
+            cost = len(encoded) + _SEPARATOR_SIZE
+        else:
+            cost = len(encoded) + len(key) + _KEY_OVERHEAD
+            if len(self):
+                cost += _SEPARATOR_SIZE
+        timestamp_id = self._timestamp_id(key, payload)
+        if timestamp_id is not None:
+            cost += len(self._search_part(timestamp_id)) + _SEPARATOR_SIZE
+        return cost
+
+    def append(self, key: str, payload: Any, encoded: bytes) -> None:
+        self.size += self.cost(key, encoded, payload)
+        timestamp_id = self._timestamp_id(key, payload)
+        if timestamp_id is not None:
+            self.timestamp_id = timestamp_id
+        self.payloads[key].append(payload)
+        self.encoded[key].append(encoded)
+
+    def entries(self) -> Iterator[Tuple[str, Any, bytes]]:
+        """Yields (key, payload, encoded payload) for all payloads, in batch order."""
+        for key in BULK_KEYS:
+            yield from ((key, p, e) for p, e in zip(self.payloads[key], self.encoded[key]))
+
+    def split(self) -> Tuple["BulkBatch", "BulkBatch"]:
+        """Splits the batch in two halves, preserving the order of payloads."""
+        entries = list(self.entries())
+        half = len(entries) // 2
+        result = (BulkBatch(self.with_timestamp), BulkBatch(self.with_timestamp))
+        for batch, batch_entries in zip(result, (entries[:half], entries[half:])):
+            for key, payload, encoded in batch_entries:
+                batch.append(key, payload, encoded)
+        return result
+
+    def item_ids(self) -> Set[str]:
+        """Returns the ids of all created and updated items in this batch."""
+        return {
+            payload["id"]
+            for key in (CREATE_ITEMS, UPDATE_ITEMS)
+            for payload in self.payloads[key]
+            if "id" in payload
+        }
+
+    @staticmethod
+    def _search_part(id: str) -> bytes:
+        return b'"search": [' + json.dumps(timestamp_query(id)).encode("utf-8") + b"]"
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            b'"' + key.encode("utf-8") + b'": [' + b", ".join(encoded) + b"]"
+            for key, encoded in self.encoded.items()
+            if encoded
+        ]
+        if self.timestamp_id is not None:
+            parts.append(self._search_part(self.timestamp_id))
+        return b"{" + b", ".join(parts) + b"}"
+
+
+def timestamp_query(id: str) -> Dict[str, Any]:
+    """Bulk search for the `dateServerModified` of the items written with item `id`."""
+    return {"id": id}
+
+
+def server_timestamp(response: Any) -> Optional[int]:
+    """
+    Returns the `dateServerModified` of the items written in a bulk request with a
+    `timestamp_query`, or None if the response has no search result.
+
+    The Pod writes a bulk request in a single transaction, in which all items get the same
+    `dateServerModified`. The timestamp of one written item is therefore the timestamp of all
+    items written in the request.
+    """
+    try:
+        return response["search"][0][0]["dateServerModified"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class BulkCheckpoint:
+    """
+    On-disk record of bulk payloads that are written to the Pod,
+    used to resume an interrupted bulk action.
+
+    Payloads are identified by the id of their item, or by the source, target and name of
+    their edge, and not by their content. Items are only identified across runs if their ids
+    are stable: `PodClient.bulk_action` assigns new items with an `externalId` the id that is
+    recorded in the checkpoint for their type and `externalId`, see `item_ids`.
+    """
+
+    # Prefix of lines with the id of an item by type and externalId
+    ID_PREFIX = "id "
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._lock = Lock()
+        self.committed: Set[str] = set()
+        self.ids: Dict[Tuple[str, str], str] = {}
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                if line.startswith(self.ID_PREFIX):
+                    type_name, external_id, id = json.loads(line[len(self.ID_PREFIX) :])
+                    self.ids[(type_name, external_id)] = id
+                elif line:
+                    self.committed.add(line)
+
+    @staticmethod
+    def key(bulk_key: str, payload: Any) -> str:
+        """Returns the identity of `payload` under `bulk_key`, independent of its content."""
+        if bulk_key == DELETE_ITEMS:
+            identity = f"{bulk_key} {payload}"
+        elif bulk_key == CREATE_EDGES:
+            identity = f"{bulk_key} {payload['_source']} {payload['_target']} {payload['_name']}"
+        else:
+            identity = f"{bulk_key} {payload['id']}"
+        return blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+
+    def contains(self, bulk_key: str, payload: Any) -> bool:
+        return self.key(bulk_key, payload) in self.committed
+
+    def __len__(self) -> int:
+        return len(self.committed)
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.path, "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def item_ids(self, new_ids: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], str]:
+        """
+        Returns the ids of items by (type, externalId). Ids recorded by a previous run are
+        reused, the ids in `new_ids` of other items are recorded before they are written.
+        """
+        with self._lock:
+            records = {k: id for k, id in new_ids.items() if k not in self.ids}
+            if records:
+                self._append([self.ID_PREFIX + json.dumps([*k, id]) for k, id in records.items()])
+                self.ids.update(records)
+            return {k: self.ids[k] for k in new_ids}
+
+    def commit(self, batch: BulkBatch) -> None:
+        keys = [self.key(bulk_key, payload) for bulk_key, payload, _ in batch.entries()]
+        with self._lock:
+            self._append(keys)
+            self.committed.update(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.committed = set()
+            self.ids = {}
+
+
+class BulkBatcher:
+    """
+    Packs bulk payloads into batches of at most `max_size` bytes in a single pass.
+
+    Each payload is JSON encoded exactly once. Batches are yielded as soon as they are full,
+    so the input iterables can be generators.
+    Payloads that are committed in `checkpoint` are skipped.
+    Payloads are encoded with `codec`, by default the fastest installed codec, see `get_codec`.
+    Batches are created `with_timestamp`, see `BulkBatch`.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_BATCH_SIZE,
+        checkpoint: Optional[BulkCheckpoint] = None,
+        codec: Optional[JSONCodec] = None,
+        with_timestamp: bool = False,
+    ) -> None:
+        self.max_size = max_size
+        self.checkpoint = checkpoint
+        self.codec = codec if codec is not None else DEFAULT_CODEC
+        self.with_timestamp = with_timestamp
+        self.n_skipped = 0
+
+    def batches(
+        self,
+        create_items: Optional[Iterable[dict]] = None,
+        update_items: Optional[Iterable[dict]] = None,
+        delete_items: Optional[Iterable[str]] = None,
+        create_edges: Optional[Iterable[dict]] = None,
+    ) -> Iterator[BulkBatch]:
+        streams = {
+            CREATE_ITEMS: create_items,
+            UPDATE_ITEMS: update_items,
+            DELETE_ITEMS: delete_items,
+            CREATE_EDGES: create_edges,
+        }
+
+        batch = BulkBatch(self.with_timestamp)
+        for key in BULK_KEYS:
+            for payload in streams[key] or []:
+                if self.checkpoint is not None and self.checkpoint.contains(key, payload):
+                    self.n_skipped += 1
+                    continue
+                encoded = self.codec.dumps(payload)
+                cost = batch.cost(key, encoded, payload)
+                if batch.size + cost > self.max_size and len(batch):
+                    yield batch
+                    batch = BulkBatch(self.with_timestamp)
+                    cost = batch.cost(key, encoded, payload)
+                if batch.size + cost > self.max_size:
+                    logger.error("Could not add item: Item exceeds max item size")
+                    continue
+                batch.append(key, payload, encoded)
+
+        if len(batch):
+            yield batch
+
+
+@dataclass
+class BatchResult:
+    """
+    The result of sending `batch`. Edges that are not sent because the batch that creates
+    their source or target failed have the error of that batch, and `caused_by` is set to it.
+    """
+
+    batch: BulkBatch
+    error: Optional[Exception] = None
+    caused_by: Optional["BatchResult"] = field(default=None, repr=False, compare=False)
+    # dateServerModified of the written items, if the Pod returned it
+    timestamp: Optional[int] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+def failed_created_items(results: Iterable[BatchResult]) -> Dict[str, BatchResult]:
+    """Returns the failed result by id for every item that `results` could not create."""
+    return {
+        payload["id"]: result
+        for result in results
+        if not result.success
+        for payload in result.batch.payloads[CREATE_ITEMS]
+        if "id" in payload
+    }
+
+
+def drop_failed_edges(
+    batch: BulkBatch, failed: Dict[str, BatchResult]
+) -> Tuple[BulkBatch, List[BatchResult]]:
+    """
+    Removes the edges from or to items in `failed` from `batch`, see `failed_created_items`.
+
+    Returns the batch with the remaining payloads, and the removed edges as failed results
+    per batch that caused them.
+    """
+    if not failed:
+        return batch, []
+    kept = BulkBatch(batch.with_timestamp)
+    dropped: Dict[int, BatchResult] = {}
+    for key, payload, encoded in batch.entries():
+        cause = None
+        if key == CREATE_EDGES:
+            cause = failed.get(payload["_source"]) or failed.get(payload["_target"])
+        if cause is None:
+            kept.append(key, payload, encoded)
+            continue
+        if id(cause) not in dropped:
+            dropped[id(cause)] = BatchResult(BulkBatch(), error=cause.error, caused_by=cause)
+        dropped[id(cause)].batch.append(key, payload, encoded)
+    if not dropped:
+        return batch, []
+    return kept, list(dropped.values())
+
+
+@dataclass
+class BulkResult:
+    """
+    Per-batch results of `PodClient.bulk_action`. Evaluates to `True` if all batches were written.
+
+    If the bulk action was aborted after a failed batch, `aborted` is set and
+    the remaining batches are not in `batches`. Edges from or to items that could not be
+    created are not sent, they are in a failed batch directly after the batch that caused them.
+    """
+
+    batches: List[BatchResult] = field(default_factory=list)
+    aborted: bool = False
+
+    def __bool__(self) -> bool:
+        return self.success
+
+    @property
+    def success(self) -> bool:
+        return not self.aborted and all(result.success for result in self.batches)
+
+    def add_dropped(self, dropped: Iterable[BatchResult]) -> None:
+        """Adds the results of dropped edges after their cause, see `drop_failed_edges`."""
+        for result in dropped:
+            cause = result.caused_by
+            index = next(
+                (i + 1 for i, r in enumerate(self.batches) if r is cause), len(self.batches)
+            )
+            while index < len(self.batches) and self.batches[index].caused_by is cause:
+                index += 1
+            self.batches.insert(index, result)
+
+    @property
+    def failed_batches(self) -> List[BatchResult]:
+        return [result for result in self.batches if not result.success]
+
+    @property
+    def n_written(self) -> int:
+        return sum(len(result.batch) for result in self.batches if result.success)
+
+    @property
+    def committed(self) -> Dict[str, List[Any]]:
+        """Written payloads, by bulk key"""
+        return self._payloads_by_key(success=True)
+
+    @property
+    def failed(self) -> Dict[str, List[Any]]:
+        """Payloads that could not be written, by bulk key"""
+        return self._payloads_by_key(success=False)
+
+    def _payloads_by_key(self, success: bool) -> Dict[str, List[Any]]:
+        res = {key: [] for key in BULK_KEYS}
+        for result in self.batches:
+            if result.success == success:
+                for key, payload, _ in result.batch.entries():
+                    res[key].append(payload)
+        return res
+
+    def committed_item_ids(self) -> Set[str]:
+        return {id for result in self.batches if result.success for id in result.batch.item_ids()}
+
+    def committed_timestamps(self) -> Dict[str, Optional[int]]:
+        """Returns the `dateServerModified` by id of all created and updated items."""
+        return {
+            id: result.timestamp
+            for result in self.batches
+            if result.success
+            for id in result.batch.item_ids()
+        }
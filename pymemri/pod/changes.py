@@ -0,0 +1,60 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+from loguru import logger
+
+from ..data.basic import read_json, write_json
+from .pagination import DATE_SERVER_MODIFIED
+
+
+class Watermark:
+    """
+    Position in the change feed of the Pod, see `PodClient.changes_since`.
+
+    Items with a `dateServerModified` before `timestamp`, and the items in `ids` that have
+    `dateServerModified == timestamp`, are already processed. If `path` is set, the watermark
+    is persisted to that file on every `save`, so it can be resumed in a next plugin run.
+    """
+
+    def __init__(
+        self,
+        timestamp: Optional[int] = None,
+        ids: Optional[List[str]] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.timestamp = timestamp
+        self.ids = ids or []
+        self.path = Path(path) if path is not None else None
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "Watermark":
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path)
+        data = read_json(path)
+        logger.info(f"reading watermark from {path}")
+        return cls(timestamp=data["timestamp"], ids=data["ids"], path=path)
+
+    @classmethod
+    def from_datetime(cls, dt: datetime) -> "Watermark":
+        return cls(timestamp=round(dt.timestamp() * 1000))
+
+    def advance(self, page: List[dict]) -> None:
+        """Moves the watermark past `page`, a list of items as returned by the Pod search."""
+        if not len(page):
+            return
+        last = page[-1][DATE_SERVER_MODIFIED]
+        if last != self.timestamp:
+            self.timestamp = last
+            self.ids = []
+        self.ids.extend(item["id"] for item in page if item[DATE_SERVER_MODIFIED] == last)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json({"timestamp": self.timestamp, "ids": self.ids}, self.path)
+
+    def __repr__(self) -> str:
+        return f"Watermark(timestamp={self.timestamp}, ids={len(self.ids)})"
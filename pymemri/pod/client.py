@@ -1,24 +1,414 @@
+import mmap
 import random
+import time
 import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from threading import Thread
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+from functools import lru_cache, partial
+from itertools import chain
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import numpy as np
+import requests
 from loguru import logger
 from typing_extensions import Unpack
 
-from pymemri.data.schema.itembase import ItemBase
+from pymemri.data.schema.itembase import Edge, ItemBase, _parse_pod_datetime
 from pymemri.data.schema.schema import SchemaMeta
 
-from ..data.schema import Account, File, Photo, PluginRun, get_schema_cls
+from ..data.schema import Account, File, ItemBatch, Photo, PluginRun, get_schema_cls
 from .api import DEFAULT_POD_ADDRESS, POD_VERSION, PodAPI, PodError
+from .batching import (
+    CREATE_EDGES,
+    BatchResult,
+    BulkBatch,
+    BulkBatcher,
+    BulkCheckpoint,
+    BulkResult,
+    drop_failed_edges,
+    failed_created_items,
+    server_timestamp,
+    timestamp_query,
+)
+from .changes import Watermark
 from .db import DB, Priority
-from .graphql_utils import GQLQuery
+from .file_cache import FileCache
+from .files import FileData, file_sha256
+from .graphql_utils import GQLQuery, search_query
+from .lazy import ItemView, LazyItems
+from .pagination import keyset_pages, prefetch
+from .uploads import (
+    DEFAULT_MAX_UPLOAD_MEMORY,
+    DEFAULT_MAX_UPLOAD_WORKERS,
+    UploadExecutor,
+    UploadRecord,
+    upload_scope,
+)
 from .utils import DEFAULT_POD_KEY_PATH, read_pod_key
 
 
-class PodClient:
+def _split_item_batch(
+    items: Optional[Union[List[ItemBase], ItemBatch]]
+) -> Tuple[Optional[ItemBatch], Optional[List[ItemBase]]]:
+    """Returns (items, None) if `items` is an `ItemBatch`, else (None, items)."""
+    if isinstance(items, ItemBatch):
+        return items, None
+    return None, items
+
+
+def _assign_checkpoint_ids(
+    checkpoint: BulkCheckpoint,
+    create_items: Optional[List[ItemBase]],
+    create_batch: Optional[ItemBatch],
+) -> None:
+    """
+    Assigns created items with an `externalId` the id they got in a previous run of a bulk
+    action with `checkpoint`, such that a resumed bulk action skips the items that are written.
+    Raises ValueError for items that have neither an id nor an `externalId`.
+    """
+    new_ids = {}
+    for item in create_items or []:
+        if item.id is None:
+            if item.externalId is None:
+                raise ValueError(
+                    f"Cannot checkpoint {item}, created items need an id or externalId"
+                )
+            new_ids[(type(item).__name__, item.externalId)] = ItemBase.create_id()
+    batch_ids = {}
+    if create_batch is not None:
+        type_name = create_batch.item_cls.__name__
+        external_ids = create_batch.values("externalId")
+        for row, (id, external_id) in enumerate(zip(create_batch.ids, external_ids)):
+            if external_id is not None:
+                batch_ids[id] = (type_name, external_id)
+                new_ids[(type_name, external_id)] = id
+            elif create_batch.new_ids is not None and create_batch.new_ids[row]:
+                raise ValueError(
+                    f"Cannot checkpoint row {row} of {create_batch}, "
+                    "created items need an id or externalId"
+                )
+
+    if not new_ids:
+        return
+    ids = checkpoint.item_ids(new_ids)
+    for item in create_items or []:
+        if item.id is None:
+            item.id = ids[(type(item).__name__, item.externalId)]
+    if batch_ids:
+        create_batch.replace_ids({id: ids[k] for id, k in batch_ids.items()})
+
+
+class BasePodClient:
+    """
+    Item hydration, local DB and bulk logic shared by `PodClient` and `AsyncPodClient`.
+    Subclasses set `api`, `local_db`, `default_priority` and `registered_classes`.
+    """
+
+    @staticmethod
+    def generate_random_key():
+        return "".join([str(random.randint(0, 9)) for i in range(64)])
+
+    def add_to_store(
+        self, item: ItemBase, priority: Priority = None, properties: Optional[List[str]] = None
+    ) -> ItemBase:
+        item.create_id_if_not_exists()
+        priority = priority if priority is not None else self.default_priority
+        return self.local_db.merge(item, priority, properties)
+
+    def reset_local_db(self):
+        self.local_db = DB()
+
+    def get_create_edge_dict(self, edge):
+        return {
+            "_source": edge.source.id,
+            "_target": edge.target.id,
+            "_name": edge.name,
+        }
+
+    def get_delete_edge_dict(self, edge):
+        return {"_source": edge.source.id, "_target": edge.target.id, "_name": edge.name}
+
+    def get_update_dict(self, item: ItemBase, partial_update: bool = True):
+        properties = item.property_dict()
+        if partial_update:
+            properties = {
+                k: v for k, v in properties.items() if k == "id" or k in item._updated_properties
+            }
+        return properties
+
+    @staticmethod
+    def _reset_new_edges(edges: List[Edge]) -> None:
+        """Removes `edges` that are written to the Pod from the new edges of their source."""
+        written = {}
+        for edge in edges:
+            written.setdefault(id(edge.source), (edge.source, set()))[1].add(
+                (edge.name, id(edge.target))
+            )
+        for source, source_edges in written.values():
+            source._new_edges = [
+                e for e in source._new_edges if (e.name, id(e.target)) not in source_edges
+            ]
+            source._update_dirty()
+
+    def _item_from_search(
+        self,
+        item_json: dict,
+        add_to_local_db: bool = True,
+        priority=None,
+        hydrated: Optional[Dict[str, ItemBase]] = None,
+    ):
+        # search returns different fields w.r.t. edges compared to `get` api,
+        # different method to keep `self.get` clean.
+        # `hydrated` maps ids to items that are already hydrated from the same response,
+        # such that edge targets shared by many items are only hydrated once.
+        item = self.item_from_json(item_json, add_to_local_db=add_to_local_db, priority=priority)
+        item.reset_local_sync_state()
+        if hydrated is not None:
+            hydrated[item.id] = item
+
+        for edge_json in item_json.get("[[edges]]", []):
+            edge_name = edge_json["_edge"]
+            try:
+                edge_item = hydrated.get(edge_json["_item"]["id"]) if hydrated else None
+                if edge_item is None:
+                    edge_item = self.item_from_json(
+                        edge_json["_item"],
+                        add_to_local_db=add_to_local_db,
+                        priority=priority,
+                    )
+                    edge_item.reset_local_sync_state()
+                    if hydrated is not None:
+                        hydrated[edge_item.id] = edge_item
+                item._add_synced_edge(edge_name, edge_item)
+            except Exception as e:
+                logger.error(f"Could not attach edge {edge_json['_item']} to {item}, {e}")
+                continue
+        return item
+
+    def item_from_json(
+        self,
+        json: dict,
+        add_to_local_db: bool = True,
+        priority=None,
+        partial: bool = False,
+        validate: bool = False,
+    ) -> ItemBase:
+        """
+        Creates the item for Pod `json`. If `partial`, `json` only holds some of the properties
+        of the item, and only those properties are merged into `local_db`.
+
+        Pod data is trusted and not validated, see `ItemBase.from_pod_json`.
+        Set `validate` to create the item with `ItemBase.from_json` instead.
+        """
+        priority = Priority(priority) if priority else None
+
+        item_class = get_schema_cls(
+            json["type"],
+            extra=self.registered_classes,
+        )
+
+        if validate:
+            new_item = item_class.from_json(json)
+        else:
+            new_item = item_class.from_pod_json(json)
+        if add_to_local_db:
+            try:
+                properties = list(json) if partial else None
+                new_item = self.add_to_store(new_item, priority=priority, properties=properties)
+            except Exception as e:
+                logger.error(f"Could not add {new_item} to local db, {e}")
+
+        if hasattr(new_item, "requires_client_ref") and new_item.requires_client_ref:
+            new_item._client = self
+        return new_item
+
+    def _item_from_graphql(self, data, add_to_local_db=True, priority=None, partial=False):
+        item = self.item_from_json(
+            data, add_to_local_db=add_to_local_db, priority=priority, partial=partial
+        )
+        item.reset_local_sync_state()
+        for prop in item.edges:
+            if prop in data:
+                for edge in data[prop]:
+                    edge_item = self._item_from_graphql(edge, add_to_local_db, priority, partial)
+                    item._add_synced_edge(prop, edge_item)
+        return item
+
+    def _projected_search_query(
+        self,
+        fields_data: Dict[str, Any],
+        edges: Optional[List[str]],
+        properties: Optional[List[str]],
+        depth: Optional[int],
+    ) -> GQLQuery:
+        if "type" not in fields_data:
+            raise ValueError("Searching with edges, properties or depth requires a type")
+        item_cls = get_schema_cls(fields_data["type"], extra=self.registered_classes)
+        return search_query(item_cls, fields_data, edges, properties, depth)
+
+    def _search_result(
+        self,
+        result: List[dict],
+        hydrate: Callable[[dict], ItemBase],
+        lazy: bool = False,
+        read_only: bool = False,
+        batch_type: Optional[str] = None,
+    ) -> Union[List[ItemBase], LazyItems, List[ItemView], ItemBatch]:
+        """Creates the items of the search `result` with `hydrate`, see `PodClient.search`."""
+        schema_cls = lru_cache(maxsize=None)(partial(get_schema_cls, extra=self.registered_classes))
+        if batch_type is not None:
+            return ItemBatch.from_json(schema_cls(batch_type), result)
+        if read_only:
+            return [ItemView(item_json, schema_cls) for item_json in result]
+        if lazy:
+            return LazyItems(result, hydrate, schema_cls)
+        return [hydrate(item_json) for item_json in result]
+
+    @staticmethod
+    def _batch_type(fields_data: Dict[str, Any], batch: bool) -> Optional[str]:
+        if not batch:
+            return None
+        if "type" not in fields_data:
+            raise ValueError("Searching for an ItemBatch requires a type")
+        return fields_data["type"]
+
+    def _prepare_bulk_action(
+        self,
+        batcher: BulkBatcher,
+        create_items: Optional[Union[List[ItemBase], ItemBatch]],
+        update_items: Optional[Union[List[ItemBase], ItemBatch]],
+        create_edges: Optional[List[Edge]],
+        delete_items: Optional[Union[List[ItemBase], ItemBatch]],
+        partial_update: bool,
+        priority: Optional[Priority],
+    ) -> Tuple[Iterator[BulkBatch], int]:
+        """Returns the batches of a bulk action and the number of items/edges in them."""
+        # ItemBatches are written as they are, without creating items or adding them to local_db
+        create_batch, create_items = _split_item_batch(create_items)
+        update_batch, update_items = _split_item_batch(update_items)
+        delete_batch, delete_items = _split_item_batch(delete_items)
+        if batcher.checkpoint is not None:
+            _assign_checkpoint_ids(batcher.checkpoint, create_items, create_batch)
+
+        # we need to add to local_db to not lose reference.
+        if create_items is not None:
+            for c in create_items:
+                try:
+                    res = getattr(c, "requires_client_ref", False)
+                except Exception:
+                    pass
+                finally:
+                    res = False
+                if res:
+                    c._client = self
+                if not self.local_db.contains(c):
+                    self.add_to_store(c, priority=priority)
+
+        create_items = create_items or []
+        update_items = update_items or []
+        create_edges = create_edges or []
+        # Note: skip delete_items without id, as items that are not in pod cannot be deleted
+        delete_ids = [item.id for item in delete_items or [] if item.id is not None]
+        if delete_batch is not None:
+            delete_ids = list(delete_batch.ids)
+
+        n_total = len(create_items) + len(update_items) + len(create_edges) + len(delete_ids)
+        # datetimes are encoded by the batcher codec
+        create_payloads = (item.to_json(datetime_to_timestamp=False) for item in create_items)
+        update_payloads = (
+            self.get_update_dict(item, partial_update=partial_update) for item in update_items
+        )
+        edge_payloads = (self.get_create_edge_dict(edge) for edge in create_edges)
+        if create_batch is not None:
+            n_total += len(create_batch) + create_batch.n_edges
+            create_payloads = create_batch.iter_json()
+            edge_payloads = chain(edge_payloads, create_batch.iter_edge_json())
+        if update_batch is not None:
+            # Batches have no local changes, all properties are updated
+            n_total += len(update_batch)
+            update_payloads = update_batch.iter_json()
+
+        batches = batcher.batches(
+            create_items=create_payloads,
+            update_items=update_payloads,
+            delete_items=delete_ids,
+            create_edges=edge_payloads,
+        )
+        return batches, n_total
+
+    @staticmethod
+    def _set_server_timestamps(
+        items: Iterable[ItemBase], timestamps: Dict[str, Optional[int]]
+    ) -> None:
+        """
+        Sets the `dateServerModified` of written `items` to the timestamp of the write by id,
+        such that `sync` does not fetch them as modified in the Pod.
+        """
+        for item in items:
+            timestamp = timestamps.get(item.id)
+            if timestamp is not None and "dateServerModified" in item.__property_fields__:
+                item._set_synced_property("dateServerModified", _parse_pod_datetime(timestamp))
+
+    def _complete_bulk_action(
+        self,
+        result: BulkResult,
+        batcher: BulkBatcher,
+        create_items: Optional[List[ItemBase]],
+        update_items: Optional[List[ItemBase]],
+        create_edges: Optional[List[Edge]],
+    ) -> None:
+        """Resets the sync state of the items and edges that are written in a bulk action."""
+        all_items = [
+            item
+            for items in (create_items, update_items)
+            if items is not None and not isinstance(items, ItemBatch)
+            for item in items
+        ]
+        create_edges = create_edges or []
+        checkpoint = batcher.checkpoint
+        if batcher.n_skipped:
+            logger.info(f"BULK: Skipped {batcher.n_skipped} items/edges written before checkpoint")
+        timestamps = result.committed_timestamps()
+        if result.success:
+            logger.info(f"Completed Bulk action, written {result.n_written} items/edges")
+            for item in all_items:
+                item.reset_local_sync_state()
+            self._set_server_timestamps(all_items, timestamps)
+            self._reset_new_edges(create_edges)
+            if checkpoint is not None:
+                checkpoint.clear()
+        else:
+            committed_items = [item for item in all_items if item.id in timestamps]
+            for item in committed_items:
+                item.reset_local_sync_state()
+            self._set_server_timestamps(committed_items, timestamps)
+            committed_edges = {
+                (e["_source"], e["_target"], e["_name"]) for e in result.committed[CREATE_EDGES]
+            }
+            self._reset_new_edges(
+                [
+                    edge
+                    for edge in create_edges
+                    if (edge.source.id, edge.target.id, edge.name) in committed_edges
+                ]
+            )
+
+
+class PodClient(BasePodClient):
     # Mapping from python type to schema type
     # TODO move to data.schema once schema is refactored
     TYPE_TO_SCHEMA = {
@@ -39,6 +429,12 @@ class PodClient:
         verbose=False,
         default_priority=Priority.local,
         create_account=True,
+        max_upload_workers=DEFAULT_MAX_UPLOAD_WORKERS,
+        max_upload_memory=DEFAULT_MAX_UPLOAD_MEMORY,
+        file_cache=None,
+        upload_record=None,
+        compression=None,
+        transports=None,
     ):
         self.verbose = verbose
         self.database_key = database_key if database_key is not None else self.generate_random_key()
@@ -50,6 +446,8 @@ class PodClient:
             version=version,
             auth_json=auth_json,
             verbose=verbose,
+            compression=compression,
+            transports=transports,
         )
 
         self.default_priority = Priority(default_priority)
@@ -60,6 +458,17 @@ class PodClient:
         self.api.test_connection()
         self.local_db = DB()
         self.registered_classes = dict()
+        self.uploads = UploadExecutor(
+            partial(self.upload_file, asyncFlag=False),
+            max_workers=max_upload_workers,
+            max_memory=max_upload_memory,
+        )
+        # Hashes of files uploaded to this Pod account, persisted if `upload_record` is a path
+        self.upload_record = UploadRecord(upload_record, scope=upload_scope(url, self.owner_key))
+        # Optional on-disk cache for `get_file`, a `FileCache` or the path of the cache
+        if file_cache is not None and not isinstance(file_cache, FileCache):
+            file_cache = FileCache(file_cache)
+        self.file_cache = file_cache
 
     @classmethod
     def from_local_keys(cls, path=DEFAULT_POD_KEY_PATH, **kwargs):
@@ -69,30 +478,20 @@ class PodClient:
             **kwargs,
         )
 
-    @staticmethod
-    def generate_random_key():
-        return "".join([str(random.randint(0, 9)) for i in range(64)])
-
     def create_account(self):
         try:
             self.api.create_account()
         except PodError as e:
             logger.warning(e)
 
-    def add_to_store(self, item: ItemBase, priority: Priority = None) -> ItemBase:
-        item.create_id_if_not_exists()
-        priority = priority if priority is not None else self.default_priority
-        return self.local_db.merge(item, priority)
-
-    def reset_local_db(self):
-        self.local_db = DB()
-
     def create(self, item):
         self.add_to_store(item)
         try:
-            result = self.api.create_item(item.to_json())
-            item.id = result
+            response = self.api.bulk(
+                create_items=[item.to_json()], search=[timestamp_query(item.id)]
+            )
             item.reset_local_sync_state()
+            self._set_server_timestamps([item], {item.id: server_timestamp(response)})
             # try:
             #     res= getattr(item, "requires_client_ref", False)
             # except Exception:
@@ -146,29 +545,104 @@ class PodClient:
         else:
             raise ValueError(f"Unknown image data type {type(img)}")
 
-    def upload_file(self, file, asyncFlag=True, callback=None):
+    def upload_file(self, file: FileData, asyncFlag=True, callback=None, sha=None):
+        """
+        Uploads `file`: bytes, a path or a binary file object, see `PodAPI.upload_file`.
+        Files in `upload_record` are not uploaded again.
+        """
         if asyncFlag:
-            return self.upload_file_async(file, callback=callback)
-        try:
-            self.api.upload_file(file)
+            return self.upload_file_async(file, callback=callback, sha=sha)
+        if sha is None:
+            sha = file_sha256(file)
+        if sha in self.upload_record:
             return True
+        try:
+            self.api.upload_file(file, sha=sha)
         except PodError as e:
             # 409 = CONFLICT, file already exists
-            if e.status == 409:
-                return True
-            return False
+            if e.status != 409:
+                return False
+        self.upload_record.add(sha)
+        return True
 
-    def upload_file_async(self, file, callback=None):
-        def thread_fn(file, callback):
-            result = self.upload_file(file, asyncFlag=False)
-            if callback:
-                callback(result)
+    def upload_file_async(self, file, callback=None, sha=None) -> "Future[bool]":
+        """
+        Uploads `file` on the upload executor of this client, see `PodClient.uploads`.
+        Blocks while the pending uploads exceed the upload memory budget. Only bytes count
+        towards the memory budget, paths and file objects are streamed from disk.
+
+        Returns:
+            Future[bool]: resolves to the result of the upload
+        """
+        size = len(file) if isinstance(file, bytes) else 0
+        return self.uploads.submit(file, size=size, callback=callback, sha=sha)
+
+    def upload_files(
+        self, files: List[FileData], check_pod: bool = True, batch_size: int = 100
+    ) -> List["Future[bool]"]:
+        """
+        Uploads `files` on the upload executor, skipping files that are already uploaded.
+
+        Files are skipped if they are in `upload_record`, or with `check_pod`, if the Pod
+        already has them. The Pod is checked for `batch_size` files at a time, before
+        these files are uploaded.
+
+        Returns:
+            List[Future[bool]]: the result of the upload of each file
+        """
+        futures = []
+        n_skipped = 0
+        for i in range(0, len(files), batch_size):
+            batch = files[i : i + batch_size]
+            shas = [file_sha256(file) for file in batch]
+            if check_pod:
+                unknown = [sha for sha in shas if sha not in self.upload_record]
+                if unknown:
+                    try:
+                        self.upload_record.update(self.api.files_exist(unknown))
+                    except PodError as e:
+                        # Files that could not be checked are uploaded, existing files are skipped
+                        # by the Pod
+                        logger.warning(f"UPLOAD: Could not check which files the Pod has: {e}")
+            for file, sha in zip(batch, shas):
+                if sha in self.upload_record:
+                    future = Future()
+                    future.set_result(True)
+                    futures.append(future)
+                    n_skipped += 1
+                else:
+                    futures.append(self.upload_file_async(file, sha=sha))
+        logger.debug(f"UPLOAD: {n_skipped}/{len(files)} files are already uploaded")
+        return futures
 
-        Thread(target=thread_fn, args=(file, callback)).start()
-        return True
+    def flush_uploads(self, timeout=None) -> bool:
+        """Waits for all pending async uploads. Returns `True` if all uploads succeeded."""
+        return self.uploads.flush(timeout=timeout)
 
     def get_file(self, sha):
-        return self.api.get_file(sha)
+        if self.file_cache is None:
+            return self.api.get_file(sha)
+        return self.file_cache.read(sha, partial(self.api.download_file, sha))
+
+    def open_file(self, sha: str) -> Optional[mmap.mmap]:
+        """
+        Returns a read-only memory map of the file with hash `sha` from the file cache,
+        downloading the file on a cache miss. Requires a `file_cache`.
+        """
+        if self.file_cache is None:
+            raise ValueError("open_file requires a PodClient with a file_cache")
+        return self.file_cache.open(sha, partial(self.api.download_file, sha))
+
+    def download_file(self, sha: str, out, verify: bool = True) -> int:
+        """
+        Streams the file with hash `sha` into `out`: a path, a binary file object or a writable
+        buffer, see `PodAPI.download_file`. Returns the number of bytes written.
+        """
+        return self.api.download_file(sha, out, verify=verify)
+
+    def read_file_range(self, sha: str, start: int, length: int) -> bytes:
+        """Returns `length` bytes of the file with hash `sha` from byte `start`."""
+        return self.api.read_file_range(sha, start, length)
 
     def get_photo(self, id, size=640):
         photo = self.get(id)
@@ -197,6 +671,97 @@ class PodClient:
         existing = self.search({"externalId": item.externalId})
         return len(existing) > 0
 
+    def upsert_many(
+        self,
+        items: List[ItemBase],
+        batch_size: int = 1000,
+        max_in_flight: Optional[int] = 4,
+        **bulk_kwargs,
+    ) -> BulkResult:
+        """
+        Creates `items` that are not in the Pod and updates the items that are, by `externalId`.
+
+        An item exists if an item of the same type with the same `externalId` is in the Pod.
+        External ids are resolved in the local DB first, the remaining ids are searched in chunks
+        of `batch_size` with a single bulk search per chunk. All creates and updates are written
+        with one pipelined `bulk_action`, `bulk_kwargs` are passed to `bulk_action`.
+        Existing items are updated with all their properties, and get the id of the Pod item.
+        Items without `externalId` are always created. If multiple items have the same type
+        and `externalId`, only the last one is written.
+        If a search for existing items fails, the items in that chunk are not written, and are
+        reported as a failed batch in the result.
+
+        Returns:
+            BulkResult: the result of the bulk action
+        """
+        by_external_id: Dict[Tuple[str, str], ItemBase] = {}
+        create_items = []
+        for item in items:
+            if item.externalId is None:
+                create_items.append(item)
+                continue
+            key = (type(item).__name__, item.externalId)
+            if key in by_external_id:
+                logger.warning(f"UPSERT: Skipping item with duplicate externalId {key}")
+            by_external_id[key] = item
+
+        existing_ids = {}
+        unresolved = []
+        for key, item in by_external_id.items():
+            local_items = [
+                i for i in self.local_db.find(type=key[0], externalId=key[1]) if i._in_pod
+            ]
+            if local_items:
+                existing_ids[key] = local_items[0].id
+            else:
+                unresolved.append(key)
+
+        failed = []
+        for i in range(0, len(unresolved), batch_size):
+            chunk = unresolved[i : i + batch_size]
+            queries = [{"type": type_name, "externalId": ext_id} for type_name, ext_id in chunk]
+            try:
+                result = self.api.bulk(search=queries)["search"]
+            except PodError as e:
+                logger.error(f"UPSERT: Could not search {len(chunk)} items: {e}")
+                chunk_items = [by_external_id.pop(key) for key in chunk]
+                batcher = BulkBatcher(codec=self.api.codec)
+                payloads = (item.to_json(datetime_to_timestamp=False) for item in chunk_items)
+                failed.extend(
+                    BatchResult(batch, error=e) for batch in batcher.batches(create_items=payloads)
+                )
+                continue
+            for key, page in zip(chunk, result):
+                if page:
+                    existing_ids[key] = page[0]["id"]
+
+        update_items = []
+        for key, item in by_external_id.items():
+            if key not in existing_ids:
+                create_items.append(item)
+                continue
+            if item.id != existing_ids[key]:
+                # The item can be in local_db under its generated id
+                self.local_db.remove(item)
+                item.id = existing_ids[key]
+            local_item = self.local_db.get(item.id)
+            if local_item is None:
+                self.local_db.add(item)
+            elif local_item is not item:
+                self.local_db._merge_item(local_item, item, Priority.remote)
+            update_items.append(item)
+
+        logger.info(f"UPSERT: creating {len(create_items)} and updating {len(update_items)} items")
+        result = self.bulk_action(
+            create_items=create_items,
+            update_items=update_items,
+            partial_update=False,
+            max_in_flight=max_in_flight,
+            **bulk_kwargs,
+        )
+        result.batches[:0] = failed
+        return result
+
     def create_edges(self, edges):
         return self.bulk_action(create_edges=edges)
 
@@ -213,31 +778,24 @@ class PodClient:
             return False
 
     def delete_file(self, id):
+        """Deletes the File item with id `id` and its data, such that it can be uploaded again."""
+        file = self.local_db.get(id)
+        try:
+            sha = (
+                getattr(file, "sha256", None)
+                if file is not None
+                else self.api.get_item(id)[0].get("sha256")
+            )
+        except (PodError, IndexError):
+            sha = None
         try:
             self.api.delete_file(id)
-            return True
         except PodError as e:
             logger.warning(f"Could not delete file {id}: {e}")
             return False
-
-    @staticmethod
-    def gather_batch(items, start_idx, start_size=0, max_size=5000000):
-        idx = start_idx
-        total_size = start_size
-        batch_items = []
-        for i, x in enumerate(items):
-            if i < idx:
-                continue
-            elif len(str(x)) > max_size:
-                idx = i + 1
-                logger.error("Could not add item: Item exceeds max item size")
-            elif total_size + len(str(x)) < max_size:
-                batch_items.append(x)
-                total_size += len(str(x))
-                idx = i + 1
-            else:
-                break
-        return batch_items, idx, total_size
+        if sha is not None:
+            self.upload_record.discard(sha)
+        return True
 
     def bulk_action(
         self,
@@ -247,103 +805,185 @@ class PodClient:
         delete_items=None,
         partial_update=True,
         priority=None,
+        max_in_flight=None,
+        retries=0,
+        retry_backoff=1.0,
+        split_failed=False,
+        checkpoint=None,
     ):
+        """
+        Create, update and delete items and create edges in batched requests to the Pod.
+
+        By default batches are sent one at a time, and the bulk action is aborted
+        on the first failed batch. With `max_in_flight=N`, up to N batches are sent
+        concurrently while the next batches are being serialized. Failed batches do
+        not abort the bulk action in this mode, see `BulkResult.batches`.
+        In both modes, edges are only sent after all batches with created items are written,
+        edges from or to items that could not be created are not sent.
+
+        Failed batches are retried up to `retries` times on transient errors, waiting
+        `retry_backoff * 2 ** attempt` seconds in between. With `split_failed`, batches
+        that fail on other errors are split in halves to isolate the payloads that cannot
+        be written, and these failures do not abort the bulk action.
+        See `BulkResult.committed` and `BulkResult.failed`.
+
+        If `checkpoint` is a path, written payloads are recorded in that file, and payloads
+        recorded by a previous interrupted run are skipped. The file is removed once all
+        batches are written. Items are identified by their id, created items without id
+        need an `externalId`: they get the id that is recorded for it in the checkpoint.
+
+        Returns:
+            BulkResult: per-batch results, evaluates to `True` if all batches were written.
+        """
         priority = Priority(priority) if priority else None
-
-        all_items = []
-        if create_items:
-            all_items += create_items
-        if update_items:
-            all_items += update_items
-
-        # we need to add to local_db to not lose reference.
-        if create_items is not None:
-            for c in create_items:
-                try:
-                    res = getattr(c, "requires_client_ref", False)
-                except Exception:
-                    pass
-                finally:
-                    res = False
-                if res:
-                    c._client = self
-                if not self.local_db.contains(c):
-                    self.add_to_store(c, priority=priority)
-
-        create_items = [item.to_json() for item in create_items] if create_items is not None else []
-        update_items = (
-            [self.get_update_dict(i, partial_update=partial_update) for i in update_items]
-            if update_items is not None
-            else []
-        )
-        create_edges = (
-            [self.get_create_edge_dict(i) for i in create_edges] if create_edges is not None else []
+        checkpoint = BulkCheckpoint(checkpoint) if checkpoint is not None else None
+        batcher = BulkBatcher(checkpoint=checkpoint, codec=self.api.codec, with_timestamp=True)
+        batches, n_total = self._prepare_bulk_action(
+            batcher,
+            create_items,
+            update_items,
+            create_edges,
+            delete_items,
+            partial_update,
+            priority,
         )
-
-        # Note: skip delete_items without id, as items that are not in pod cannot be deleted
-        delete_items = (
-            [item.id for item in delete_items if item.id is not None]
-            if delete_items is not None
-            else []
+        send = partial(
+            self._send_batch,
+            retries=retries,
+            retry_backoff=retry_backoff,
+            split_failed=split_failed,
+            checkpoint=checkpoint,
         )
+        if max_in_flight is None:
+            result = self._send_batches(batches, n_total, send, abort_on_error=not split_failed)
+        else:
+            result = self._send_batches_pipelined(batches, n_total, send, max_in_flight)
 
-        n_total = len(create_items + update_items + create_edges + delete_items)
-        n = 0
-
-        i_ci, i_ui, i_ce, i_di = 0, 0, 0, 0
-        while not (
-            i_ci == len(create_items)
-            and i_ui == len(update_items)
-            and i_ce == len(create_edges)
-            and i_di == len(delete_items)
-        ):
-            batch_size = 0
-            create_items_batch, i_ci, batch_size = self.gather_batch(
-                create_items, i_ci, start_size=batch_size
-            )
-            update_items_batch, i_ui, batch_size = self.gather_batch(
-                update_items, i_ui, start_size=batch_size
-            )
-            delete_items_batch, i_di, batch_size = self.gather_batch(
-                delete_items, i_di, start_size=batch_size
-            )
-            if i_ci == len(create_items):
-                create_edges_batch, i_ce, batch_size = self.gather_batch(
-                    create_edges, i_ce, start_size=batch_size
-                )
-            else:
-                create_edges_batch = []
-            n_batch = len(
-                create_items_batch + update_items_batch + create_edges_batch + delete_items_batch
-            )
-            n += n_batch
-            logger.info(f"BULK: Writing {n}/{n_total} items/edges")
+        self._complete_bulk_action(result, batcher, create_items, update_items, create_edges)
+        return result
 
+    def _send_batch(
+        self,
+        batch: BulkBatch,
+        retries: int = 0,
+        retry_backoff: float = 1.0,
+        split_failed: bool = False,
+        checkpoint: Optional[BulkCheckpoint] = None,
+    ) -> List[BatchResult]:
+        error = None
+        response = None
+        for attempt in range(retries + 1):
+            if attempt > 0:
+                logger.warning(f"BULK: Retrying batch of {len(batch)} after error: {error}")
+                time.sleep(retry_backoff * 2 ** (attempt - 1))
             try:
-                result = self.api.bulk(
-                    create_items_batch,
-                    update_items_batch,
-                    create_edges_batch,
-                    delete_items_batch,
+                response = self.api.bulk_encoded(batch.to_bytes())
+                error = None
+                break
+            except (
+                PodError,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                error = e
+                if isinstance(e, PodError) and not e.is_transient:
+                    break
+
+        if error is None:
+            if checkpoint is not None:
+                checkpoint.commit(batch)
+            return [BatchResult(batch, timestamp=server_timestamp(response))]
+
+        is_transient = not isinstance(error, PodError) or error.is_transient
+        if split_failed and len(batch) > 1 and not is_transient:
+            return [
+                batch_result
+                for half in batch.split()
+                for batch_result in self._send_batch(
+                    half, retries, retry_backoff, split_failed, checkpoint
                 )
-            except PodError as e:
-                logger.error(f"could not complete bulk action {e}, aborting")
-                return False
-        logger.info(f"Completed Bulk action, written {n} items/edges")
+            ]
+        return [BatchResult(batch, error=error)]
 
-        for item in all_items:
-            item.reset_local_sync_state()
-        return True
+    def _send_batches(
+        self,
+        batches: Iterable[BulkBatch],
+        n_total: int,
+        send: Callable[[BulkBatch], List[BatchResult]],
+        abort_on_error: bool = True,
+    ) -> BulkResult:
+        result = BulkResult()
+        failed = None
+        n = 0
+        for batch in batches:
+            n += len(batch)
+            if batch.payloads[CREATE_EDGES]:
+                # Edges from or to items that could not be created are not sent
+                if failed is None:
+                    failed = failed_created_items(result.batches)
+                batch, dropped = drop_failed_edges(batch, failed)
+                result.add_dropped(dropped)
+                if not len(batch):
+                    continue
+            logger.info(f"BULK: Writing {n}/{n_total} items/edges")
 
-    def get_create_edge_dict(self, edge):
-        return {
-            "_source": edge.source.id,
-            "_target": edge.target.id,
-            "_name": edge.name,
-        }
+            batch_results = send(batch)
+            result.batches.extend(batch_results)
+            for batch_result in batch_results:
+                if not batch_result.success:
+                    logger.error(
+                        f"could not write batch of {len(batch_result.batch)}: {batch_result.error}"
+                    )
+            if abort_on_error and not result.success:
+                logger.error("could not complete bulk action, aborting")
+                result.aborted = True
+                break
+        return result
 
-    def get_delete_edge_dict(self, edge):
-        return {"_source": edge.source.id, "_target": edge.target.id, "_name": edge.name}
+    def _send_batches_pipelined(
+        self,
+        batches: Iterable[BulkBatch],
+        n_total: int,
+        send: Callable[[BulkBatch], List[BatchResult]],
+        max_in_flight: int,
+    ) -> BulkResult:
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight should be at least 1, got {max_in_flight}")
+
+        futures = []
+        pending = set()
+        failed = None
+        dropped = []
+        n = 0
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for batch in batches:
+                n += len(batch)
+                if batch.payloads[CREATE_EDGES]:
+                    if failed is None:
+                        # Edges can only be created after all their items exist
+                        wait(pending)
+                        pending = set()
+                        results = [res for future in futures for res in future.result()]
+                        failed = failed_created_items(results)
+                    batch, batch_dropped = drop_failed_edges(batch, failed)
+                    dropped.extend(batch_dropped)
+                    if not len(batch):
+                        continue
+                if len(pending) >= max_in_flight:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                logger.info(f"BULK: Writing {n}/{n_total} items/edges")
+                future = executor.submit(send, batch)
+                futures.append(future)
+                pending.add(future)
+
+        result = BulkResult([res for future in futures for res in future.result()])
+        result.add_dropped(dropped)
+        for batch_result in result.failed_batches:
+            logger.error(
+                f"could not write batch of {len(batch_result.batch)}: {batch_result.error}"
+            )
+        return result
 
     def create_edge(self, edge):
         edge_dict = self.get_create_edge_dict(edge)
@@ -364,6 +1004,42 @@ class PodClient:
             raise ValueError(f"Item with id {id} does not exist")
         return res
 
+    def get_many(
+        self, ids: Iterable[str], expanded: bool = True, batch_size: int = 1000
+    ) -> List[ItemBase]:
+        """
+        Returns the items with `ids` in the same order, fetched in bulk searches of `batch_size`
+        ids instead of one `get` per item. If `expanded`, the items include their edges.
+
+        Items are merged into `local_db`, an item that is already in `local_db`
+        is returned as the same object.
+
+        Raises:
+            ValueError: if any of the items do not exist.
+        """
+        ids = [str(id) for id in ids]
+        unique_ids = list(dict.fromkeys(ids))
+        extra_fields = {"[[edges]]": {}} if expanded else {}
+
+        items = {}
+        hydrated = {}
+        for i in range(0, len(unique_ids), batch_size):
+            queries = [{"id": id, **extra_fields} for id in unique_ids[i : i + batch_size]]
+            try:
+                response = self.api.bulk(search=queries)["search"]
+            except PodError as e:
+                logger.error(e)
+                continue
+            for page in response:
+                for item_json in page:
+                    item = self._item_from_search(item_json, hydrated=hydrated)
+                    items[item.id] = item
+
+        missing = [id for id in unique_ids if id not in items]
+        if missing:
+            raise ValueError(f"Items with ids {missing} do not exist")
+        return [items[id] for id in ids]
+
     def _get_item_expanded(self, id):
         item = self._get_item_with_properties(id)
         edges = self.get_edges(id)
@@ -371,7 +1047,7 @@ class PodClient:
             return None
         for e in edges:
             if e["name"] in item.edges:
-                item.add_edge(e["name"], e["item"])
+                item._add_synced_edge(e["name"], e["item"])
             else:
                 logger.debug(f"Could not add edge {e['name']}: Edge is not defined on Item.")
         return item
@@ -400,19 +1076,12 @@ class PodClient:
             logger.error(e)
             return
 
-    def get_update_dict(self, item: ItemBase, partial_update: bool = True):
-        properties = item.property_dict()
-        if partial_update:
-            properties = {
-                k: v for k, v in properties.items() if k == "id" or k in item._updated_properties
-            }
-        return properties
-
     def update_item(self, item, partial_update=True):
         data = self.get_update_dict(item, partial_update=partial_update)
         try:
-            self.api.update_item(data)
+            response = self.api.bulk(update_items=[data], search=[timestamp_query(item.id)])
             item.reset_local_sync_state()
+            self._set_server_timestamps([item], {item.id: server_timestamp(response)})
             return True
         except PodError as e:
             logger.error(e)
@@ -435,6 +1104,7 @@ class PodClient:
         include_edges=True,
         add_to_local_db: bool = True,
         priority=None,
+        prefetch_pages: bool = True,
     ):
         priority = Priority(priority) if priority else None
 
@@ -447,7 +1117,7 @@ class PodClient:
         query = {**fields_data, **extra_fields}
 
         try:
-            for page in self.api.search_paginate(query, limit):
+            for page in self.api.search_paginate(query, limit, prefetch_pages=prefetch_pages):
                 result = [
                     self._item_from_search(item, add_to_local_db=add_to_local_db, priority=priority)
                     for item in page
@@ -456,6 +1126,58 @@ class PodClient:
         except PodError as e:
             logger.error(e)
 
+    def changes_since(
+        self,
+        watermark: Union[Watermark, str, Path, datetime, int, None] = None,
+        fields_data: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        include_edges: bool = True,
+        add_to_local_db: bool = True,
+        priority=None,
+        prefetch_pages: bool = True,
+    ) -> Generator[List[ItemBase], None, None]:
+        """
+        Yields pages of items matching `fields_data`, created or modified since `watermark`.
+
+        `watermark` is a `Watermark`, a path to a watermark file, a datetime or a timestamp in
+        milliseconds. If `None`, all items are returned. The watermark is advanced past a page once
+        the caller requests the next page, and saved if it has a path. A plugin that passes the same
+        watermark file on every run therefore only receives the items changed since its last run.
+
+        Items are merged into `local_db` according to `priority`, as in `search`.
+        """
+        priority = Priority(priority) if priority else None
+
+        if isinstance(watermark, (str, Path)):
+            watermark = Watermark.from_file(watermark)
+        elif isinstance(watermark, datetime):
+            watermark = Watermark.from_datetime(watermark)
+        elif not isinstance(watermark, Watermark):
+            watermark = Watermark(timestamp=watermark)
+
+        fields_data = fields_data or {}
+        if any(key.startswith("dateServerModified") or key == "_limit" for key in fields_data):
+            raise ValueError("Cannot get changes for a query that contains a date or limit.")
+        extra_fields = {"[[edges]]": {}} if include_edges else {}
+        query = {**fields_data, **extra_fields}
+
+        pages = keyset_pages(
+            self.api.search, query, limit, start=watermark.timestamp, exclude=watermark.ids
+        )
+        if prefetch_pages:
+            pages = prefetch(pages)
+
+        try:
+            for page in pages:
+                yield [
+                    self._item_from_search(item, add_to_local_db=add_to_local_db, priority=priority)
+                    for item in page
+                ]
+                watermark.advance(page)
+                watermark.save()
+        except PodError as e:
+            logger.error(e)
+
     T = TypeVar("T", bound=ItemBase)
 
     def search_typed(
@@ -482,8 +1204,41 @@ class PodClient:
         include_edges: bool = True,
         add_to_local_db: bool = True,
         priority=None,
+        edges: Optional[List[str]] = None,
+        properties: Optional[List[str]] = None,
+        depth: Optional[int] = None,
+        lazy: bool = False,
+        read_only: bool = False,
+        batch: bool = False,
     ):
+        """
+        Returns the items that match `fields_data`, with all their edges if `include_edges`.
+
+        `edges`, `properties` and `depth` limit the edges and properties that are loaded,
+        see `graphql_utils.search_query`. For example, to load only the subjects of all messages
+        and the handles of their senders:
+            client.search({"type": "EmailMessage"}, properties=["subject", "sender.handle"])
+        Unselected properties are not loaded, and not merged into `local_db`.
+
+        For large results, `lazy` returns a `LazyItems` that creates each item when it is
+        first accessed, and `read_only` returns `ItemView`s that read the Pod JSON
+        without creating items or adding them to `local_db`. With `batch`, the results
+        are returned as one `ItemBatch`, this requires a `type` in `fields_data`.
+        """
         priority = Priority(priority) if priority else None
+        batch_type = self._batch_type(fields_data, batch)
+        if edges is not None or properties is not None or depth is not None:
+            return self._search_projected(
+                fields_data,
+                edges,
+                properties,
+                depth,
+                add_to_local_db,
+                priority,
+                lazy,
+                read_only,
+                batch_type,
+            )
 
         extra_fields = {"[[edges]]": {}} if include_edges else {}
         query = {**fields_data, **extra_fields}
@@ -506,32 +1261,40 @@ class PodClient:
             except PodError as e:
                 logger.error(e)
 
-        result = [
-            self._item_from_search(item, add_to_local_db=add_to_local_db, priority=priority)
-            for item in result
-        ]
-        return result
-
-    def _item_from_search(self, item_json: dict, add_to_local_db: bool = True, priority=None):
-        # search returns different fields w.r.t. edges compared to `get` api,
-        # different method to keep `self.get` clean.
-        item = self.item_from_json(item_json, add_to_local_db=add_to_local_db, priority=priority)
-        item.reset_local_sync_state()
+        hydrate = partial(
+            self._item_from_search, add_to_local_db=add_to_local_db, priority=priority, hydrated={}
+        )
+        return self._search_result(
+            result, hydrate, lazy=lazy, read_only=read_only, batch_type=batch_type
+        )
 
-        for edge_json in item_json.get("[[edges]]", []):
-            edge_name = edge_json["_edge"]
-            try:
-                edge_item = self.item_from_json(
-                    edge_json["_item"],
-                    add_to_local_db=add_to_local_db,
-                    priority=priority,
-                )
-                edge_item.reset_local_sync_state()
-                item.add_edge(edge_name, edge_item)
-            except Exception as e:
-                logger.error(f"Could not attach edge {edge_json['_item']} to {item}, {e}")
-                continue
-        return item
+    def _search_projected(
+        self,
+        fields_data: Dict[str, Any],
+        edges: Optional[List[str]],
+        properties: Optional[List[str]],
+        depth: Optional[int],
+        add_to_local_db: bool,
+        priority: Optional[Priority],
+        lazy: bool = False,
+        read_only: bool = False,
+        batch_type: Optional[str] = None,
+    ) -> List[ItemBase]:
+        query = self._projected_search_query(fields_data, edges, properties, depth)
+        try:
+            response = self.api.graphql(query)
+        except PodError as e:
+            logger.error(e)
+            return []
+        hydrate = partial(
+            self._item_from_graphql,
+            add_to_local_db=add_to_local_db,
+            priority=priority,
+            partial=True,
+        )
+        return self._search_result(
+            response["data"], hydrate, lazy=lazy, read_only=read_only, batch_type=batch_type
+        )
 
     def search_last_added(self, type=None, with_prop=None, with_val=None):
         query = {"_limit": 1, "_sortOrder": "Desc"}
@@ -541,39 +1304,6 @@ class PodClient:
             query[f"{with_prop}=="] = with_val
         return self.search(query)[0]
 
-    def item_from_json(
-        self,
-        json: dict,
-        add_to_local_db: bool = True,
-        priority=None,
-    ) -> ItemBase:
-        priority = Priority(priority) if priority else None
-
-        item_class = get_schema_cls(
-            json["type"],
-            extra=self.registered_classes,
-        )
-
-        new_item = item_class.from_json(json)
-        if add_to_local_db:
-            try:
-                new_item = self.add_to_store(new_item, priority=priority)
-            except Exception as e:
-                logger.error(f"Could not add {new_item} to local db, {e}")
-
-        if hasattr(new_item, "requires_client_ref") and new_item.requires_client_ref:
-            new_item._client = self
-        return new_item
-
-    def _item_from_graphql(self, data):
-        item = self.item_from_json(data)
-        for prop in item.edges:
-            if prop in data:
-                for edge in data[prop]:
-                    edge_item = self._item_from_graphql(edge)
-                    item.add_edge(prop, edge_item)
-        return item
-
     def search_graphql(
         self, query: Union[str, GQLQuery], variables: Optional[Dict[str, Any]] = None
     ) -> List[ItemBase]:
@@ -595,22 +1325,28 @@ class PodClient:
             return False
 
     def sync(self, priority: str = Priority.newest):
+        """
+        Writes local changes in `local_db` to the Pod: new items, updated properties and new edges.
+
+        Only items with local changes are synced, see `DB.dirty`. Before writing, updated items
+        that are modified in the Pod since they were loaded are merged into the local items,
+        according to `priority`.
+        """
         priority = Priority(priority) if priority else None
-        all_items = list(self.local_db.nodes.values())
         all_ids = set(self.local_db.nodes.keys())
 
         create_items = []
         update_items = []
         create_edges = []
 
-        # Add items from sync store
-        for item in all_items:
+        # Add items with local changes from sync store
+        for item in self.local_db.get_dirty():
             if isinstance(item, File) or isinstance(item, Photo):
                 continue
-            if item._in_pod:
-                update_items.append(item)
-            else:
+            if not item._in_pod:
                 create_items.append(item)
+            elif item._updated_properties:
+                update_items.append(item)
 
             # Add all edges where src and tgt exist
             for edge in item._new_edges:
@@ -621,8 +1357,9 @@ class PodClient:
                         f"Could not sync `{edge.name}` for {item}: edge target missing in sync."
                     )
 
-        update_ids = [item.id for item in update_items]
-        existing_items = self.search({"ids": update_ids}, add_to_local_db=True, priority=priority)
+        for remote_item in self._get_remote_changes(update_items):
+            local_item = self.local_db.get(remote_item.id)
+            self.local_db._merge_item(local_item, remote_item, priority)
 
         return self.bulk_action(
             create_items=create_items,
@@ -631,6 +1368,36 @@ class PodClient:
             priority=priority,
         )
 
+    def _get_remote_changes(self, items: List[ItemBase], batch_size: int = 1000) -> List[ItemBase]:
+        """
+        Returns the Pod version of all `items` that are modified in the Pod after their local copy.
+
+        Unchanged items are filtered out by the Pod, by searching with a `dateServerModified`
+        after the local `dateServerModified`. Only items that changed are downloaded.
+        """
+        queries = []
+        for item in items:
+            query = {"id": item.id, "[[edges]]": {}}
+            local_dsm = getattr(item, "dateServerModified", None)
+            if local_dsm is not None:
+                query["dateServerModified>="] = ItemBase._datetime_to_timestamp(local_dsm) + 1
+            queries.append(query)
+
+        result = []
+        for i in range(0, len(queries), batch_size):
+            try:
+                response = self.api.bulk(search=queries[i : i + batch_size])["search"]
+            except PodError as e:
+                logger.error(e)
+                continue
+            result.extend(
+                self._item_from_search(item_json, add_to_local_db=False)
+                for page in response
+                for item_json in page
+            )
+        logger.debug(f"SYNC: {len(result)}/{len(items)} updated items are modified in the Pod")
+        return result
+
     def get_dataset(self, name):
         datasets = self.search({"type": "Dataset", "name": name})
         if len(datasets) == 0:
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _datetime_to_timestamp(dt: datetime) -> int:
+    """Pod timestamp format, see `ItemBase._datetime_to_timestamp`"""
+    return round(dt.timestamp() * 1000)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return _datetime_to_timestamp(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    """
+    Encodes and decodes the JSON bodies of Pod requests and responses.
+    `datetime` values are encoded as Pod timestamps, in milliseconds since epoch.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """`JSONCodec` using orjson, which encodes directly to bytes."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError(
+                "orjson is not installed. "
+                "Please install orjson (pip install pymemri[orjson]) to use OrjsonCodec."
+            )
+        self._option = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._option)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+CODECS = {JSONCodec.name: JSONCodec, OrjsonCodec.name: OrjsonCodec}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Returns the codec with `name`. By default, the fastest codec that is installed:
+    orjson if available, else the standard library `json` module.
+    """
+    if name is None:
+        name = OrjsonCodec.name if orjson is not None else JSONCodec.name
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec {name}, choose from {list(CODECS)}")
+    return CODECS[name]()
+
+
+DEFAULT_CODEC = get_codec()
@@ -0,0 +1,101 @@
+import gzip
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# Request bodies smaller than this are sent uncompressed
+DEFAULT_COMPRESSION_THRESHOLD = 16 * 2**10
+
+
+def available_encodings() -> List[str]:
+    return [GZIP, ZSTD] if zstandard is not None else [GZIP]
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=level if level is not None else 6)
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise ImportError(
+                "zstandard is not installed. Please install zstandard (pip install pymemri[zstd])"
+            )
+        return zstandard.ZstdCompressor(level=level if level is not None else 3).compress(data)
+    raise ValueError(f"Unknown encoding {encoding}, choose from {available_encodings()}")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.decompress(data)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unknown encoding {encoding}")
+
+
+@dataclass
+class CompressionStats:
+    n_compressed: int = 0
+    request_bytes: int = 0
+    request_bytes_sent: int = 0
+    response_bytes: int = 0
+    response_bytes_received: int = 0
+
+    @property
+    def request_ratio(self) -> float:
+        """Size of compressed request bodies before compression, divided by the size after"""
+        return self.request_bytes / self.request_bytes_sent if self.request_bytes_sent else 1.0
+
+    @property
+    def response_ratio(self) -> float:
+        """Size of compressed responses after decompression, divided by the size received"""
+        if not self.response_bytes_received:
+            return 1.0
+        return self.response_bytes / self.response_bytes_received
+
+
+class Compression:
+    """
+    Compresses request bodies of at least `threshold` bytes with `encoding` (gzip or zstd).
+
+    Responses are decompressed by the HTTP client, `stats` keeps the compression ratio
+    of requests and responses.
+    """
+
+    def __init__(
+        self,
+        encoding: str = GZIP,
+        threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        level: Optional[int] = None,
+    ) -> None:
+        if encoding not in available_encodings():
+            raise ValueError(
+                f"Compression {encoding} is not available, choose from {available_encodings()}"
+            )
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+        self._lock = Lock()
+
+    def compress_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Returns the body to send, and the headers to add to the request."""
+        if len(body) < self.threshold:
+            return body, {}
+        compressed = compress(body, self.encoding, self.level)
+        with self._lock:
+            self.stats.n_compressed += 1
+            self.stats.request_bytes += len(body)
+            self.stats.request_bytes_sent += len(compressed)
+        return compressed, {"Content-Encoding": self.encoding}
+
+    def record_response(self, size: int, size_received: int) -> None:
+        with self._lock:
+            self.stats.response_bytes += size
+            self.stats.response_bytes_received += size_received
@@ -1,4 +1,7 @@
+import weakref
+from collections import defaultdict
 from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Set, Type, Union
 
 from loguru import logger
 
@@ -13,8 +16,25 @@ class Priority(Enum):
 
 
 class DB:
-    def __init__(self):
+    """
+    Local database of items, by id.
+
+    Items are indexed by type and by the values of indexed properties, to find items without
+    scanning all nodes, see `DB.find`. `externalId` is always indexed, other properties can be
+    indexed with `indexed_properties` or `DB.add_index`.
+    Indexes are updated when items are added, merged or when an indexed property is set.
+    """
+
+    def __init__(self, indexed_properties: Iterable[str] = ()):
         self.nodes = dict()
+        # ids of nodes with local changes, see `ItemBase._is_dirty`
+        self.dirty = set()
+        # type name -> ids of nodes
+        self.type_index: Dict[str, Set[str]] = defaultdict(set)
+        # property -> value -> ids of nodes
+        self.property_index: Dict[str, Dict[Any, Set[str]]] = dict()
+        for prop in ("externalId", *indexed_properties):
+            self.add_index(prop)
 
     def add(self, node):
         id = node.id
@@ -22,7 +42,109 @@ class DB:
             logger.error(
                 f"Error trying to add node, but node with with id: {id} is already in database"
             )
+            self._remove_from_indexes(self.nodes[id])
         self.nodes[id] = node
+        # Items only hold a weak reference, such that they can be copied without the DB
+        node._db = weakref.ref(self)
+        self._add_to_indexes(node)
+        self.update_dirty(node)
+
+    def remove(self, node) -> None:
+        """Removes `node` from the DB and its indexes, if it is in the DB under its id."""
+        if self.nodes.get(node.id, None) is not node:
+            return
+        self._remove_from_indexes(node)
+        del self.nodes[node.id]
+        self.dirty.discard(node.id)
+        node._db = None
+
+    def update_dirty(self, node):
+        if node._is_dirty:
+            self.dirty.add(node.id)
+        else:
+            self.dirty.discard(node.id)
+
+    def get_dirty(self) -> List[Item]:
+        return [self.nodes[id] for id in self.dirty if id in self.nodes]
+
+    def add_index(self, prop: str) -> None:
+        """Index the values of property `prop` of all items, including items added later."""
+        if prop in self.property_index:
+            return
+        index = defaultdict(set)
+        for node in self.nodes.values():
+            value = getattr(node, prop, None)
+            if value is not None:
+                index[value].add(node.id)
+        self.property_index[prop] = index
+
+    def update_index(self, node, prop: str, prev_val: Any, value: Any) -> None:
+        """Move `node` from `prev_val` to `value` in the index of `prop`, if `prop` is indexed."""
+        index = self.property_index.get(prop, None)
+        if index is None or self.nodes.get(node.id, None) is not node:
+            return
+        if prev_val is not None:
+            self._discard(index, prev_val, node.id)
+        if value is not None:
+            index[value].add(node.id)
+
+    def _add_to_indexes(self, node) -> None:
+        self.type_index[type(node).__name__].add(node.id)
+        for prop, index in self.property_index.items():
+            value = getattr(node, prop, None)
+            if value is not None:
+                index[value].add(node.id)
+
+    def _remove_from_indexes(self, node) -> None:
+        self._discard(self.type_index, type(node).__name__, node.id)
+        for prop, index in self.property_index.items():
+            value = getattr(node, prop, None)
+            if value is not None:
+                self._discard(index, value, node.id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, id: str) -> None:
+        ids = index.get(key, None)
+        if ids is not None:
+            ids.discard(id)
+            if not ids:
+                del index[key]
+
+    def find(self, type: Optional[Union[str, Type[Item]]] = None, **props: Any) -> List[Item]:
+        """
+        Returns all items of `type` (a type name or class) with the given property values.
+
+        Filters on the type and indexed properties are hash lookups, other properties
+        are only compared for the items that match the indexed filters.
+
+        Example:
+            db.find(type="EmailMessage", externalId="<message-id>")
+        """
+        candidates: List[Set[str]] = []
+        if type is not None:
+            type_name = type if isinstance(type, str) else type.__name__
+            candidates.append(self.type_index.get(type_name, set()))
+
+        unindexed = {}
+        for prop, value in props.items():
+            index = self.property_index.get(prop, None)
+            if index is None or value is None:
+                unindexed[prop] = value
+            else:
+                candidates.append(index.get(value, set()))
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+            nodes = [self.nodes[id] for id in ids]
+        else:
+            nodes = list(self.nodes.values())
+
+        return [
+            node
+            for node in nodes
+            if all(getattr(node, prop, None) == value for prop, value in unindexed.items())
+        ]
 
     def get(self, id):
         res = self.nodes.get(id, None)
@@ -31,16 +153,23 @@ class DB:
     def contains(self, node):
         return node.id in self.nodes
 
-    def merge(self, node, priority):
+    def merge(self, node, priority, properties=None):
         if self.contains(node):
-            node = self._merge_item(self.get(node.id), node, priority)
+            node = self._merge_item(self.get(node.id), node, priority, properties)
         else:
             self.add(node)
         return node
 
-    def _merge_item(self, local_item: Item, remote_item: Item, priority: Priority) -> Item:
+    def _merge_item(
+        self,
+        local_item: Item,
+        remote_item: Item,
+        priority: Priority,
+        properties: Optional[Iterable[str]] = None,
+    ) -> Item:
         """
-        Merge the properties and edges of `remote_item` into `local_item`, according to `priority`
+        Merge the properties and edges of `remote_item` into `local_item`, according to `priority`.
+        If `properties` is given, only those properties are merged, for partially loaded items.
 
         Possible priorities:
         "newest": In case of a conflict, use the local property
@@ -54,7 +183,12 @@ class DB:
                 f"Trying to merge items of different types: {type(local_item)} and {type(remote_item)}"
             )
 
-        for prop in local_item.properties:
+        if properties is None:
+            properties = local_item.properties
+        else:
+            properties = set(properties)
+            properties = [prop for prop in local_item.properties if prop in properties]
+        for prop in properties:
             self._merge_property(local_item, remote_item, prop, priority)
 
         self._merge_edges(local_item, remote_item)
@@ -66,16 +200,16 @@ class DB:
         orig_val = local_item._original_properties.get(prop, None)
 
         if prop == "dateServerModified":
-            setattr(local_item, prop, remote_val)
+            local_item._set_synced_property(prop, remote_val)
             return
 
         # Property is not updated locally since last sync, always use remote
         if prop not in local_item._original_properties:
-            setattr(local_item, prop, remote_val)
+            local_item._set_synced_property(prop, remote_val)
 
         elif priority == Priority.newest:
             # Note: Pod does not have a DSM per property, so we compare against the Item DSM.
-            dateLocalModified = local_item._date_local_modified.get(prop, None)
+            dateLocalModified = local_item._local_modified_time(prop)
             if remote_val != orig_val and remote_item.dateServerModified > dateLocalModified:
                 setattr(local_item, prop, remote_val)
 
@@ -93,9 +227,13 @@ class DB:
             raise ValueError(f"Unknown sync priority: {priority}")
 
     def _merge_edges(self, local_item, remote_item):
-        for edge in local_item.edges:
-            local_edges = local_item.__edges__[edge]
-            remote_edges = remote_item.__edges__[edge]
-            local_edges.extend([edge for edge in remote_edges if edge not in local_edges])
-            for edge in local_edges:
+        for edge_name in local_item.edges:
+            local_edges = local_item.__edges__[edge_name]
+            target_ids = {edge.target.id for edge in local_edges if edge.target.id is not None}
+            for edge in remote_item.__edges__[edge_name]:
+                # Remote targets are copies, edges to targets the local item has are skipped
+                if edge.target.id in target_ids:
+                    continue
+                edge.target = self.nodes.get(edge.target.id, edge.target)
                 edge.source = local_item
+                local_item._add_edge_record(edge)
@@ -0,0 +1,154 @@
+import mmap
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Optional, Union
+
+from loguru import logger
+
+from .utils import PYMEMRI_FOLDER
+
+DEFAULT_FILE_CACHE_PATH = Path.home() / PYMEMRI_FOLDER / "file_cache"
+DEFAULT_FILE_CACHE_SIZE = 2**30
+# Downloads are written to temporary files with this prefix, and renamed once complete
+DOWNLOAD_PREFIX = ".download-"
+# Seconds after which a temporary download file that is not written to is removed on startup
+STALE_DOWNLOAD_AGE = 3600
+
+
+class FileCache:
+    """
+    On-disk cache of Pod files, by sha256.
+
+    Files are immutable by hash, so cached files are never invalidated. When the cache exceeds
+    `max_size` bytes, the least recently used files are removed. Files are stored at
+    `<path>/<sha[:2]>/<sha>`, the access order is kept by file modification time, so it persists
+    across processes. Temporary files of downloads that were interrupted more than
+    `STALE_DOWNLOAD_AGE` seconds ago are removed when the cache is opened.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_FILE_CACHE_PATH,
+        max_size: int = DEFAULT_FILE_CACHE_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        # sha -> size, in least recently used order
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self.path.mkdir(parents=True, exist_ok=True)
+        cached = []
+        now = time.time()
+        for p in self.path.glob("*/*"):
+            if not p.name.startswith("."):
+                if p.is_file():
+                    cached.append((p, p.stat()))
+            elif p.name.startswith(DOWNLOAD_PREFIX):
+                self._remove_stale_download(p, now)
+        for p, stat in sorted(cached, key=lambda p_stat: p_stat[1].st_mtime):
+            self._files[p.name] = stat.st_size
+        self.size = sum(self._files.values())
+
+    @staticmethod
+    def _remove_stale_download(path: Path, now: float) -> None:
+        # Recent temporary files can be downloads in progress of other processes sharing the cache
+        try:
+            if now - path.stat().st_mtime > STALE_DOWNLOAD_AGE:
+                path.unlink()
+                logger.debug(f"Removed interrupted download {path} from file cache")
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def file_path(self, sha: str) -> Path:
+        return self.path / sha[:2] / sha
+
+    def open(self, sha: str, download: Callable[[BinaryIO], Any]) -> Optional[mmap.mmap]:
+        """
+        Returns a read-only memory map of the file with hash `sha`.
+        On a cache miss, `download` is called to write the file to a file object.
+        Returns `None` for an empty file, which cannot be memory mapped.
+        """
+        with self._get(sha, download) as f:
+            if not os.fstat(f.fileno()).st_size:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, sha: str, download: Callable[[BinaryIO], Any]) -> bytes:
+        """Same as `open`, returning the data of the file."""
+        with self._get(sha, download) as f:
+            return f.read()
+
+    def _get(self, sha: str, download: Callable[[BinaryIO], Any]) -> BinaryIO:
+        """
+        Returns the file with hash `sha` opened for reading. Files are opened while holding
+        the lock, such that an eviction by another thread cannot remove them before they are read.
+        """
+        path = self.file_path(sha)
+        while True:
+            with self._lock:
+                if sha in self._files:
+                    try:
+                        f = open(path, "rb")
+                    except FileNotFoundError:
+                        # Removed by another process that shares the cache
+                        pass
+                    else:
+                        self.hits += 1
+                        self._files.move_to_end(sha)
+                        os.utime(path)
+                        return f
+                self.misses += 1
+
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=DOWNLOAD_PREFIX)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    download(f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            with self._lock:
+                try:
+                    f = open(path, "rb")
+                except FileNotFoundError:
+                    # Evicted by another thread before it was opened, download again
+                    continue
+                size = os.fstat(f.fileno()).st_size
+                self.size += size - self._files.pop(sha, 0)
+                self._files[sha] = size
+                self._evict(keep=sha)
+            return f
+
+    def _evict(self, keep: str) -> None:
+        while self.size > self.max_size and len(self._files) > 1:
+            sha, size = next(iter(self._files.items()))
+            if sha == keep:
+                break
+            del self._files[sha]
+            self.size -= size
+            try:
+                self.file_path(sha).unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Removed file {sha} from file cache")
+
+    def clear(self) -> None:
+        with self._lock:
+            for sha in self._files:
+                self.file_path(sha).unlink(missing_ok=True)
+            self._files.clear()
+            self.size = 0
@@ -0,0 +1,86 @@
+import io
+import mmap
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+# File data for uploads: the data itself, a path or a binary file object
+FileData = Union[bytes, str, Path, BinaryIO]
+
+DEFAULT_CHUNK_SIZE = 2**20
+
+
+def read_chunks(f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def file_sha256(file: FileData, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """
+    Returns the hex SHA-256 of `file`, which is either bytes, a path or a binary file object.
+
+    File objects are hashed from their current position without reading them into memory,
+    files on disk are hashed through a memory map. The position of the file is restored.
+    """
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return sha256(file).hexdigest()
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as f:
+            return file_sha256(f, chunk_size)
+
+    position = file.tell()
+    try:
+        if position == 0:
+            try:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    return sha256(m).hexdigest()
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                # Not a file on disk, or an empty file
+                pass
+        hash = sha256()
+        for chunk in read_chunks(file, chunk_size):
+            hash.update(chunk)
+        return hash.hexdigest()
+    finally:
+        file.seek(position)
+
+
+def write_chunks(
+    out: Union[BinaryIO, bytearray, memoryview], chunks: Iterable[bytes], hash: Optional[Any] = None
+) -> int:
+    """
+    Writes `chunks` to `out`, a binary file object or a writable buffer, and updates `hash`.
+
+    Returns:
+        int: the number of bytes written
+    """
+    view = None if hasattr(out, "write") else memoryview(out).cast("B")
+    size = 0
+    for chunk in chunks:
+        if hash is not None:
+            hash.update(chunk)
+        if view is None:
+            out.write(chunk)
+        else:
+            if size + len(chunk) > len(view):
+                raise ValueError(f"Buffer of {len(view)} bytes is too small for file")
+            view[size : size + len(chunk)] = chunk
+        size += len(chunk)
+    return size
+
+
+def read_range(chunks: Iterable[bytes], start: int, length: int) -> bytes:
+    """Returns `length` bytes from byte `start` of `chunks`, without consuming later chunks."""
+    result = bytearray()
+    position = 0
+    for chunk in chunks:
+        end = position + len(chunk)
+        if end > start:
+            result += chunk[max(start - position, 0) : start + length - position]
+            if len(result) >= length:
+                break
+        position = end
+    return bytes(result)
@@ -1,6 +1,14 @@
+import json
 import string
 from collections import UserString
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+
+from ..data.schema.itembase import ItemBase
+from ..data.schema.utils import type_or_union_to_tuple
+
+# Search operator suffixes, see `PodAPI.search`, and their GraphQL filter operators
+GQL_OPERATORS = {">=": "gte", "<=": "lte", "==": "eq", ">": "gt", "<": "lt"}
 
 
 class GQLQuery(UserString):
@@ -12,3 +20,134 @@ class GQLQuery(UserString):
     def format(self, variables: Optional[Dict[str, Any]] = None, **kwargs) -> "GQLQuery":
         self.data = string.Template(self.data).substitute(variables, **kwargs)
         return self
+
+
+def _gql_value(value: Any) -> str:
+    if isinstance(value, datetime):
+        value = ItemBase._datetime_to_timestamp(value)
+    # JSON scalars are valid GraphQL values, `$` is escaped for `GQLQuery.format`
+    return json.dumps(value).replace("$", "$$")
+
+
+def _gql_filter(fields_data: Dict[str, Any]) -> str:
+    filters = {}
+    for key, value in fields_data.items():
+        op = "eq"
+        for suffix, gql_op in GQL_OPERATORS.items():
+            if key.endswith(suffix):
+                key, op = key[: -len(suffix)], gql_op
+                break
+        filters.setdefault(key, []).append(f"{op}: {_gql_value(value)}")
+    return ", ".join(f"{key}: {{{', '.join(ops)}}}" for key, ops in filters.items())
+
+
+def _edge_target_properties(item_cls: Type[ItemBase], edge: str) -> List[str]:
+    """Properties that all target types of `edge` on `item_cls` have."""
+    target_types = type_or_union_to_tuple(item_cls.__edge_fields__[edge].type_)
+    properties = [p for p in target_types[0].properties]
+    for target_type in target_types[1:]:
+        properties = [p for p in properties if p in target_type.properties]
+    return properties
+
+
+class Selection:
+    """The properties and edges to select for an item type in a GraphQL query."""
+
+    def __init__(
+        self, item_cls: Type[ItemBase], default_properties: Optional[List[str]] = None
+    ) -> None:
+        self.item_cls = item_cls
+        # Selected if no properties are added, by default all properties of `item_cls`
+        self.default_properties = (
+            default_properties if default_properties is not None else item_cls.properties
+        )
+        self.properties: Optional[Set[str]] = None
+        self.edges: Dict[str, "Selection"] = {}
+
+    def edge(self, name: str) -> "Selection":
+        if name not in self.edges:
+            if name not in self.item_cls.__edge_fields__:
+                raise ValueError(f"{name} is not an edge on {self.item_cls.__name__}")
+            target_types = type_or_union_to_tuple(self.item_cls.__edge_fields__[name].type_)
+            self.edges[name] = Selection(
+                target_types[0] if len(target_types) == 1 else ItemBase,
+                _edge_target_properties(self.item_cls, name),
+            )
+        return self.edges[name]
+
+    def add_property(self, name: str) -> None:
+        if name not in self.item_cls.properties and self.item_cls is not ItemBase:
+            raise ValueError(f"{name} is not a property on {self.item_cls.__name__}")
+        if self.properties is None:
+            self.properties = set()
+        self.properties.add(name)
+
+    def expand_all(self, depth: int) -> None:
+        """Selects all edges of the item type, and the edges of their targets up to `depth`."""
+        if depth < 1:
+            return
+        for name in self.item_cls.__edge_fields__:
+            self.edge(name).expand_all(depth - 1)
+
+    def fields(self) -> List[str]:
+        properties = self.properties if self.properties is not None else self.default_properties
+        fields = ["id"] + sorted(p for p in properties if p != "id")
+        for name, selection in self.edges.items():
+            fields.append(f"{name} {{ {' '.join(selection.fields())} }}")
+        return fields
+
+
+def search_query(
+    item_cls: Type[ItemBase],
+    fields_data: Optional[Dict[str, Any]] = None,
+    edges: Optional[Iterable[str]] = None,
+    properties: Optional[Iterable[str]] = None,
+    depth: Optional[int] = None,
+) -> GQLQuery:
+    """
+    Returns a GraphQL query for items of `item_cls` that match the search `fields_data`.
+
+    Args:
+        edges: Edges to expand, nested edges are separated by dots, e.g. "sender.owner".
+        properties: Properties to select, e.g. "subject" or "sender.handle" for a property
+            of an edge target. By default, all properties are selected.
+        depth: Maximum number of nested edges. If `edges` and `properties` do not name any
+            edges, all edges are expanded up to `depth`.
+    """
+    fields_data = {k: v for k, v in (fields_data or {}).items() if k != "type"}
+    limit = fields_data.pop("_limit", None)
+    unsupported = [k for k in fields_data if k.startswith(("_", "[[", "~[["))] + [
+        k for k in fields_data if k == "ids"
+    ]
+    if unsupported:
+        raise ValueError(f"Search fields {unsupported} are not supported with projections")
+
+    root = Selection(item_cls)
+    edge_paths = [path.split(".") for path in edges or []]
+    property_paths = [path.split(".") for path in properties or []]
+    if depth is not None:
+        if any(len(path) > depth for path in edge_paths) or any(
+            len(path) > depth + 1 for path in property_paths
+        ):
+            raise ValueError(f"Edges and properties are nested deeper than depth {depth}")
+        if not edge_paths and all(len(path) == 1 for path in property_paths):
+            root.expand_all(depth)
+
+    for path in edge_paths:
+        selection = root
+        for name in path:
+            selection = selection.edge(name)
+    for path in property_paths:
+        selection = root
+        for name in path[:-1]:
+            selection = selection.edge(name)
+        selection.add_property(path[-1])
+
+    arguments = []
+    if fields_data:
+        arguments.append(f"filter: {{{_gql_filter(fields_data)}}}")
+    if limit is not None:
+        arguments.append(f"limit: {int(limit)}")
+    arguments = f" ({', '.join(arguments)})" if arguments else ""
+    fields = " ".join(root.fields())
+    return GQLQuery(f"query {{ {item_cls.__name__}{arguments} {{ {fields} }} }}")
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+    overload,
+)
+
+from ..data.schema.itembase import ItemBase
+
+
+class ItemView:
+    """
+    Read-only view of the Pod JSON of an item, without creating the item.
+
+    Properties and edges are read like on the item: datetime properties are converted
+    on access, and edges return views of their targets. Views skip validation and
+    are not added to the local DB.
+    """
+
+    __slots__ = ("_json", "_item_cls", "_schema_cls")
+
+    def __init__(
+        self,
+        json: Dict[str, Any],
+        schema_cls: Callable[[str], Type[ItemBase]],
+        item_cls: Optional[Type[ItemBase]] = None,
+    ) -> None:
+        """`schema_cls` returns the item class for a type name, see `get_schema_cls`."""
+        object.__setattr__(self, "_json", json)
+        object.__setattr__(self, "_schema_cls", schema_cls)
+        object.__setattr__(self, "_item_cls", item_cls or schema_cls(json["type"]))
+
+    @property
+    def json(self) -> Dict[str, Any]:
+        return self._json
+
+    @property
+    def item_cls(self) -> Type[ItemBase]:
+        return self._item_cls
+
+    def __getattr__(self, name: str) -> Any:
+        item_cls = self._item_cls
+        field = item_cls.__property_fields__.get(name)
+        if field is not None:
+            value = self._json.get(name)
+            if field.type_ is datetime and isinstance(value, (int, float)):
+                return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+            return value
+        if name in item_cls.__edge_fields__:
+            return self._edge_targets(name)
+        raise AttributeError(f"{item_cls.__name__} has no property or edge {name}")
+
+    def _edge_targets(self, name: str) -> List["ItemView"]:
+        # Edges of /search results, and of GraphQL results
+        if "[[edges]]" in self._json:
+            targets = [e["_item"] for e in self._json["[[edges]]"] if e["_edge"] == name]
+        else:
+            targets = self._json.get(name, [])
+        return [ItemView(target, self._schema_cls) for target in targets]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._item_cls.__name__}#{self._json.get('id')})"
+
+
+class LazyItems(Sequence[ItemBase]):
+    """
+    Search results that keep the Pod JSON, and create each item when it is first accessed.
+
+    `views` reads the results without creating items, see `ItemView`.
+    """
+
+    def __init__(
+        self,
+        data: List[Dict[str, Any]],
+        hydrate: Callable[[Dict[str, Any]], ItemBase],
+        schema_cls: Callable[[str], Type[ItemBase]],
+    ) -> None:
+        self.data = data
+        self._hydrate = hydrate
+        self._schema_cls = schema_cls
+        self._items: List[Any] = [None] * len(data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @overload
+    def __getitem__(self, index: int) -> ItemBase:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[ItemBase]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ItemBase, List[ItemBase]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._hydrate(self.data[index])
+        return item
+
+    def __iter__(self) -> Iterator[ItemBase]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        n_hydrated = sum(item is not None for item in self._items)
+        return f"{type(self).__name__}({len(self)} items, {n_hydrated} hydrated)"
+
+    def views(self) -> Iterator[ItemView]:
+        for json in self.data:
+            yield ItemView(json, self._schema_cls)
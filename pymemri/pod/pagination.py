@@ -0,0 +1,132 @@
+from queue import Queue
+from threading import Event, Thread
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+DATE_SERVER_MODIFIED = "dateServerModified"
+
+_DONE = object()
+
+
+def prefetch(iterator: Iterator, n: int = 1) -> Generator:
+    """
+    Iterates over `iterator` on a background thread, keeping up to `n` values ahead of the caller.
+
+    Exceptions raised by `iterator` are re-raised in the caller. When the returned
+    generator is closed before it is exhausted, the background thread stops after
+    computing at most one more value.
+    """
+    queue: Queue = Queue(maxsize=n)
+    stopped = Event()
+
+    def _put(value: Any) -> None:
+        while not stopped.is_set():
+            try:
+                queue.put(value, timeout=0.1)
+                return
+            except Exception:
+                continue
+
+    def _produce() -> None:
+        try:
+            for value in iterator:
+                if stopped.is_set():
+                    return
+                _put((value, None))
+        except Exception as e:
+            _put((_DONE, e))
+            return
+        _put((_DONE, None))
+
+    thread = Thread(target=_produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            value, error = queue.get()
+            if error is not None:
+                raise error
+            if value is _DONE:
+                return
+            yield value
+    finally:
+        stopped.set()
+
+
+def keyset_pages(
+    search: Callable[[Dict[str, Any]], List[dict]],
+    query: Dict[str, Any],
+    limit: int = 32,
+    start: Optional[int] = None,
+    exclude: Iterable[str] = (),
+) -> Generator[List[dict], None, None]:
+    """
+    Pages through the results of `query` by `dateServerModified`, instead of by offset.
+
+    Each page is requested with `dateServerModified>=` the last timestamp of the previous page,
+    items of that timestamp that were already returned are dropped. Only when more than `limit`
+    items share one timestamp, that timestamp is paged through by offset.
+
+    Args:
+        search (Callable): Returns the search results for a query, i.e. `PodAPI.search`
+        query (Dict[str, Any]): Search query, without `_limit` and `dateServerModified` filters
+        limit (int, optional): Page size. Defaults to 32.
+        start (int, optional): Only return items with a `dateServerModified` >= `start`.
+        exclude (Iterable[str], optional): ids of items with timestamp `start` to skip.
+    """
+    cursor = start
+    seen: Set[str] = set(exclude)
+    while True:
+        page_query = {**query, "_limit": limit}
+        if cursor is not None:
+            page_query[f"{DATE_SERVER_MODIFIED}>="] = cursor
+        page = search(page_query)
+
+        new_items = [item for item in page if item["id"] not in seen]
+        if new_items:
+            yield new_items
+        if len(page) < limit:
+            return
+
+        last = page[-1][DATE_SERVER_MODIFIED]
+        if last == cursor:
+            # The full page has the same timestamp, page through this timestamp by offset.
+            yield from _offset_pages(search, query, limit, cursor, len(page), seen)
+            cursor, seen = cursor + 1, set()
+            continue
+
+        cursor = last
+        seen = {item["id"] for item in page if item[DATE_SERVER_MODIFIED] == last}
+
+
+def _offset_pages(
+    search: Callable[[Dict[str, Any]], List[dict]],
+    query: Dict[str, Any],
+    limit: int,
+    timestamp: int,
+    offset: int,
+    seen: Set[str],
+) -> Generator[List[dict], None, None]:
+    while True:
+        page_query = {
+            **query,
+            "_limit": limit,
+            "_offset": offset,
+            f"{DATE_SERVER_MODIFIED}>=": timestamp,
+            f"{DATE_SERVER_MODIFIED}<": timestamp + 1,
+        }
+        page = search(page_query)
+        new_items = [item for item in page if item["id"] not in seen]
+        if new_items:
+            yield new_items
+        if len(page) < limit:
+            return
+        offset += limit
@@ -0,0 +1,210 @@
+import platform
+import socket
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import DEFAULT_POOLBLOCK, HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+DEFAULT_POOL_CONNECTIONS = 10
+# Maximum number of connections kept open per host
+DEFAULT_POOL_MAXSIZE = 32
+# Seconds after which an unused session is closed
+DEFAULT_MAX_IDLE = 300.0
+
+
+def get_platform_specific_keepalive_option():
+    if platform.system() == "Darwin":
+        return (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    else:
+        return (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
+
+
+# Pod sessions use a pool of TCP connections, over which HTTP requests
+# with Keep-Alive header are sent. While idle, there is no traffic
+# on those connections, that gets detected by the network balancer
+# of the AWS infrastructure and makes those connection dropped,
+# resulting with "connection reset by peer", or similar errors
+# visible on the client side.
+# Enabling TCP keep-alive packets resets the network balancer idle timer
+# resulting in persistent connection as it was originally intended.
+KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    # Enable TCP keepalive packet transmission
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    # Start sending after 60 sec of idleness
+    get_platform_specific_keepalive_option(),
+    # Send keep-alive at 60 sec interval
+    (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 60),
+    # Close connection after 5 failed keep-alive pings (5 minutes)
+    (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 5),
+]
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """`HTTPAdapter` that opens its connections with `KEEPALIVE_SOCKET_OPTIONS`."""
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+def pod_origin(url: str) -> str:
+    """Returns the scheme, host and port of `url`, which identify the connections to a Pod."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _Transport:
+    """
+    The session for one Pod origin, and the number of requests that are using it.
+    A `closing` transport is removed from the registry, and closed once no requests use it.
+    """
+
+    __slots__ = ("session", "last_used", "in_flight", "closing")
+
+    def __init__(self, session: requests.Session, now: float) -> None:
+        self.session = session
+        self.last_used = now
+        self.in_flight = 0
+        self.closing = False
+
+
+class TransportRegistry:
+    """
+    Process-wide `requests.Session`s, one per Pod origin, such that all `PodAPI`s
+    for the same Pod share a pool of warm connections.
+
+    Each session keeps at most `pool_maxsize` connections per host. Sessions that are not
+    used for `max_idle` seconds are closed, and recreated when they are used again. A session
+    is used from `acquire` until `release`, or within `session`. Sessions with requests in
+    flight are never closed. Idle sessions are evicted at most once every `max_idle` seconds.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_idle: Optional[float] = DEFAULT_MAX_IDLE,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_idle = max_idle
+        # origin -> transport
+        self._transports: Dict[str, _Transport] = {}
+        self._next_eviction = 0.0
+        self._lock = Lock()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = KeepAliveAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _is_idle(self, transport: _Transport, now: float) -> bool:
+        return (
+            self.max_idle is not None
+            and transport.in_flight == 0
+            and now - transport.last_used > self.max_idle
+        )
+
+    def acquire(self, url: str) -> _Transport:
+        """Returns the transport for the Pod at `url`, which is in use until `release`."""
+        origin = pod_origin(url)
+        now = time.monotonic()
+        with self._lock:
+            transport = self._transports.get(origin)
+            if transport is None or self._is_idle(transport, now):
+                if transport is not None:
+                    transport.session.close()
+                transport = _Transport(self._create_session(), now)
+                self._transports[origin] = transport
+            transport.in_flight += 1
+            if now >= self._next_eviction:
+                self._evict_idle(now)
+        return transport
+
+    def release(self, transport: _Transport) -> None:
+        """Marks a request on `transport` as completed."""
+        with self._lock:
+            transport.in_flight -= 1
+            transport.last_used = time.monotonic()
+            close = transport.closing and transport.in_flight == 0
+        if close:
+            transport.session.close()
+
+    def release_on_close(self, transport: _Transport, response: requests.Response) -> None:
+        """Releases `transport` once the streamed `response` is closed."""
+        close = response.close
+        released = False
+
+        def close_and_release() -> None:
+            nonlocal released
+            close()
+            if not released:
+                released = True
+                self.release(transport)
+
+        response.close = close_and_release
+
+    @contextmanager
+    def session(self, url: str) -> Iterator[requests.Session]:
+        """Context in which the shared session for the Pod at `url` is in use."""
+        transport = self.acquire(url)
+        try:
+            yield transport.session
+        finally:
+            self.release(transport)
+
+    def _evict_idle(self, now: float) -> None:
+        if self.max_idle is None:
+            return
+        self._next_eviction = now + self.max_idle
+        for origin, transport in list(self._transports.items()):
+            if self._is_idle(transport, now):
+                transport.session.close()
+                del self._transports[origin]
+
+    def __len__(self) -> int:
+        return len(self._transports)
+
+    def configure(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        max_idle: Optional[float] = None,
+    ) -> None:
+        """
+        Changes the pool settings. Open sessions are closed to apply the new settings,
+        sessions with requests in flight once their requests complete.
+        """
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if max_idle is not None:
+                self.max_idle = max_idle
+                self._next_eviction = 0.0
+        self.close()
+
+    def close(self) -> None:
+        """Closes all sessions, sessions with requests in flight once their requests complete."""
+        with self._lock:
+            transports, self._transports = self._transports, {}
+            idle = []
+            for transport in transports.values():
+                transport.closing = True
+                if transport.in_flight == 0:
+                    idle.append(transport)
+        for transport in idle:
+            transport.session.close()
+
+
+DEFAULT_TRANSPORTS = TransportRegistry()
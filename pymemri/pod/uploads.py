@@ -0,0 +1,216 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from threading import Condition, Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+
+from .transport import pod_origin
+
+DEFAULT_MAX_UPLOAD_WORKERS = 4
+# Maximum number of bytes of file data held by pending uploads
+DEFAULT_MAX_UPLOAD_MEMORY = 256 * 2**20
+
+
+@dataclass
+class UploadStats:
+    n_uploaded: int = 0
+    n_failed: int = 0
+    bytes_uploaded: int = 0
+    # Seconds during which at least one upload was pending
+    busy_time: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Uploaded bytes per second while uploading"""
+        return self.bytes_uploaded / self.busy_time if self.busy_time else 0.0
+
+
+class UploadExecutor:
+    """
+    Uploads files on a bounded pool of `max_workers` threads.
+
+    `submit` blocks while the data of pending uploads exceeds `max_memory` bytes,
+    such that a producer that reads files faster than they are uploaded does not hold
+    all files in memory. A single file larger than `max_memory` is uploaded on its own.
+    """
+
+    def __init__(
+        self,
+        upload_fn: Callable[[Any], bool],
+        max_workers: int = DEFAULT_MAX_UPLOAD_WORKERS,
+        max_memory: int = DEFAULT_MAX_UPLOAD_MEMORY,
+    ) -> None:
+        self.upload_fn = upload_fn
+        self.max_workers = max_workers
+        self.max_memory = max_memory
+        self.stats = UploadStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._pending_bytes = 0
+        self._busy_since: Optional[float] = None
+        self._condition = Condition()
+
+    def submit(
+        self,
+        file: Any,
+        size: Optional[int] = None,
+        callback: Optional[Callable[[bool], None]] = None,
+        **kwargs: Any,
+    ) -> "Future[bool]":
+        """
+        Schedules the upload of `file`, `size` is the number of bytes it holds in memory.
+        `kwargs` are passed to `upload_fn`.
+
+        Returns:
+            Future[bool]: resolves to the result of the upload, `callback` is called with
+                the result when the upload is done.
+        """
+        if size is None:
+            size = len(file)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: not self._pending or self._pending_bytes + size <= self.max_memory
+            )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pymemri-upload"
+                )
+            if not self._pending:
+                self._busy_since = time.perf_counter()
+            self._pending_bytes += size
+            future = self._executor.submit(self._upload, file, size, callback, kwargs)
+            self._pending.add(future)
+        future.add_done_callback(lambda f: self._done(f, size))
+        return future
+
+    def _upload(
+        self,
+        file: Any,
+        size: int,
+        callback: Optional[Callable[[bool], None]],
+        kwargs: Dict[str, Any],
+    ) -> bool:
+        try:
+            result = self.upload_fn(file, **kwargs)
+        except Exception as e:
+            logger.error(f"Upload failed: {e}")
+            result = False
+        with self._condition:
+            if result:
+                self.stats.n_uploaded += 1
+                self.stats.bytes_uploaded += size
+            else:
+                self.stats.n_failed += 1
+        if callback is not None:
+            callback(result)
+        return result
+
+    def _done(self, future: Future, size: int) -> None:
+        with self._condition:
+            self._pending.discard(future)
+            self._pending_bytes -= size
+            if not self._pending and self._busy_since is not None:
+                self.stats.busy_time += time.perf_counter() - self._busy_since
+                self._busy_since = None
+            self._condition.notify_all()
+
+    @property
+    def n_pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits for all pending uploads. Returns `True` if all uploads succeeded."""
+        with self._condition:
+            pending = list(self._pending)
+        done, not_done = wait(pending, timeout=timeout)
+        return not not_done and all(future.result() for future in done)
+
+    join = flush
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._condition:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def upload_scope(url: str, owner_key: str) -> str:
+    """Identifies the Pod account that files are uploaded to, without storing the owner key."""
+    return blake2b(f"{pod_origin(url)} {owner_key}".encode(), digest_size=16).hexdigest()
+
+
+class UploadRecord:
+    """
+    The sha256 hashes of files that are uploaded to a Pod, to skip uploading them again.
+    If `path` is given, hashes are persisted in that file.
+
+    Hashes are recorded per `scope`, see `upload_scope`, such that a file can be shared
+    by clients of different Pods or accounts. Only the hashes of `scope` are used.
+    """
+
+    def __init__(
+        self, path: Optional[Union[str, Path]] = None, scope: Optional[str] = None
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.scope = scope
+        self._lock = Lock()
+        self.hashes: Set[str] = set()
+        if self.path is not None and self.path.exists():
+            self.hashes = {
+                sha for line_scope, sha in self._read_lines() if line_scope == self.scope
+            }
+
+    def _read_lines(self) -> List[Tuple[Optional[str], str]]:
+        """Returns (scope, sha) of all lines in the record file."""
+        lines = []
+        for line in self.path.read_text().splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                lines.append((parts[0], parts[1]))
+            elif len(parts) == 1:
+                lines.append((None, parts[0]))
+        return lines
+
+    def _format_line(self, scope: Optional[str], sha: str) -> str:
+        return f"{scope} {sha}\n" if scope is not None else f"{sha}\n"
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def update(self, shas: Iterable[str]) -> None:
+        with self._lock:
+            new_shas = [sha for sha in shas if sha not in self.hashes]
+            if not new_shas:
+                return
+            self.hashes.update(new_shas)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write("".join(self._format_line(self.scope, sha) for sha in new_shas))
+
+    def add(self, sha: str) -> None:
+        self.update([sha])
+
+    def discard(self, sha: str) -> None:
+        """Removes `sha`, for files that are deleted from the Pod."""
+        with self._lock:
+            if sha not in self.hashes:
+                return
+            self.hashes.discard(sha)
+            if self.path is not None and self.path.exists():
+                lines = [
+                    self._format_line(line_scope, line_sha)
+                    for line_scope, line_sha in self._read_lines()
+                    if (line_scope, line_sha) != (self.scope, sha)
+                ]
+                tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+                tmp_path.write_text("".join(lines))
+                os.replace(tmp_path, self.path)
@@ -1,5 +1,17 @@
+import gzip
+import hashlib
+import json
 import os
+import re
+import sqlite3
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from .pod.compression import GZIP, decompress
 
 
 def get_ci_variables(*varnames):
@@ -11,3 +23,429 @@ def get_ci_variables(*varnames):
 
 def get_project_root():
     return Path(__file__).parent.parent
+
+
+# Operators in search keys, i.e. {"dateServerModified>=": 0}
+_SEARCH_OPERATORS = {">=": ">=", "<=": "<=", "==": "=", ">": ">", "<": "<"}
+_GQL_OPERATORS = {"eq": "==", "gte": ">=", "lte": "<=", "gt": ">", "lt": "<"}
+_GQL_TOKEN = re.compile(
+    r'\s*(?:("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|(~?[A-Za-z_]\w*)|([{}():,\[\]]))'
+)
+# Properties that the Pod returns for every item in a GraphQL response
+_GQL_BASE_PROPERTIES = (
+    "id",
+    "type",
+    "dateCreated",
+    "dateModified",
+    "dateServerModified",
+    "deleted",
+)
+
+
+def _parse_graphql(query: str) -> List[tuple]:
+    """
+    Parses the GraphQL queries of `graphql_utils.search_query`, into a list of
+    (name, arguments, selections) tuples. Fields without selections have selections `None`.
+    """
+    tokens, pos = [], 0
+    query = query.strip()
+    while pos < len(query):
+        match = _GQL_TOKEN.match(query, pos)
+        if match is None:
+            raise ValueError(f"Invalid GraphQL at {query[pos:pos + 20]}")
+        tokens.append(match.group(match.lastindex))
+        pos = match.end()
+    tokens.reverse()
+
+    def expect(token):
+        if tokens.pop() != token:
+            raise ValueError(f"Invalid GraphQL, expected {token}")
+
+    def value():
+        token = tokens.pop()
+        if token == "{":
+            obj = {}
+            while tokens[-1] != "}":
+                key = tokens.pop()
+                expect(":")
+                obj[key] = value()
+                if tokens[-1] == ",":
+                    tokens.pop()
+            tokens.pop()
+            return obj
+        if token in ("true", "false", "null"):
+            return {"true": True, "false": False, "null": None}[token]
+        return json.loads(token)
+
+    def selections():
+        expect("{")
+        fields = []
+        while tokens[-1] != "}":
+            name, arguments, children = tokens.pop(), {}, None
+            if tokens[-1] == "(":
+                tokens.pop()
+                while tokens[-1] != ")":
+                    key = tokens.pop()
+                    expect(":")
+                    arguments[key] = value()
+                    if tokens[-1] == ",":
+                        tokens.pop()
+                tokens.pop()
+            if tokens[-1] == "{":
+                children = selections()
+            fields.append((name, arguments, children))
+        tokens.pop()
+        return fields
+
+    expect("query")
+    return selections()
+
+
+class LocalPod:
+    """
+    In-process stand-in for the Pod HTTP API, for tests and benchmarks that do not need a real Pod.
+
+    Implements the subset of the v4 API used by `PodAPI` for items and edges, backed by
+    an in-memory SQLite database. Like the Pod, all items written in one request get the same
+    `dateServerModified`, and search results are sorted by `dateServerModified`.
+    `latency` adds a fixed delay in seconds to every request. Compressed request bodies are
+    decompressed, and if `compress_responses` is set, responses are gzipped for clients
+    that accept gzip.
+
+    Usage:
+        with LocalPod() as pod:
+            client = PodClient(url=pod.url)
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 0,
+        latency: float = 0.0,
+        compress_responses: bool = False,
+    ) -> None:
+        self.latency = latency
+        self.compress_responses = compress_responses
+        self.n_requests = 0
+        # Content-Encoding -> number of requests received with that encoding
+        self.request_encodings: Dict[str, int] = {}
+        self._lock = Lock()
+        self._last_timestamp = 0
+        # sha256 -> file data
+        self.files: Dict[str, bytes] = {}
+        self._db = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self._db.executescript(
+            """
+            CREATE TABLE items (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE,
+                type TEXT,
+                dateServerModified INTEGER,
+                data TEXT
+            );
+            CREATE INDEX items_dsm ON items (dateServerModified, rowid);
+            CREATE TABLE edges (source TEXT, target TEXT, name TEXT);
+            CREATE INDEX edges_source ON edges (source);
+            """
+        )
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalPod":
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "LocalPod":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        pod = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path == "/version":
+                    self._respond(200, {"cargo": "local"})
+                else:
+                    self._respond(200, "")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                encoding = self.headers.get("Content-Encoding")
+                if encoding:
+                    try:
+                        body = decompress(body, encoding)
+                    except (ValueError, OSError) as e:
+                        return self._respond(415, f"Unsupported Content-Encoding: {e}")
+                    with pod._lock:
+                        pod.request_encodings[encoding] = pod.request_encodings.get(encoding, 0) + 1
+                status, result = pod.handle(self.path, body)
+                byte_range = self.headers.get("Range")
+                if status == 200 and isinstance(result, bytes) and byte_range:
+                    start, end = byte_range.split("=", 1)[1].split("-")
+                    if int(start) >= len(result):
+                        return self._respond(
+                            416,
+                            "Range Not Satisfiable",
+                            {"Content-Range": f"bytes */{len(result)}"},
+                        )
+                    end = min(int(end), len(result) - 1) if end else len(result) - 1
+                    self._respond(
+                        206,
+                        result[int(start) : end + 1],
+                        {"Content-Range": f"bytes {start}-{end}/{len(result)}"},
+                    )
+                else:
+                    self._respond(status, result)
+
+            def _respond(self, status: int, result: Any, headers: Optional[dict] = None) -> None:
+                data = result if isinstance(result, bytes) else json.dumps(result).encode("utf-8")
+                accept_encoding = self.headers.get("Accept-Encoding", "")
+                if pod.compress_responses and status == 200 and GZIP in accept_encoding:
+                    data = gzip.compress(data)
+                    headers = {**(headers or {}), "Content-Encoding": GZIP}
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def handle(self, path: str, body: bytes):
+        if self.latency:
+            time.sleep(self.latency)
+        self.n_requests += 1
+
+        endpoint = path.strip("/").split("/", 2)[-1]
+        if path.rstrip("/").endswith("/account"):
+            return 200, ""
+        if endpoint.startswith(("upload_file/", "upload_file_b/")):
+            return self._upload_file(endpoint.rsplit("/", 1)[-1], body)
+
+        payload = json.loads(body)["payload"] if body else None
+        handler = getattr(self, f"_api_{endpoint}", None)
+        if handler is None:
+            return 404, f"Unknown endpoint {endpoint}"
+        try:
+            with self._lock:
+                return 200, handler(payload)
+        except (KeyError, ValueError) as e:
+            return 400, f"Bad request: {e}"
+
+    def _upload_file(self, sha: str, data: bytes):
+        if hashlib.sha256(data).hexdigest() != sha:
+            return 400, "Bad request: sha256 does not match file"
+        with self._lock:
+            if sha in self.files:
+                return 409, "File already exists"
+            self.files[sha] = data
+        return 200, []
+
+    def _timestamp(self) -> int:
+        self._last_timestamp = max(round(time.time() * 1000), self._last_timestamp + 1)
+        return self._last_timestamp
+
+    def _create_item(self, item: dict, timestamp: int) -> str:
+        item = {**item}
+        item["id"] = item.get("id") or uuid.uuid4().hex
+        if "type" not in item:
+            raise ValueError("item has no type")
+        item.setdefault("dateCreated", timestamp)
+        item.setdefault("dateModified", timestamp)
+        item["dateServerModified"] = timestamp
+        item["deleted"] = False
+        try:
+            self._db.execute(
+                "INSERT INTO items (id, type, dateServerModified, data) VALUES (?, ?, ?, ?)",
+                (item["id"], item["type"], timestamp, json.dumps(item)),
+            )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"item with id {item['id']} already exists")
+        return item["id"]
+
+    def _update_item(self, update: dict, timestamp: int) -> None:
+        item = self._get_item(update["id"])
+        if item is None:
+            raise ValueError(f"item with id {update['id']} does not exist")
+        item.update(update)
+        item["dateServerModified"] = timestamp
+        self._db.execute(
+            "UPDATE items SET dateServerModified = ?, data = ? WHERE id = ?",
+            (timestamp, json.dumps(item), item["id"]),
+        )
+
+    def _delete_item(self, id: str) -> None:
+        self._db.execute("DELETE FROM items WHERE id = ?", (id,))
+        self._db.execute("DELETE FROM edges WHERE source = ? OR target = ?", (id, id))
+
+    def _create_edge(self, edge: dict) -> None:
+        for key in ("_source", "_target"):
+            if self._get_item(edge[key]) is None:
+                raise ValueError(f"edge {key} {edge[key]} does not exist")
+        self._db.execute(
+            "INSERT INTO edges (source, target, name) VALUES (?, ?, ?)",
+            (edge["_source"], edge["_target"], edge["_name"]),
+        )
+
+    def _get_item(self, id: str) -> Optional[dict]:
+        row = self._db.execute("SELECT data FROM items WHERE id = ?", (id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _get_edges(self, id: str) -> List[dict]:
+        rows = self._db.execute(
+            "SELECT e.name, i.data FROM edges e JOIN items i ON e.target = i.id WHERE e.source = ?",
+            (id,),
+        ).fetchall()
+        return [{"name": name, "item": json.loads(data)} for name, data in rows]
+
+    def _search(self, query: dict) -> List[dict]:
+        query = {**query}
+        include_edges = query.pop("[[edges]]", None) is not None
+        limit = query.pop("_limit", -1)
+        offset = query.pop("_offset", 0)
+        order = "DESC" if query.pop("_sortOrder", "Asc") == "Desc" else "ASC"
+
+        conditions, params = [], []
+        for key, value in query.items():
+            op = "="
+            for suffix, sql_op in _SEARCH_OPERATORS.items():
+                if key.endswith(suffix):
+                    key, op = key[: -len(suffix)], sql_op
+                    break
+            if key in ("id", "type", "dateServerModified"):
+                column = key
+            else:
+                column = f"json_extract(data, '$.{key}')"
+            conditions.append(f"{column} {op} ?")
+            params.append(value)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._db.execute(
+            f"SELECT data FROM items {where} "
+            f"ORDER BY dateServerModified {order}, rowid {order} LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+
+        result = [json.loads(row[0]) for row in rows]
+        if include_edges:
+            for item in result:
+                item["[[edges]]"] = [
+                    {"_edge": edge["name"], "_item": edge["item"]}
+                    for edge in self._get_edges(item["id"])
+                ]
+        return result
+
+    def _api_create_item(self, payload: dict) -> str:
+        return self._create_item(payload, self._timestamp())
+
+    def _api_update_item(self, payload: dict) -> list:
+        self._update_item(payload, self._timestamp())
+        return []
+
+    def _api_delete_item(self, payload: str) -> list:
+        self._delete_item(payload)
+        return []
+
+    def _api_get_item(self, payload: str) -> List[dict]:
+        item = self._get_item(payload)
+        return [item] if item is not None else []
+
+    def _api_create_edge(self, payload: dict) -> str:
+        self._create_edge(payload)
+        return uuid.uuid4().hex
+
+    def _api_delete_edge_by_source_target(self, payload: dict) -> list:
+        self._db.execute(
+            "DELETE FROM edges WHERE source = ? AND target = ? AND name = ?",
+            (payload["_source"], payload["_target"], payload["_name"]),
+        )
+        return []
+
+    def _api_get_edges(self, payload: dict) -> List[dict]:
+        return self._get_edges(payload["item"])
+
+    def _api_schema(self, payload: dict) -> dict:
+        return {}
+
+    def _api_get_file(self, payload: dict) -> bytes:
+        # Range requests are handled by the request handler
+        return self.files[payload["sha256"]]
+
+    def _api_delete_file(self, payload: dict) -> list:
+        # Deletes the File item and its data
+        item = self._get_item(payload["id"])
+        if item is None:
+            raise ValueError(f"file {payload['id']} does not exist")
+        self.files.pop(item.get("sha256"), None)
+        self._delete_item(payload["id"])
+        return []
+
+    def _api_search(self, payload: dict) -> List[dict]:
+        return self._search(payload)
+
+    def _api_graphql(self, payload: str) -> Dict[str, Any]:
+        data = []
+        for item_type, arguments, selections in _parse_graphql(payload):
+            query = {"type": item_type, "_limit": arguments.get("limit", -1)}
+            for key, ops in arguments.get("filter", {}).items():
+                for op, value in ops.items():
+                    query[f"{key}{_GQL_OPERATORS[op]}"] = value
+            data.extend(self._graphql_item(item, selections) for item in self._search(query))
+        return {"data": data}
+
+    def _graphql_item(self, item: dict, selections: List[tuple]) -> dict:
+        result = {k: item[k] for k in _GQL_BASE_PROPERTIES if k in item}
+        edges = None
+        for name, _, children in selections:
+            if children is None:
+                if name in item:
+                    result[name] = item[name]
+                continue
+            if edges is None:
+                edges = self._get_edges(item["id"])
+            result[name] = [
+                self._graphql_item(edge["item"], children) for edge in edges if edge["name"] == name
+            ]
+        return result
+
+    def _api_bulk(self, payload: dict) -> Dict[str, Any]:
+        timestamp = self._timestamp()
+        result: Dict[str, Any] = {}
+        self._db.execute("SAVEPOINT bulk")
+        try:
+            result["createItems"] = [
+                self._create_item(item, timestamp) for item in payload.get("createItems", [])
+            ]
+            for item in payload.get("updateItems", []):
+                self._update_item(item, timestamp)
+            for id in payload.get("deleteItems", []):
+                self._delete_item(id)
+            for edge in payload.get("createEdges", []):
+                self._create_edge(edge)
+        except Exception:
+            self._db.execute("ROLLBACK TO bulk")
+            raise
+        finally:
+            self._db.execute("RELEASE bulk")
+        result["search"] = [self._search(query) for query in payload.get("search", [])]
+        return result
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional, Union
 
 import pytest
@@ -175,3 +175,67 @@ def test_item_json():
 
     item_dict = item.dict()
     assert item_dict["label"] != None
+
+
+def test_from_pod_json():
+    json = {
+        "id": "abc",
+        "type": "MyItem",
+        "str_property": "test",
+        "int_property": 1,
+        "float_property": 2,
+        "dt_property": 1640995200000,
+        "dateServerModified": 1640995200000,
+        "deleted": False,
+        "[[edges]]": [],
+    }
+    item = MyItem.from_pod_json(json)
+    validated = MyItem.from_json(json)
+    assert item == validated
+    assert item.__fields_set__ == validated.__fields_set__
+    assert isinstance(item.float_property, float)
+    assert item.dt_property == validated.dt_property and item.dt_property.tzinfo is not None
+
+    # Items from the Pod are in sync, and track changes as usual
+    assert not item._is_dirty and item.accountEdge == []
+    item.str_property = "changed"
+    item.add_edge("accountEdge", Account(handle="friend"))
+    assert item._updated_properties == {"str_property"} and len(item._new_edges) == 1
+    assert MyItem.from_pod_json(json).str_property == "test"
+
+
+def test_attribute_access():
+    account = Account(handle="test")
+    item = MyItem(accountEdge=[account])
+    assert item.accountEdge == [account] and item.accountEdge[0] is account
+    assert item.str_property is None
+
+    # Edges are not properties, setting them does not modify the item
+    item.accountEdge = []
+    assert item.accountEdge == [account] and not item._updated_properties
+
+    # Modification times are recorded for changed properties only
+    item.reset_local_sync_state()
+    item.str_property = "changed"
+    item.int_property = None
+    assert item._updated_properties == {"str_property"}
+    assert item._local_modified_time("str_property") <= datetime.now(timezone.utc)
+    assert item._local_modified_time("int_property") is None
+
+
+def test_edge_deduplication():
+    item = MyItem()
+    accounts = [Account(handle="test"), Account(handle="test")]
+    for account in accounts + accounts:
+        item.add_edge("accountEdge", account)
+    # Edges are compared by target reference, not by value
+    assert item.accountEdge == accounts and len(item._new_edges) == 2
+
+    item.remove_edge("accountEdge", accounts[0])
+    assert item.accountEdge[0] is accounts[1] and len(item._new_edges) == 1
+    item.add_edge("accountEdge", accounts[0])
+    assert len(item.accountEdge) == 2
+
+    assert Edge[Account] is Edge[Account]
+    assert Edge[Account].get_target_types() == (Account,)
+    assert Edge(item, accounts[0], "accountEdge") in item.get_edges("accountEdge")
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from pymemri.data.schema import Account, EmailMessage, ItemBatch
+
+
+def test_from_columns():
+    date_sent = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    batch = ItemBatch.from_columns(
+        EmailMessage,
+        subject=["subject " + str(i % 2) for i in range(4)],
+        dateSent=[date_sent, None, 1640995200000, "2022-01-01T00:00:00Z"],
+        content=[None] * 4,
+    )
+    assert len(batch) == 4 and all(id is not None for id in batch.ids)
+    # Columns that are all None are not stored, repeated text is shared
+    assert "content" not in batch.columns and batch.values("content") == [None] * 4
+    assert batch.columns["subject"][0] is batch.columns["subject"][2]
+    assert batch.columns["dateSent"].dtype == np.dtype("datetime64[ms]")
+    assert batch.values("dateSent") == [date_sent, None, date_sent, date_sent]
+
+    with pytest.raises(ValueError):
+        ItemBatch.from_columns(EmailMessage, unknown=[1, 2, 3, 4])
+    with pytest.raises(ValueError):
+        ItemBatch.from_columns(EmailMessage, subject=["a"], content=["a", "b"])
+
+
+def test_items_roundtrip():
+    account = Account(handle="alice")
+    emails = [EmailMessage(subject=f"subject_{i}", sender=[account]) for i in range(3)]
+    batch = ItemBatch.from_items(emails)
+    assert batch.ids == [email.id for email in emails] and account.id is not None
+    assert batch.edge_targets("sender") == [[account.id]] * 3
+    assert list(batch.iter_json()) == [email.to_json() for email in emails]
+
+    items = batch.to_items(targets={account.id: account})
+    assert [item.to_json() for item in items] == [email.to_json() for email in emails]
+    assert all(item.sender[0] is account for item in items)
+    assert ItemBatch.from_json(EmailMessage, list(batch.iter_json())).ids == batch.ids
+    with pytest.raises(ValueError):
+        ItemBatch.from_items([*emails, account])
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import threading
+from functools import partial
+
+import pytest
+
+from pymemri.data.schema import Account, EmailMessage
+from pymemri.pod.api import PodError
+from pymemri.pod.batching import BulkBatcher, BulkCheckpoint
+from pymemri.pod.client import PodClient
+from pymemri.test_utils import LocalPod
+
+pytest.importorskip("aiohttp")
+
+from pymemri.pod.async_client import AsyncPodClient  # noqa: E402
+
+
+def test_async_client():
+    async def run(url):
+        async with AsyncPodClient(url=url) as client:
+            await client.create_account()
+            account = Account(handle="alice")
+            emails = [EmailMessage(content=f"content_{i}") for i in range(100)]
+            for email in emails:
+                email.add_edge("sender", account)
+            edges = [email.get_edges("sender")[0] for email in emails]
+            result = await client.bulk_action(
+                create_items=[account, *emails], create_edges=edges, max_in_flight=4
+            )
+            assert result
+            assert not client.local_db.dirty
+            assert all(email.dateServerModified is not None for email in emails)
+
+            client.reset_local_db()
+            items = await asyncio.gather(*[client.get(email.id) for email in emails])
+            assert [item.content for item in items] == [email.content for email in emails]
+            assert all(item.sender[0].handle == "alice" for item in items)
+
+            found = await client.search({"type": "EmailMessage"})
+            assert len(found) == 100
+
+            data = b"file data"
+            assert await client.upload_file(data)
+            assert await client.upload_file(data)
+            return client.owner_key, client.database_key
+
+    with LocalPod() as pod:
+        owner_key, database_key = asyncio.run(run(pod.url))
+        sync_client = PodClient(url=pod.url, owner_key=owner_key, database_key=database_key)
+        assert len(sync_client.search({"type": "EmailMessage"})) == 100
+
+
+def test_async_client_compression():
+    async def run(url):
+        async with AsyncPodClient(url=url, compression="gzip") as client:
+            await client.create_account()
+            emails = [EmailMessage(content="content " * 1000) for _ in range(10)]
+            assert await client.bulk_action(create_items=emails)
+            found = await client.search({"type": "EmailMessage"})
+            assert len(found) == 10
+            return client.api.compression.stats
+
+    with LocalPod(compress_responses=True) as pod:
+        stats = asyncio.run(run(pod.url))
+        assert pod.request_encodings == {"gzip": 1}
+        assert stats.request_ratio > 2
+        assert stats.response_ratio > 2
+
+
+def test_async_search_projection():
+    async def run(url):
+        async with AsyncPodClient(url=url) as client:
+            await client.create_account()
+            email = EmailMessage(content="content", subject="subject")
+            email.add_edge("sender", Account(handle="alice"))
+            assert await client.bulk_action(
+                create_items=[email, email.sender[0]], create_edges=email.get_edges("sender")
+            )
+            client.reset_local_db()
+            return await client.search(
+                {"type": "EmailMessage"}, properties=["subject", "sender.handle"]
+            )
+
+    with LocalPod() as pod:
+        result = asyncio.run(run(pod.url))
+        assert result[0].content is None and result[0].sender[0].handle == "alice"
+
+
+@pytest.mark.parametrize("split_failed", [False, True])
+def test_async_drop_edges_of_failed_items(monkeypatch, split_failed):
+    monkeypatch.setattr("pymemri.pod.async_client.BulkBatcher", partial(BulkBatcher, max_size=1000))
+    account = Account(handle="alice")
+    emails = [EmailMessage(content=f"content_{i}") for i in range(20)]
+    for email in emails:
+        email.add_edge("sender", account)
+    edges = [email.get_edges("sender")[0] for email in emails]
+    emails[15].create_id_if_not_exists()
+
+    async def run(url):
+        async with AsyncPodClient(url=url) as client:
+            await client.create_account()
+            bulk_encoded = client.api.bulk_encoded
+
+            async def failing_bulk(data):
+                items = json.loads(data).get("createItems", [])
+                if any(item["id"] == emails[15].id for item in items):
+                    raise PodError(400, "invalid item")
+                return await bulk_encoded(data)
+
+            monkeypatch.setattr(client.api, "bulk_encoded", failing_bulk)
+            return await client.bulk_action(
+                create_items=[account, *emails],
+                create_edges=edges,
+                max_in_flight=2,
+                split_failed=split_failed,
+            )
+
+    with LocalPod() as pod:
+        result = asyncio.run(run(pod.url))
+
+    failed_ids = {item["id"] for item in result.failed["createItems"]}
+    assert emails[15].id in failed_ids and not result
+    if split_failed:
+        # Failed batches are split until only the invalid item fails
+        assert failed_ids == {emails[15].id}
+    assert {e["_source"] for e in result.failed["createEdges"]} == failed_ids
+    assert result.committed["createEdges"] and not any(
+        e["_source"] in failed_ids for e in result.committed["createEdges"]
+    )
+    dropped = [r for r in result.batches if r.caused_by is not None]
+    assert dropped and all(not r.caused_by.success for r in dropped)
+
+
+def test_async_checkpoint_and_errors(tmp_path, monkeypatch):
+    commit = BulkCheckpoint.commit
+    commit_threads = []
+
+    def record_commit(self, batch):
+        commit_threads.append(threading.current_thread())
+        commit(self, batch)
+
+    monkeypatch.setattr(BulkCheckpoint, "commit", record_commit)
+
+    async def run(url):
+        async with AsyncPodClient(url=url) as client:
+            await client.create_account()
+            accounts = [Account(handle=str(i), externalId=str(i)) for i in range(10)]
+            assert await client.bulk_action(create_items=accounts, checkpoint=tmp_path / "ckpt")
+
+            async def connection_error(**kwargs):
+                raise ConnectionError("connection reset")
+
+            # Connection errors are handled as in `create`
+            monkeypatch.setattr(client.api, "bulk", connection_error)
+            accounts[0].handle = "updated"
+            assert not await client.update_item(accounts[0])
+            assert not await client.create(Account(handle="new"))
+
+    with LocalPod() as pod:
+        asyncio.run(run(pod.url))
+    # Checkpoints are committed off the event loop thread
+    assert commit_threads and threading.main_thread() not in commit_threads
@@ -0,0 +1,225 @@
+import json
+from functools import partial
+
+import pytest
+
+from pymemri.data.schema import Account, EmailMessage, ItemBatch
+from pymemri.pod.api import PodError
+from pymemri.pod.batching import BulkBatch, BulkBatcher, BulkCheckpoint
+from pymemri.pod.client import PodClient
+from pymemri.test_utils import LocalPod
+
+
+def test_batch_size_is_exact():
+    batch = BulkBatch()
+    assert batch.size == len(batch.to_bytes())
+
+    batcher = BulkBatcher()
+    items = [Account(handle=f"ä-{i}").to_json() for i in range(10)]
+    edges = [{"_source": "a", "_target": "b", "_name": "sender"}]
+    (batch,) = batcher.batches(create_items=items, delete_items=["x", "y"], create_edges=edges)
+
+    encoded = batch.to_bytes()
+    assert batch.size == len(encoded)
+    assert json.loads(encoded) == {
+        "createItems": items,
+        "deleteItems": ["x", "y"],
+        "createEdges": edges,
+    }
+
+
+def test_batch_timestamp_search():
+    items = [{"type": "Account", "id": str(i), "handle": "x" * 50} for i in range(20)]
+    updates = [{"id": "u", "handle": "y"}]
+    batches = list(
+        BulkBatcher(max_size=500, with_timestamp=True).batches(
+            create_items=items, update_items=updates, delete_items=["d"]
+        )
+    )
+    assert len(batches) > 1
+    for batch in batches:
+        # The search is included in the exact size, and is for the first created item
+        encoded = batch.to_bytes()
+        assert batch.size == len(encoded) <= 500
+        first = next(p for k, p, _ in batch.entries() if k in ("createItems", "updateItems"))
+        assert json.loads(encoded)["search"] == [{"id": first["id"]}]
+        assert batch.timestamp_id == first["id"]
+        for half in batch.split():
+            assert half.size == len(half.to_bytes())
+
+    (batch,) = BulkBatcher(with_timestamp=True).batches(delete_items=["d"])
+    assert "search" not in json.loads(batch.to_bytes())
+
+
+def test_one_timestamp_per_bulk_request():
+    # Timestamps of written items are read from one item, as all items in a request share it
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        accounts = [Account(handle=str(i)) for i in range(10)]
+        result = client.bulk_action(create_items=accounts[:5])
+        assert client.bulk_action(create_items=accounts[5:])
+        accounts[0].displayName = "updated"
+        assert client.bulk_action(create_items=[Account(handle="new")], update_items=accounts[:1])
+
+        remote = {a.id: a.dateServerModified for a in client.search({"type": "Account"})}
+        assert all(account.dateServerModified == remote[account.id] for account in accounts)
+        assert len({remote[a.id] for a in accounts[1:5]}) == 1
+        assert result.batches[0].timestamp is not None
+
+
+def test_batches_respect_max_size():
+    items = [EmailMessage(content="x" * 100).to_json() for _ in range(1000)]
+    batches = list(BulkBatcher(max_size=10000).batches(create_items=iter(items)))
+
+    assert len(batches) > 1
+    assert all(batch.size <= 10000 for batch in batches)
+    assert [p for b in batches for p in b.payloads["createItems"]] == items
+
+
+def test_edges_after_items():
+    items = [{"type": "Account", "id": str(i)} for i in range(100)]
+    edges = [{"_source": str(i), "_target": "0", "_name": "trust"} for i in range(100)]
+    batches = list(BulkBatcher(max_size=1000).batches(create_items=items, create_edges=edges))
+
+    seen_edge = False
+    for batch in batches:
+        if batch.payloads["createEdges"]:
+            seen_edge = True
+        elif seen_edge:
+            assert not batch.payloads["createItems"]
+
+
+def test_skip_oversized_item():
+    items = [{"content": "x" * 1000}, {"content": "y"}]
+    (batch,) = BulkBatcher(max_size=100).batches(create_items=items)
+    assert batch.payloads["createItems"] == [{"content": "y"}]
+
+
+def test_split_batch():
+    items = [{"type": "Account", "id": str(i)} for i in range(5)]
+    (batch,) = BulkBatcher().batches(create_items=items, delete_items=["a", "b"])
+    first, second = batch.split()
+
+    assert len(first) == 3 and len(second) == 4
+    assert [p for _, p, _ in first.entries()] + [p for _, p, _ in second.entries()] == [
+        p for _, p, _ in batch.entries()
+    ]
+    assert first.size == len(first.to_bytes()) and second.size == len(second.to_bytes())
+
+
+def test_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint"
+    items = [{"type": "Account", "id": str(i)} for i in range(10)]
+
+    (batch,) = BulkBatcher().batches(create_items=items[:5])
+    BulkCheckpoint(path).commit(batch)
+
+    # Resume from checkpoint, already written items are skipped
+    checkpoint = BulkCheckpoint(path)
+    batcher = BulkBatcher(checkpoint=checkpoint)
+    (batch,) = batcher.batches(create_items=items)
+    assert batcher.n_skipped == 5
+    assert batch.payloads["createItems"] == items[5:]
+
+    # Payloads are identified by id, not by content
+    changed = [{**item, "handle": "changed"} for item in items]
+    batcher = BulkBatcher(checkpoint=checkpoint)
+    (batch,) = batcher.batches(create_items=changed)
+    assert batcher.n_skipped == 5
+
+    assert checkpoint.item_ids({("Account", "a"): "1"}) == {("Account", "a"): "1"}
+    assert BulkCheckpoint(path).item_ids({("Account", "a"): "2"}) == {("Account", "a"): "1"}
+
+    checkpoint.clear()
+    assert not path.exists() and len(checkpoint) == 0 and not checkpoint.ids
+
+
+def test_resume_checkpoint(tmp_path, monkeypatch):
+    path = tmp_path / "checkpoint"
+    monkeypatch.setattr("pymemri.pod.client.BulkBatcher", partial(BulkBatcher, max_size=1000))
+
+    def build_items():
+        # Items are rebuilt on every run, and get a new id if they have no externalId
+        accounts = [Account(handle=str(i), externalId=str(i)) for i in range(20)]
+        batch = ItemBatch.from_columns(
+            EmailMessage, content=["content"] * 10, externalId=[str(i) for i in range(10)]
+        )
+        return accounts, batch
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        bulk_encoded = client.api.bulk_encoded
+        n_sent = 0
+
+        def interrupted_bulk(data):
+            nonlocal n_sent
+            if n_sent == 1:
+                raise PodError(400, "interrupted")
+            n_sent += 1
+            return bulk_encoded(data)
+
+        accounts, batch = build_items()
+        monkeypatch.setattr(client.api, "bulk_encoded", interrupted_bulk)
+        result = client.bulk_action(create_items=accounts, checkpoint=path)
+        assert not result and result.aborted and path.exists()
+        monkeypatch.setattr(client.api, "bulk_encoded", bulk_encoded)
+        n_written = len(client.search({"type": "Account"}))
+        first_ids = [account.id for account in accounts]
+
+        new_accounts, _ = build_items()
+        result = client.bulk_action(create_items=new_accounts, checkpoint=path)
+        assert result and result.n_written == 20 - n_written and not path.exists()
+        assert [account.id for account in new_accounts] == first_ids
+        assert len(client.search({"type": "Account"})) == 20
+
+        # Rows of batches are identified by externalId as well
+        assert client.bulk_action(create_items=batch, checkpoint=path)
+        _, new_batch = build_items()
+        result = client.bulk_action(create_items=new_batch, checkpoint=path)
+        assert result.n_written == 10 and new_batch.ids != batch.ids
+
+        # Without id or externalId, items cannot be identified in a resumed bulk action
+        with pytest.raises(ValueError):
+            client.bulk_action(create_items=[Account(handle="new")], checkpoint=path)
+
+
+@pytest.mark.parametrize("options", [{"max_in_flight": 2}, {"split_failed": True}])
+def test_drop_edges_of_failed_items(monkeypatch, options):
+    monkeypatch.setattr("pymemri.pod.client.BulkBatcher", partial(BulkBatcher, max_size=1000))
+    account = Account(handle="alice")
+    emails = [EmailMessage(content=f"content_{i}") for i in range(20)]
+    for email in emails:
+        email.add_edge("sender", account)
+    edges = [email.get_edges("sender")[0] for email in emails]
+    emails[15].create_id_if_not_exists()
+    failing_id = emails[15].id
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        bulk_encoded = client.api.bulk_encoded
+        sent_edges = []
+
+        def failing_bulk(data):
+            payload = json.loads(data)
+            if any(item["id"] == failing_id for item in payload.get("createItems", [])):
+                raise PodError(400, "invalid item")
+            sent_edges.extend(payload.get("createEdges", []))
+            return bulk_encoded(data)
+
+        monkeypatch.setattr(client.api, "bulk_encoded", failing_bulk)
+        result = client.bulk_action(create_items=[account, *emails], create_edges=edges, **options)
+
+    failed_ids = {item["id"] for item in result.failed["createItems"]}
+    assert failing_id in failed_ids and not result
+    dropped = [e for e in result.failed["createEdges"] if e["_source"] in failed_ids]
+    assert dropped == result.failed["createEdges"] and len(dropped) == len(failed_ids)
+    assert not any(e["_source"] in failed_ids for e in sent_edges)
+    assert len(sent_edges) == len(edges) - len(dropped)
+
+    # Dropped edges are reported directly after the batch that failed to create their items
+    for i, batch_result in enumerate(result.batches):
+        cause = batch_result.caused_by
+        if cause is not None:
+            previous = result.batches[i - 1]
+            assert previous is cause or previous.caused_by is cause
+            assert batch_result.error is cause.error
@@ -0,0 +1,42 @@
+from pymemri.data.schema import Account
+from pymemri.pod.changes import Watermark
+from pymemri.pod.client import PodClient
+from pymemri.test_utils import LocalPod
+
+
+def test_watermark_advance(tmp_path):
+    watermark = Watermark(path=tmp_path / "watermark.json")
+    watermark.advance([{"id": "a", "dateServerModified": 1}, {"id": "b", "dateServerModified": 2}])
+    watermark.advance([{"id": "c", "dateServerModified": 2}])
+    watermark.save()
+
+    watermark = Watermark.from_file(tmp_path / "watermark.json")
+    assert watermark.timestamp == 2
+    assert watermark.ids == ["b", "c"]
+
+
+def test_changes_since(tmp_path):
+    watermark_path = tmp_path / "watermark.json"
+    query = {"type": "Account", "service": "changes"}
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        accounts = [Account(handle=str(i), service="changes") for i in range(100)]
+        client.bulk_action(create_items=accounts)
+
+        changes = [
+            a for page in client.changes_since(watermark_path, query, limit=16) for a in page
+        ]
+        assert len(changes) == 100
+
+        # No changes since last run
+        assert list(client.changes_since(watermark_path, query)) == []
+
+        # Only new and modified items are returned
+        accounts[0].displayName = "updated"
+        new_accounts = [Account(handle="new", service="changes") for _ in range(3)]
+        client.bulk_action(create_items=new_accounts, update_items=[accounts[0]])
+
+        changes = [a for page in client.changes_since(watermark_path, query) for a in page]
+        assert {a.id for a in changes} == {a.id for a in new_accounts + [accounts[0]]}
+        assert client.local_db.get(accounts[0].id).displayName == "updated"
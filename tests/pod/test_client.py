@@ -1,13 +1,24 @@
+from datetime import datetime, timezone
 from time import sleep
 from typing import List, Optional
 
 import pytest
 
-from pymemri.data.schema import Account, Edge, EmailMessage, Item, Person, PluginRun
+from pymemri.data.schema import (
+    Account,
+    Edge,
+    EmailMessage,
+    Item,
+    ItemBatch,
+    Person,
+    PluginRun,
+)
 from pymemri.data.schema.schema import SchemaMeta
 from pymemri.examples.example_schema import Dog
+from pymemri.exporters.exporters import Query
 from pymemri.pod.client import PodClient, PodError
 from pymemri.pod.graphql_utils import GQLQuery
+from pymemri.test_utils import LocalPod
 
 
 @pytest.fixture(scope="module")
@@ -283,6 +294,21 @@ def test_bulk_create(client: PodClient):
         assert len(d.owner) > 0
 
 
+def test_bulk_create_pipelined(client: PodClient):
+    accounts = [Account(handle=f"pipelined_{i}", service="pipelined") for i in range(200)]
+    edges = [Edge(account, accounts[0], "trust") for account in accounts[1:]]
+
+    result = client.bulk_action(create_items=accounts, create_edges=edges, max_in_flight=4)
+    assert result
+    assert result.n_written == len(accounts) + len(edges)
+    assert all(not account._updated_properties for account in accounts)
+
+    client.reset_local_db()
+    accounts = client.search({"type": "Account", "service": "pipelined"})
+    assert len(accounts) == 200
+    assert sum(len(account.trust) for account in accounts) == len(edges)
+
+
 def test_bulk_update_delete(client: PodClient):
     person1 = Person(firstName="Alice")
     person2 = Person(firstName="Bob")
@@ -370,3 +396,208 @@ def test_update_schema():
 
     assert len(items) == 2
     assert items[1].field2 == "test2.2"
+
+
+def test_upsert_many():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        existing = [EmailMessage(externalId=f"message_{i}", content="old") for i in range(5)]
+        assert client.bulk_action(create_items=existing)
+
+        # Resolve external ids in the Pod, not in the local DB
+        client.reset_local_db()
+        items = [EmailMessage(externalId=f"message_{i}", content="new") for i in range(10)]
+        n_requests = pod.n_requests
+        assert client.upsert_many(items)
+        assert pod.n_requests - n_requests == 2
+
+        emails = client.search({"type": "EmailMessage"})
+        assert len(emails) == 10
+        assert all(email.content == "new" for email in emails)
+        assert {item.id for item in items[:5]} == {item.id for item in existing}
+
+        # Resolve external ids in the local DB
+        n_requests = pod.n_requests
+        assert client.upsert_many([EmailMessage(externalId="message_0", content="newer")])
+        assert pod.n_requests - n_requests == 1
+        assert len(client.search({"type": "EmailMessage", "externalId": "message_0"})) == 1
+
+
+def test_upsert_many_added_items():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        existing = [EmailMessage(externalId=f"message_{i}", content="old") for i in range(3)]
+        assert client.bulk_action(create_items=existing)
+        client.reset_local_db()
+
+        # Items that are in local_db under a generated id are moved to the id of the Pod item
+        items = [EmailMessage(externalId=f"message_{i}", content="new") for i in range(3)]
+        for item in items:
+            client.add_to_store(item)
+        old_ids = [item.id for item in items]
+        assert client.upsert_many(items)
+        assert [item.id for item in items] == [item.id for item in existing]
+        assert all(client.local_db.get(id) is None for id in old_ids)
+        assert all(client.local_db.get(item.id) is item for item in items)
+        assert not client.local_db.dirty
+        found = client.local_db.find(type="EmailMessage", externalId="message_0")
+        assert found == [items[0]]
+
+
+def test_upsert_many_search_error(monkeypatch):
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+
+        def failing_bulk(**kwargs):
+            raise PodError(500, "search failed")
+
+        monkeypatch.setattr(client.api, "bulk", failing_bulk)
+        items = [EmailMessage(externalId=f"message_{i}", content="new") for i in range(3)]
+        new_item = EmailMessage(content="no externalId")
+        # Items of a failed search are reported as failed, other items are written
+        result = client.upsert_many([*items, new_item])
+        assert not result
+        assert [item["externalId"] for item in result.failed["createItems"]] == [
+            item.externalId for item in items
+        ]
+        assert result.committed["createItems"][0]["id"] == new_item.id
+
+
+def test_get_many():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        account = Account(handle="alice")
+        emails = [EmailMessage(content=f"content_{i}") for i in range(25)]
+        for email in emails:
+            email.add_edge("sender", account)
+        edges = [email.get_edges("sender")[0] for email in emails]
+        assert client.bulk_action(create_items=[account, *emails], create_edges=edges)
+        client.reset_local_db()
+
+        ids = [email.id for email in reversed(emails)] + [emails[0].id]
+        n_requests = pod.n_requests
+        items = client.get_many(ids, batch_size=10)
+        assert pod.n_requests - n_requests == 3
+
+        # Input order, duplicates and edges are kept, items share the local DB identity map
+        assert [item.id for item in items] == ids
+        assert items[-2] is items[-1]
+        assert all(item.sender[0] is items[0].sender[0] for item in items)
+        assert items[0].sender[0].handle == "alice"
+        assert client.local_db.get(ids[0]) is items[0]
+
+        items = client.get_many(ids[:2], expanded=False)
+        assert [item.id for item in items] == ids[:2]
+
+        with pytest.raises(ValueError):
+            client.get_many([emails[0].id, "missing"])
+
+
+def test_search_projection():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        account = Account(handle="alice", displayName="Alice")
+        emails = [EmailMessage(content="content", subject=f"subject_{i}") for i in range(3)]
+        for email in emails:
+            email.add_edge("sender", account)
+        edges = [email.get_edges("sender")[0] for email in emails]
+        assert client.bulk_action(create_items=[account, *emails], create_edges=edges)
+        client.reset_local_db()
+
+        result = client.search({"type": "EmailMessage"}, properties=["subject", "sender.handle"])
+        assert sorted(email.subject for email in result) == [e.subject for e in emails]
+        assert all(email.content is None for email in result)
+        sender = result[0].sender[0]
+        assert sender.handle == "alice" and sender.displayName is None
+        assert all(email.sender[0] is sender for email in result)
+        assert not client.local_db.dirty
+
+        # Partially loaded items only update the loaded properties in the local DB
+        result = client.search({"type": "Account"}, properties=["displayName"], depth=0)
+        assert result[0] is sender
+        assert sender.handle == "alice" and sender.displayName == "Alice"
+
+        result = client.search({"type": "EmailMessage", "subject": "subject_1"}, edges=["sender"])
+        assert len(result) == 1 and result[0].content == "content"
+        client.reset_local_db()
+        result = client.search({"type": "EmailMessage"}, depth=0)
+        assert len(result) == 3 and all(not email.get_all_edges() for email in result)
+
+        with pytest.raises(ValueError):
+            client.search({"type": "EmailMessage"}, properties=["sender.owner.handle"], depth=1)
+
+
+def test_search_lazy():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        account = Account(handle="alice")
+        date_sent = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        emails = [EmailMessage(content=f"content_{i}", dateSent=date_sent) for i in range(5)]
+        for email in emails:
+            email.add_edge("sender", account)
+        edges = [email.get_edges("sender")[0] for email in emails]
+        assert client.bulk_action(create_items=[account, *emails], create_edges=edges)
+        client.reset_local_db()
+
+        result = client.search({"type": "EmailMessage"}, lazy=True)
+        assert len(result) == 5 and len(client.local_db.nodes) == 0
+        # Items are created on first access, and added to the local DB
+        email = result[2]
+        assert result[2] is email and email.content == "content_2"
+        assert client.local_db.get(email.id) is email
+        assert len(client.local_db.nodes) == 2
+        assert [e.content for e in result] == [f"content_{i}" for i in range(5)]
+        assert all(e.sender[0] is email.sender[0] for e in result)
+
+        client.reset_local_db()
+        views = client.search({"type": "EmailMessage"}, read_only=True)
+        assert [view.content for view in views] == [f"content_{i}" for i in range(5)]
+        assert views[0].dateSent == date_sent
+        assert views[0].sender[0].handle == "alice"
+        assert views[0].receiver == [] and views[0].subject is None
+        assert len(client.local_db.nodes) == 0
+        with pytest.raises(AttributeError):
+            views[0].content = "new content"
+        with pytest.raises(AttributeError):
+            views[0].unknown
+
+
+def test_item_batch():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        accounts = [Account(handle=f"account_{i}") for i in range(2)]
+        date_sent = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        emails = [
+            EmailMessage(content=f"content_{i}", dateSent=date_sent, sender=[accounts[i % 2]])
+            for i in range(6)
+        ]
+        batch = ItemBatch.from_items(emails)
+        assert len(batch) == 6 and batch.n_edges == 6
+        assert client.bulk_action(create_items=accounts)
+        # Batches are written without adding items to the local DB
+        assert client.bulk_action(create_items=batch)
+        assert all(client.local_db.get(email.id) is None for email in emails)
+
+        result = client.search({"type": "EmailMessage"}, batch=True)
+        assert isinstance(result, ItemBatch) and sorted(result.ids) == sorted(batch.ids)
+        assert result.values("dateSent") == [date_sent] * 6
+        by_id = {email.id: email for email in emails}
+        for email_id, targets in zip(result.ids, result.edge_targets("sender")):
+            assert targets == [by_id[email_id].sender[0].id]
+        with pytest.raises(ValueError):
+            client.search({"content": "content_1"}, batch=True)
+
+        items = result.to_items(targets={account.id: account for account in accounts})
+        assert [item.content for item in items] == result.values("content")
+        assert all(item.sender[0] is by_id[item.id].sender[0] for item in items)
+
+        query = Query("content", "sender.handle", "unknown")
+        values = query.execute(client, result)
+        assert values == query.execute(client, items)
+        assert values["sender.handle"] == [by_id[id].sender[0].handle for id in result.ids]
+
+        update = ItemBatch.from_columns(EmailMessage, ids=batch.ids[:2], content=["a", "b"])
+        assert client.bulk_action(update_items=update)
+        assert client.bulk_action(delete_items=ItemBatch.from_columns(EmailMessage, batch.ids[2:]))
+        client.reset_local_db()
+        assert sorted(e.content for e in client.search({"type": "EmailMessage"})) == ["a", "b"]
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from pymemri.data.schema import EmailMessage
+from pymemri.pod.codec import CODECS, get_codec
+
+pytest.importorskip("orjson")
+
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_codec_roundtrip(name):
+    codec = get_codec(name)
+    date = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    obj = {"id": "a", "n": 1, "x": 0.5, "b": True, "none": None, "date": date, "list": ["ü"]}
+
+    data = codec.dumps(obj)
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == {**obj, "date": 1640995200000}
+
+
+def test_codec_item_json():
+    email = EmailMessage(content="content", dateSent=datetime.now(timezone.utc))
+    for name in CODECS:
+        codec = get_codec(name)
+        # Datetimes are encoded by the codec, without converting them in `to_json`
+        data = codec.dumps(email.to_json(datetime_to_timestamp=False))
+        assert codec.loads(data) == email.to_json()
+
+
+def test_get_codec_unknown():
+    with pytest.raises(ValueError):
+        get_codec("unknown")
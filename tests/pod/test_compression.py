@@ -0,0 +1,69 @@
+import pytest
+
+from pymemri.data.schema import Person
+from pymemri.pod.client import PodClient
+from pymemri.pod.compression import (
+    GZIP,
+    ZSTD,
+    Compression,
+    available_encodings,
+    compress,
+    decompress,
+)
+from pymemri.test_utils import LocalPod
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_compress_roundtrip(encoding):
+    data = b'{"displayName": "Alice"}' * 1000
+    compressed = compress(data, encoding)
+    assert len(compressed) < len(data)
+    assert decompress(compressed, encoding) == data
+
+
+def test_compression_threshold():
+    compression = Compression(GZIP, threshold=100)
+    body, headers = compression.compress_body(b"x" * 99)
+    assert body == b"x" * 99 and headers == {}
+
+    body, headers = compression.compress_body(b"x" * 1000)
+    assert headers == {"Content-Encoding": GZIP}
+    assert decompress(body, GZIP) == b"x" * 1000
+    assert compression.stats.n_compressed == 1
+    assert compression.stats.request_ratio == 1000 / len(body)
+
+
+def test_compression_unavailable():
+    with pytest.raises(ValueError):
+        Compression("unknown")
+    if ZSTD not in available_encodings():
+        with pytest.raises(ValueError):
+            Compression(ZSTD)
+
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_compressed_requests(encoding):
+    with LocalPod(compress_responses=True) as pod:
+        client = PodClient(url=pod.url, compression=Compression(encoding, threshold=1024))
+        persons = [Person(displayName=f"person {i}") for i in range(100)]
+        assert client.bulk_action(create_items=persons)
+
+        # Small requests are sent uncompressed, the bulk request is compressed
+        assert pod.request_encodings == {encoding: 1}
+        result = client.search({"type": "Person"})
+        assert sorted(p.displayName for p in result) == sorted(p.displayName for p in persons)
+
+        stats = client.api.compression.stats
+        assert stats.request_ratio > 2
+        # Responses are gzipped by the pod and decoded by the client
+        assert stats.response_bytes_received > 0
+        assert stats.response_ratio > 2
+
+
+def test_uncompressed_by_default():
+    with LocalPod(compress_responses=True) as pod:
+        client = PodClient(url=pod.url)
+        assert client.bulk_action(create_items=[Person(displayName="a" * 10000)])
+        assert client.search({"type": "Person"})[0].displayName == "a" * 10000
+        assert pod.request_encodings == {}
+        assert client.api.compression is None
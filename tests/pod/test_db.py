@@ -0,0 +1,64 @@
+import copy
+import pickle
+
+from pymemri.data.schema import Account, EmailMessage, Person
+from pymemri.pod.db import DB, Priority
+
+
+def test_db_find():
+    db = DB(indexed_properties=["service"])
+    emails = [
+        EmailMessage(id=EmailMessage.create_id(), externalId=f"message_{i}", subject=str(i % 2))
+        for i in range(10)
+    ]
+    accounts = [Account(id=Account.create_id(), service="gmail", handle=f"a{i}") for i in range(3)]
+    for item in emails + accounts:
+        db.add(item)
+
+    assert db.find(externalId="message_3") == [emails[3]]
+    assert db.find(type="EmailMessage", externalId="message_3") == [emails[3]]
+    assert db.find(type=Account, externalId="message_3") == []
+    assert len(db.find(type=EmailMessage)) == 10
+    assert len(db.find(type="EmailMessage", subject="1")) == 5
+    assert len(db.find(service="gmail")) == 3
+    assert db.find(type="Person") == []
+
+    # Property writes update the index
+    emails[3].externalId = "changed"
+    assert db.find(externalId="message_3") == []
+    assert db.find(externalId="changed") == [emails[3]]
+
+    # Indexes can be added later
+    db.add_index("handle")
+    assert db.find(handle="a1") == [accounts[1]]
+
+
+def test_db_index_merge():
+    db = DB()
+    person = Person(id=Person.create_id(), externalId="alice")
+    db.add(person)
+    person.reset_local_sync_state()
+
+    remote_person = Person(id=person.id, externalId="alice_remote")
+    db.merge(remote_person, Priority.remote)
+    assert db.find(externalId="alice") == []
+    assert db.find(externalId="alice_remote") == [person]
+
+
+def test_item_copy_without_db():
+    db = DB()
+    accounts = [Account(handle=f"account_{i}") for i in range(100)]
+    for account in accounts:
+        account.create_id_if_not_exists()
+        db.add(account)
+    item = accounts[0]
+    assert item._local_db() is db
+
+    for copied in [item.copy(), item.copy(deep=True), copy.deepcopy(item)]:
+        assert copied._local_db() is None and copied.handle == item.handle
+        copied.handle = "changed"
+        assert db.get(item.id) is item and item.handle == "account_0"
+
+    unpickled = pickle.loads(pickle.dumps(item))
+    assert unpickled._local_db() is None and unpickled.handle == item.handle
+    assert len(pickle.dumps(item)) < 2 * len(pickle.dumps(Account(id=item.id, handle=item.handle)))
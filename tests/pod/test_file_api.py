@@ -31,7 +31,7 @@ def test_create_file(client: PodClient, photo: Photo):
 
 def test_create_photo(client: PodClient, photo: Photo):
     client.create_photo(photo)
-    sleep(1)
+    assert client.flush_uploads()
 
     client.reset_local_db()
     photo_from_db = client.get_photo(photo.id)
@@ -0,0 +1,84 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pymemri.data.schema import Photo
+from pymemri.pod.client import PodClient
+from pymemri.pod.file_cache import STALE_DOWNLOAD_AGE, FileCache
+from pymemri.test_utils import LocalPod
+
+
+def test_file_cache_lru(tmp_path):
+    cache = FileCache(tmp_path, max_size=25)
+    files = {str(i) * 64: str(i).encode() * 10 for i in range(3)}
+
+    def downloader(sha):
+        return lambda f: f.write(files[sha])
+
+    shas = list(files)
+    assert cache.read(shas[0], downloader(shas[0])) == files[shas[0]]
+    assert cache.read(shas[1], downloader(shas[1])) == files[shas[1]]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    # Access the first file, such that the second file is least recently used
+    assert cache.open(shas[0], downloader(shas[0]))[:] == files[shas[0]]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.read(shas[2], downloader(shas[2]))
+    assert shas[0] in cache and shas[2] in cache and shas[1] not in cache
+    assert cache.size == 20
+    assert not cache.file_path(shas[1]).exists()
+
+    # The cache persists across instances
+    cache = FileCache(tmp_path, max_size=25)
+    assert len(cache) == 2 and cache.size == 20
+
+
+def test_get_photo_file_cache(tmp_path):
+    photo = Photo.from_np(np.random.randint(0, 255 + 1, size=(64, 64), dtype=np.uint8))
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url, file_cache=tmp_path)
+        client.create_photo(photo, asyncFlag=False)
+
+        for _ in range(3):
+            client.reset_local_db()
+            assert client.get_photo(photo.id).data == photo.data
+        assert (client.file_cache.hits, client.file_cache.misses) == (2, 1)
+        assert client.open_file(photo.file[0].sha256)[:] == photo.data
+
+
+def test_file_cache_skips_downloads(tmp_path):
+    cache = FileCache(tmp_path)
+    sha = "a" * 64
+    cache.read(sha, lambda f: f.write(b"data"))
+
+    # Temporary files of interrupted downloads are not cache entries, stale ones are removed
+    stale = tmp_path / "aa" / ".download-stale"
+    stale.write_bytes(b"partial")
+    old = time.time() - STALE_DOWNLOAD_AGE - 1
+    os.utime(stale, (old, old))
+    in_progress = tmp_path / "aa" / ".download-in-progress"
+    in_progress.write_bytes(b"partial")
+
+    cache = FileCache(tmp_path)
+    assert len(cache) == 1 and cache.size == 4 and sha in cache
+    assert not stale.exists() and in_progress.exists()
+
+
+def test_file_cache_concurrent_eviction(tmp_path):
+    # Every download evicts the other files, while other threads are reading them
+    cache = FileCache(tmp_path, max_size=1000)
+    files = {f"{i:02x}" * 32: bytes([i]) * 1000 for i in range(8)}
+    shas = list(files) * 50
+
+    def read(sha):
+        if len(cache) % 2:
+            return bytes(cache.open(sha, lambda f: f.write(files[sha])))
+        return cache.read(sha, lambda f: f.write(files[sha]))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(read, shas))
+    assert results == [files[sha] for sha in shas]
+    assert cache.size <= 1000
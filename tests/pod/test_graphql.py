@@ -3,10 +3,10 @@ import uuid
 
 import pytest
 
-from pymemri.data.schema import Account, Edge, Message, Person
+from pymemri.data.schema import Account, Edge, EmailMessage, Message, Person
 from pymemri.pod.api import PodAPI, PodError
 from pymemri.pod.client import PodClient
-from pymemri.pod.graphql_utils import GQLQuery
+from pymemri.pod.graphql_utils import GQLQuery, search_query
 
 
 @pytest.fixture(scope="module")
@@ -54,6 +54,29 @@ def test_format_query():
     )
 
 
+def test_search_query():
+    query = search_query(
+        EmailMessage,
+        {"type": "EmailMessage", "service": "gmail", "dateServerModified>=": 5, "_limit": 10},
+        properties=["subject", "sender.handle"],
+    )
+    assert str(query) == (
+        "query { EmailMessage "
+        '(filter: {service: {eq: "gmail"}, dateServerModified: {gte: 5}}, limit: 10) '
+        "{ id subject sender { id handle } } }"
+    )
+
+    query = search_query(EmailMessage, edges=["sender"], properties=["subject"], depth=1)
+    assert "sender { id " in str(query) and "receiver" not in str(query)
+    # Without named edges, all edges are expanded up to depth
+    assert "receiver { id " in str(search_query(EmailMessage, properties=["subject"], depth=1))
+
+    with pytest.raises(ValueError):
+        search_query(EmailMessage, edges=["unknown"])
+    with pytest.raises(ValueError):
+        search_query(EmailMessage, {"ids": ["a"]}, properties=["subject"])
+
+
 def test_graphql_1(api: PodAPI):
 
     query = """
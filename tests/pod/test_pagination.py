@@ -0,0 +1,75 @@
+import pytest
+
+from pymemri.data.schema import Account
+from pymemri.pod.client import PodClient
+from pymemri.pod.pagination import keyset_pages, prefetch
+from pymemri.test_utils import LocalPod
+
+
+class FakeSearch:
+    """Search over a list of items sorted by dateServerModified, records all queries."""
+
+    def __init__(self, timestamps):
+        self.items = [{"id": str(i), "dateServerModified": t} for i, t in enumerate(timestamps)]
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        result = [
+            item
+            for item in self.items
+            if item["dateServerModified"] >= query.get("dateServerModified>=", 0)
+            and item["dateServerModified"] < query.get("dateServerModified<", float("inf"))
+        ]
+        offset = query.get("_offset", 0)
+        return result[offset : offset + query["_limit"]]
+
+
+@pytest.mark.parametrize(
+    "timestamps",
+    [
+        list(range(100)),
+        [i // 3 for i in range(100)],
+        # More items with the same timestamp than fit in a page
+        [0] * 25 + [1] * 3 + [2] * 40 + [3],
+        [],
+    ],
+)
+def test_keyset_pages(timestamps):
+    search = FakeSearch(timestamps)
+    pages = list(keyset_pages(search, {}, limit=10))
+
+    assert [item["id"] for page in pages for item in page] == [
+        str(i) for i in range(len(timestamps))
+    ]
+    if len(set(timestamps)) == len(timestamps):
+        assert all("_offset" not in query for query in search.queries)
+
+
+def test_prefetch():
+    assert list(prefetch(iter(range(100)), n=3)) == list(range(100))
+
+    def failing():
+        yield 1
+        raise ValueError("error in producer")
+
+    pages = prefetch(failing())
+    assert next(pages) == 1
+    with pytest.raises(ValueError):
+        next(pages)
+
+
+def test_search_paginate_local_pod():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        for i in range(5):
+            client.bulk_action(
+                create_items=[Account(identifier=str(j), service="paginate") for j in range(i * 30)]
+            )
+        client.reset_local_db()
+
+        accounts = client.search({"type": "Account", "service": "paginate"})
+        pages = list(client.search_paginate({"type": "Account", "service": "paginate"}, limit=16))
+
+        assert all(len(page) == 16 for page in pages[:-1])
+        assert [a.id for a in accounts] == [a.id for page in pages for a in page]
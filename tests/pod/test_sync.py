@@ -0,0 +1,143 @@
+from pymemri.data.schema import Account, EmailMessage, Person
+from pymemri.pod.client import PodClient
+from pymemri.pod.db import DB
+from pymemri.test_utils import LocalPod
+
+
+def test_dirty_tracking():
+    db = DB()
+    person = Person(id=Person.create_id(), firstName="Alice")
+    account = Account(id=Account.create_id(), handle="alice")
+    db.add(person)
+    db.add(account)
+    assert db.dirty == {person.id, account.id}
+
+    person.reset_local_sync_state()
+    account.reset_local_sync_state()
+    assert db.dirty == set()
+
+    person.lastName = "Awesome"
+    assert db.dirty == {person.id}
+
+    account.add_edge("owner", person)
+    assert db.dirty == {person.id, account.id}
+
+    # Edges from the Pod are not new
+    person.reset_local_sync_state()
+    person._add_synced_edge("account", account)
+    assert db.dirty == {account.id}
+
+
+def test_sync_dirty_items():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        emails = [EmailMessage(content=f"content_{i}") for i in range(100)]
+        client.bulk_action(create_items=emails)
+        assert not client.local_db.dirty
+
+        # Sync without changes does not send requests
+        n_requests = pod.n_requests
+        client.sync()
+        assert pod.n_requests == n_requests
+
+        emails[0].content = "changed"
+        account = Account(handle="alice")
+        account.store(client)
+        emails[1].add_edge("sender", account)
+        assert client.sync()
+        assert not client.local_db.dirty
+
+        client2 = PodClient(
+            url=pod.url, owner_key=client.owner_key, database_key=client.database_key
+        )
+        assert client2.get(emails[0].id).content == "changed"
+        assert client2.get(emails[1].id).sender[0].handle == "alice"
+
+
+def test_sync_fetches_remote_changes_only():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        emails = [EmailMessage(content=f"content_{i}") for i in range(10)]
+        client.bulk_action(create_items=emails)
+        for email in client.search({"type": "EmailMessage"}):
+            assert email.dateServerModified is not None
+
+        client2 = PodClient(
+            url=pod.url, owner_key=client.owner_key, database_key=client.database_key
+        )
+        remote_email = client2.get(emails[0].id)
+        remote_email.subject = "remote subject"
+        client2.update_item(remote_email)
+
+        for email in emails:
+            email.content = "local content"
+        remote_changes = client._get_remote_changes(emails)
+        assert [item.id for item in remote_changes] == [emails[0].id]
+
+        assert client.sync()
+        assert emails[0].subject == "remote subject"
+        assert client2.get(emails[0].id).content == "local content"
+
+
+def test_sync_after_local_writes():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        emails = [EmailMessage(content=f"content_{i}") for i in range(10)]
+        client.bulk_action(create_items=emails)
+        account = Account(handle="alice")
+        client.create(account)
+
+        # Written items get the timestamp of the Pod, and are not fetched as remote changes
+        remote = {item.id: item for item in client.search({"type": "EmailMessage"})}
+        assert [email.dateServerModified for email in emails] == [
+            remote[email.id].dateServerModified for email in emails
+        ]
+        assert account.dateServerModified is not None
+        for email in emails:
+            email.content = "local content"
+        account.displayName = "Alice"
+        assert client._get_remote_changes([*emails, account]) == []
+
+        # A sync round with local writes, followed by a remote change
+        assert client.sync()
+        client2 = PodClient(
+            url=pod.url, owner_key=client.owner_key, database_key=client.database_key
+        )
+        remote_email = client2.get(emails[0].id)
+        remote_email.subject = "remote subject"
+        client2.update_item(remote_email)
+
+        emails[1].content = "second local content"
+        assert client.update_item(emails[1])
+        emails[0].content = "second local content"
+        emails[1].content = "third local content"
+        remote_changes = client._get_remote_changes(emails[:2])
+        assert [item.id for item in remote_changes] == [emails[0].id]
+
+        assert client.sync()
+        assert emails[0].subject == "remote subject"
+        assert client2.get(emails[1].id).content == "third local content"
+
+
+def test_sync_merges_remote_edges_once():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        account = Account(handle="alice")
+        email = EmailMessage(content="content")
+        email.add_edge("sender", account)
+        client.bulk_action(create_items=[email, account], create_edges=email.get_edges("sender"))
+
+        client2 = PodClient(
+            url=pod.url, owner_key=client.owner_key, database_key=client.database_key
+        )
+        remote_email = client2.get(email.id)
+        remote_email.subject = "remote subject"
+        remote_email.add_edge("receiver", client2.get(account.id))
+        client2.sync()
+
+        email.content = "local content"
+        assert client.sync()
+        assert email.subject == "remote subject"
+        # Edges to targets in local_db are merged as the same object, and not duplicated
+        assert len(email.sender) == 1 and email.sender[0] is account
+        assert len(email.receiver) == 1 and email.receiver[0] is account
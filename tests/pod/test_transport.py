@@ -0,0 +1,96 @@
+import time
+
+from urllib3.connection import HTTPConnection
+
+from pymemri.pod.api import PodAPI
+from pymemri.pod.client import PodClient
+from pymemri.pod.files import file_sha256
+from pymemri.pod.transport import (
+    KEEPALIVE_SOCKET_OPTIONS,
+    TransportRegistry,
+    pod_origin,
+)
+from pymemri.test_utils import LocalPod
+
+
+def test_pod_origin():
+    assert pod_origin("http://Localhost:3030/v4/abc") == "http://localhost:3030"
+    assert pod_origin("https://pod.example.com") == "https://pod.example.com"
+
+
+def used_session(transports, url):
+    with transports.session(url) as session:
+        return session
+
+
+def test_shared_sessions():
+    default_socket_options = list(HTTPConnection.default_socket_options)
+    transports = TransportRegistry()
+    with LocalPod() as pod, LocalPod() as other_pod:
+        clients = [PodClient(url=pod.url, transports=transports) for _ in range(3)]
+        other_client = PodClient(url=other_pod.url, transports=transports)
+
+        # Clients for the same pod share one session
+        sessions = [used_session(transports, client.api._url) for client in clients]
+        assert len({id(session) for session in sessions}) == 1
+        with other_client.api.session() as other_session:
+            assert other_session is not sessions[0]
+        assert len(transports) == 2
+
+        adapter = sessions[0].get_adapter(pod.url)
+        assert adapter.poolmanager.connection_pool_kw["socket_options"] == KEEPALIVE_SOCKET_OPTIONS
+    # Creating clients does not change the global socket options
+    assert HTTPConnection.default_socket_options == default_socket_options
+    PodAPI("key", "key", url="http://localhost:3030")
+    assert HTTPConnection.default_socket_options == default_socket_options
+
+
+def test_idle_eviction():
+    transports = TransportRegistry(max_idle=0.001, pool_maxsize=4)
+    session = used_session(transports, "http://localhost:3030")
+    time.sleep(0.01)
+    assert used_session(transports, "http://localhost:3030") is not session
+    time.sleep(0.01)
+    used_session(transports, "http://localhost:3031")
+    # The session for port 3030 was idle and is evicted
+    assert len(transports) == 1
+
+    transports.configure(max_idle=60.0)
+    assert len(transports) == 0
+    session = used_session(transports, "http://localhost:3030")
+    assert used_session(transports, "http://localhost:3030") is session
+    assert session.get_adapter("http://localhost:3030")._pool_maxsize == 4
+
+
+def test_no_eviction_in_flight():
+    transports = TransportRegistry(max_idle=0.001)
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url, transports=transports)
+        data = b"file data" * 1000
+        assert client.upload_file(data, asyncFlag=False)
+        sha = file_sha256(data)
+
+        # A streamed download keeps its session in use until the response is closed
+        with client.api._stream_file(sha) as response:
+            session = used_session(transports, pod.url)
+            time.sleep(0.01)
+            used_session(transports, "http://localhost:3031")
+            assert len(transports) == 2
+            assert b"".join(response.iter_content(100)) == data
+            assert used_session(transports, pod.url) is session
+
+        time.sleep(0.01)
+        used_session(transports, "http://localhost:3031")
+        assert len(transports) == 1
+
+
+def test_configure_in_flight():
+    transports = TransportRegistry()
+    with transports.session("http://localhost:3030") as session:
+        closed = []
+        session.close = lambda: closed.append(session)
+        transports.configure(pool_maxsize=4)
+        # The session is replaced for new requests, and closed once it is not in use
+        assert used_session(transports, "http://localhost:3030") is not session
+        assert not closed
+    assert closed == [session]
@@ -0,0 +1,199 @@
+import io
+import os
+import time
+from hashlib import sha256
+from threading import Lock
+
+import pytest
+
+from pymemri.data.schema import File
+from pymemri.pod.client import PodClient, PodError
+from pymemri.pod.files import file_sha256, read_range
+from pymemri.pod.uploads import UploadExecutor
+from pymemri.test_utils import LocalPod
+
+
+def test_upload_executor_bounds():
+    lock = Lock()
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    def upload(file):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.01)
+        with lock:
+            state["in_flight"] -= 1
+        return file != b"fail"
+
+    executor = UploadExecutor(upload, max_workers=4, max_memory=20)
+    results = []
+    futures = [executor.submit(b"0123456789", callback=results.append) for _ in range(10)]
+    assert executor._pending_bytes <= 20
+    futures.append(executor.submit(b"fail"))
+    assert not executor.flush()
+
+    # max_memory allows 2 pending files of 10 bytes
+    assert state["max_in_flight"] <= 2
+    assert [f.result() for f in futures] == [True] * 10 + [False]
+    assert results == [True] * 10
+    assert executor.n_pending == 0
+    assert executor.stats.n_uploaded == 10
+    assert executor.stats.n_failed == 1
+    assert executor.stats.bytes_uploaded == 100
+    assert executor.stats.throughput > 0
+    executor.shutdown()
+
+
+def test_upload_file_async():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        files = [f"file_{i}".encode() for i in range(20)]
+        futures = [client.upload_file_async(file) for file in files]
+        assert client.flush_uploads()
+        assert all(future.result() for future in futures)
+        assert all(client.get_file(sha256(file).hexdigest()) == file for file in files)
+
+
+def test_file_sha256(tmp_path):
+    data = os.urandom(3 * 2**20 + 1)
+    path = tmp_path / "file"
+    path.write_bytes(data)
+    expected = sha256(data).hexdigest()
+
+    assert file_sha256(data) == expected
+    with open(path, "rb") as f:
+        assert file_sha256(f) == expected
+        assert f.tell() == 0
+    assert file_sha256(io.BytesIO(data)) == expected
+    (tmp_path / "empty").write_bytes(b"")
+    with open(tmp_path / "empty", "rb") as f:
+        assert file_sha256(f) == sha256(b"").hexdigest()
+
+
+def test_upload_file_streaming(tmp_path):
+    data = os.urandom(2**20)
+    path = tmp_path / "file"
+    path.write_bytes(data)
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        assert client.upload_file(path, asyncFlag=False)
+        with open(path, "rb") as f:
+            assert client.upload_file_async(f).result()
+        assert pod.files == {sha256(data).hexdigest(): data}
+
+
+def test_download_file(tmp_path):
+    data = os.urandom(2**20 + 10)
+    sha = sha256(data).hexdigest()
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        assert client.upload_file(data, asyncFlag=False)
+
+        path = tmp_path / "file"
+        assert client.download_file(sha, path) == len(data)
+        assert path.read_bytes() == data
+
+        buffer = bytearray(len(data))
+        assert client.download_file(sha, buffer) == len(data)
+        assert buffer == data
+
+        with pytest.raises(ValueError):
+            client.download_file(sha, bytearray(10))
+
+        assert client.read_file_range(sha, 100, 10) == data[100:110]
+        assert client.read_file_range(sha, len(data) - 5, 10) == data[-5:]
+
+        pod.files[sha] = b"corrupted"
+        with pytest.raises(PodError):
+            client.download_file(sha, io.BytesIO())
+
+
+def test_read_range():
+    chunks = [b"0123", b"4567", b"89"]
+    assert read_range(iter(chunks), 0, 3) == b"012"
+    assert read_range(iter(chunks), 3, 4) == b"3456"
+    assert read_range(iter(chunks), 8, 10) == b"89"
+
+
+def test_upload_dedup(tmp_path):
+    files = [f"file_{i}".encode() for i in range(10)]
+    record_path = tmp_path / "uploaded"
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url, upload_record=record_path)
+        assert all(f.result() for f in client.upload_files(files[:5], check_pod=False))
+
+        # Files in the Pod are only checked, the other files are uploaded
+        other_client = PodClient(
+            url=pod.url, owner_key=client.owner_key, database_key=client.database_key
+        )
+        n_requests = pod.n_requests
+        futures = other_client.upload_files(files)
+        assert all(f.result() for f in futures)
+        assert pod.n_requests - n_requests == 10 + 5
+        assert len(pod.files) == 10
+
+        # Files in the upload record are not checked or sent
+        client = PodClient(
+            url=pod.url,
+            owner_key=client.owner_key,
+            database_key=client.database_key,
+            upload_record=record_path,
+            create_account=False,
+        )
+        n_requests = pod.n_requests
+        assert client.upload_file(files[0], asyncFlag=False)
+        assert all(f.result() for f in client.upload_files(files[:5]))
+        assert pod.n_requests == n_requests
+
+
+def test_upload_record_scope(tmp_path):
+    data = b"file data"
+    sha = sha256(data).hexdigest()
+    record_path = tmp_path / "uploaded"
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url, upload_record=record_path)
+        file = File(sha256=sha)
+        assert client.upload_file(data, asyncFlag=False) and client.create(file)
+
+        # The record of one account is not used for other accounts
+        other_client = PodClient(url=pod.url, upload_record=record_path)
+        assert sha in client.upload_record and sha not in other_client.upload_record
+
+        # Deleted files are removed from the record, and uploaded again
+        assert client.delete_file(file.id) and sha not in pod.files
+        assert sha not in client.upload_record
+        client = PodClient(
+            url=pod.url,
+            owner_key=client.owner_key,
+            database_key=client.database_key,
+            upload_record=record_path,
+            create_account=False,
+        )
+        assert sha not in client.upload_record
+        assert client.upload_file(data, asyncFlag=False) and sha in pod.files
+
+
+def test_empty_file_exists():
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        assert client.upload_file(b"", asyncFlag=False)
+        sha = sha256(b"").hexdigest()
+        assert client.api.file_exists(sha)
+        assert client.api.files_exist([sha, sha256(b"missing").hexdigest()]) == {sha}
+
+
+def test_files_exist_transient_error(monkeypatch):
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+
+        def unavailable(*args, **kwargs):
+            raise PodError(503, "Service unavailable")
+
+        monkeypatch.setattr(client.api, "read_file_range", unavailable)
+        with pytest.raises(PodError):
+            client.api.files_exist(["abc"])
+
+        # Files that cannot be checked are uploaded
+        assert all(f.result() for f in client.upload_files([b"file"]))
+        assert sha256(b"file").hexdigest() in pod.files
@@ -0,0 +1,42 @@
+"""
+Benchmark adding many edges to one item, in edges per second.
+
+Adds `n` receivers to a `MessageChannel` with `add_edge`, and removes them again.
+
+Usage: python tools/benchmarks/bench_add_edges.py [--edges 1000 10000]
+"""
+import argparse
+import time
+
+from pymemri.data.schema import Account, MessageChannel
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'edges':>7} {'add (s)':>8} {'edges/s':>10} {'remove (s)':>11}")
+    for n in args.edges:
+        accounts = [Account(handle=f"account {i}") for i in range(n)]
+        channel = MessageChannel(name="channel")
+
+        start = time.perf_counter()
+        for account in accounts:
+            channel.add_edge("receiver", account)
+        # Adding existing edges does not add duplicates
+        for account in accounts[:100]:
+            channel.add_edge("receiver", account)
+        add_duration = time.perf_counter() - start
+        assert len(channel.receiver) == n
+
+        start = time.perf_counter()
+        for account in accounts[::10]:
+            channel.remove_edge("receiver", account)
+        remove_duration = time.perf_counter() - start
+
+        print(f"{n:7d} {add_duration:8.3f} {n / add_duration:10.0f} {remove_duration:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
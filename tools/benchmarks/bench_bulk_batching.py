@@ -0,0 +1,85 @@
+"""
+Benchmark packing of bulk payloads into batches, from 1k up to 1M items.
+
+Compares `BulkBatcher` against the previous `PodClient.gather_batch` loop, which restarts
+enumeration for every batch. The legacy loop is quadratic in the number of batches, use
+`--legacy-max` to limit the input sizes it runs on.
+
+Usage: python tools/benchmarks/bench_bulk_batching.py [--legacy-max 100000]
+"""
+import argparse
+import time
+
+from pymemri.pod.batching import BulkBatcher
+
+
+def make_payloads(n):
+    return [
+        {
+            "type": "EmailMessage",
+            "id": f"{i:032x}",
+            "externalId": f"message-{i}",
+            "subject": f"Subject of message {i}",
+            "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+            "dateSent": 1650000000000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_gather_batch(items, start_idx, start_size=0, max_size=5000000):
+    idx = start_idx
+    total_size = start_size
+    batch_items = []
+    for i, x in enumerate(items):
+        if i < idx:
+            continue
+        elif len(str(x)) > max_size:
+            idx = i + 1
+        elif total_size + len(str(x)) < max_size:
+            batch_items.append(x)
+            total_size += len(str(x))
+            idx = i + 1
+        else:
+            break
+    return batch_items, idx, total_size
+
+
+def run_legacy(payloads):
+    idx, n_batches = 0, 0
+    while idx < len(payloads):
+        _, idx, _ = legacy_gather_batch(payloads, idx)
+        n_batches += 1
+    return n_batches
+
+
+def run_batcher(payloads):
+    n_batches = 0
+    for batch in BulkBatcher().batches(create_items=payloads):
+        batch.to_bytes()
+        n_batches += 1
+    return n_batches
+
+
+def timed(fn, payloads):
+    start = time.perf_counter()
+    n_batches = fn(payloads)
+    return time.perf_counter() - start, n_batches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'items':>10} {'batches':>8} {'batcher (s)':>12} {'items/s':>12} {'legacy (s)':>12}")
+    for n in args.sizes:
+        payloads = make_payloads(n)
+        t_new, n_batches = timed(run_batcher, payloads)
+        legacy = f"{timed(run_legacy, payloads)[0]:12.3f}" if n <= args.legacy_max else f"{'-':>12}"
+        print(f"{n:>10} {n_batches:>8} {t_new:12.3f} {n / t_new:12.0f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark loading items by id with their edges against a `LocalPod`.
+
+Compares a loop of `PodClient.get`, which sends two requests per item,
+with `PodClient.get_many`, which sends one bulk search per `--batch-size` ids.
+
+Usage: python tools/benchmarks/bench_get_many.py [--items 1000] [--latency 0.001]
+"""
+import argparse
+import time
+
+from pymemri.data.schema import Account, EmailMessage
+from pymemri.pod.client import PodClient
+from pymemri.test_utils import LocalPod
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        account = Account(handle="bench")
+        emails = [EmailMessage(content=f"content_{i}") for i in range(args.items)]
+        for email in emails:
+            email.add_edge("sender", account)
+        edges = [email.get_edges("sender")[0] for email in emails]
+        client.bulk_action(create_items=[account, *emails], create_edges=edges)
+        ids = [email.id for email in emails]
+        pod.latency = args.latency
+
+        methods = {
+            "get": lambda: [client.get(id) for id in ids],
+            "get_many": lambda: client.get_many(ids, batch_size=args.batch_size),
+        }
+
+        durations = {}
+        print(f"{'method':>10} {'requests':>9} {'time (s)':>9} {'items/s':>9}")
+        for name, method in methods.items():
+            client.reset_local_db()
+            n_requests = pod.n_requests
+            start = time.perf_counter()
+            items = method()
+            durations[name] = time.perf_counter() - start
+            assert [item.id for item in items] == ids
+            n_requests = pod.n_requests - n_requests
+            print(
+                f"{name:>10} {n_requests:>9} {durations[name]:9.3f} "
+                f"{len(ids) / durations[name]:9.0f}"
+            )
+        print(f"speedup: {durations['get'] / durations['get_many']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Microbenchmarks of attribute access on items, in nanoseconds per operation.
+
+Measures getting and setting properties, and traversing edges, on an `EmailMessage`
+and on a plain object with the same attributes as baseline.
+
+Usage: python tools/benchmarks/bench_item_access.py [--number 100000] [--edges 10]
+"""
+import argparse
+import timeit
+
+from pymemri.data.schema import Account, EmailMessage
+
+
+class PlainMessage:
+    def __init__(self, content, sender):
+        self.content = content
+        self.sender = sender
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=100000)
+    parser.add_argument("--edges", type=int, default=10)
+    args = parser.parse_args()
+
+    senders = [Account(handle=f"account {i}") for i in range(args.edges)]
+    item = EmailMessage(content="content", sender=senders)
+    plain = PlainMessage(content="content", sender=senders)
+    values = ["a", "b"]
+
+    def set_property(obj):
+        # Alternate values, such that every set modifies the property
+        i = 0
+
+        def run():
+            nonlocal i
+            obj.content = values[i & 1]
+            i += 1
+
+        return run
+
+    benchmarks = {
+        "get property": (lambda: item.content, lambda: plain.content),
+        "set property": (set_property(item), set_property(plain)),
+        "get edge": (lambda: item.sender, lambda: plain.sender),
+        "traverse edges": (
+            lambda: [account.handle for account in item.sender],
+            lambda: [account.handle for account in plain.sender],
+        ),
+    }
+
+    print(f"{'operation':>15} {'item (ns)':>10} {'plain (ns)':>11} {'ratio':>7}")
+    for name, (item_fn, plain_fn) in benchmarks.items():
+        item_ns = min(timeit.repeat(item_fn, number=args.number, repeat=3)) / args.number * 1e9
+        plain_ns = min(timeit.repeat(plain_fn, number=args.number, repeat=3)) / args.number * 1e9
+        print(f"{name:>15} {item_ns:10.0f} {plain_ns:11.0f} {item_ns / plain_ns:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark the memory of items compared to an `ItemBatch` holding the same items.
+
+Creates `--items` EmailMessages from Pod JSON as items and as a batch, and reports the
+memory per item and the time to create them and to encode them for a bulk request.
+
+Usage: python tools/benchmarks/bench_item_batch.py [--items 100000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from pymemri.data.schema import EmailMessage, ItemBatch
+
+
+def measure(fn):
+    """Returns the result of `fn`, its duration and the memory it allocates."""
+    start = time.perf_counter()
+    fn()
+    duration = time.perf_counter() - start
+    # Memory is measured in a separate run, as tracing slows down allocations
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+
+    data = [
+        {
+            "id": f"{i:032x}",
+            "type": "EmailMessage",
+            "subject": f"subject {i % 100}",
+            "content": f"content {i}",
+            "service": "bench",
+            "dateSent": 1640995200000 + i,
+            "dateCreated": 1640995200000,
+            "dateServerModified": 1640995200000,
+            "deleted": False,
+        }
+        for i in range(args.items)
+    ]
+
+    items, items_time, items_size = measure(lambda: [EmailMessage.from_pod_json(d) for d in data])
+    batch, batch_time, batch_size = measure(lambda: ItemBatch.from_json(EmailMessage, data))
+
+    print(f"{'':>6} {'create (s)':>11} {'bytes/item':>11} {'to_json (s)':>12}")
+    for name, create_time, size, to_json in [
+        ("items", items_time, items_size, lambda: [item.to_json() for item in items]),
+        ("batch", batch_time, batch_size, lambda: list(batch.iter_json())),
+    ]:
+        start = time.perf_counter()
+        to_json()
+        to_json_time = time.perf_counter() - start
+        print(f"{name:>6} {create_time:11.3f} {size / args.items:11.0f} {to_json_time:12.3f}")
+    print(f"memory: {items_size / batch_size:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
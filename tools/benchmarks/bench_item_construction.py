@@ -0,0 +1,47 @@
+"""
+Benchmark creating items from Pod JSON, in items per second.
+
+Compares validated construction with `ItemBase.from_json` and trusted construction
+with `ItemBase.from_pod_json`, for the same JSON as returned by a Pod search.
+
+Usage: python tools/benchmarks/bench_item_construction.py [--items 20000]
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+from pymemri.data.schema import EmailMessage
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=20000)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    data = []
+    for i in range(args.items):
+        json = EmailMessage(
+            subject=f"subject {i}", content="content", service="bench", dateSent=now
+        ).to_json()
+        json.update({"dateCreated": 1640995200000, "dateServerModified": 1640995200000})
+        data.append({**json, "id": str(i), "deleted": False})
+
+    methods = {
+        "from_json": EmailMessage.from_json,
+        "from_pod_json": EmailMessage.from_pod_json,
+    }
+    throughput = {}
+    print(f"{'method':>14} {'time (s)':>9} {'items/s':>10}")
+    for name, method in methods.items():
+        start = time.perf_counter()
+        for json in data:
+            method(json)
+        duration = time.perf_counter() - start
+        throughput[name] = args.items / duration
+        print(f"{name:>14} {duration:9.3f} {throughput[name]:10.0f}")
+    print(f"speedup: {throughput['from_pod_json'] / throughput['from_json']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
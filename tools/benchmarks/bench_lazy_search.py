@@ -0,0 +1,68 @@
+"""
+Benchmark scanning a large search result against a `LocalPod`.
+
+Compares reading two properties of every item of an eager search, which creates all items,
+with a read-only search of `ItemView`s, and a lazy search of which only `--accessed` items
+are used. The time of the search request alone is the lower bound for all methods.
+
+Usage: python tools/benchmarks/bench_lazy_search.py [--items 100000] [--accessed 100]
+"""
+import argparse
+import time
+
+from loguru import logger
+
+from pymemri.data.schema import EmailMessage
+from pymemri.pod.client import PodClient
+from pymemri.test_utils import LocalPod
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--accessed", type=int, default=100)
+    args = parser.parse_args()
+    logger.remove()
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        emails = [
+            EmailMessage(subject=f"subject {i}", content="content " * 20, service="bench")
+            for i in range(args.items)
+        ]
+        for i in range(0, args.items, 5000):
+            client.bulk_action(create_items=emails[i : i + 5000])
+        query = {"type": "EmailMessage", "service": "bench"}
+
+        def eager():
+            return [(e.subject, e.dateCreated) for e in client.search(query, include_edges=False)]
+
+        def read_only():
+            views = client.search(query, include_edges=False, read_only=True)
+            return [(e.subject, e.dateCreated) for e in views]
+
+        def lazy():
+            items = client.search(query, include_edges=False, lazy=True)
+            return [(e.subject, e.dateCreated) for e in items[: args.accessed]]
+
+        methods = {
+            "request": lambda: client.api.search({**query}),
+            "eager": eager,
+            "read_only": read_only,
+            "lazy": lazy,
+        }
+
+        durations = {}
+        print(f"{'method':>10} {'time (s)':>9} {'items/s':>10}")
+        for name, method in methods.items():
+            client.reset_local_db()
+            start = time.perf_counter()
+            method()
+            durations[name] = time.perf_counter() - start
+            print(f"{name:>10} {durations[name]:9.2f} {args.items / durations[name]:10.0f}")
+        for name in ("read_only", "lazy"):
+            print(f"{name} speedup: {durations['eager'] / durations[name]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark paginated search against a `LocalPod`, in pages per second.
+
+Compares the previous offset based pagination with keyset pagination, with and without
+prefetching the next page. `--process-time` simulates the time a caller spends per page.
+
+Usage: python tools/benchmarks/bench_paginate.py [--items 50000] [--latency 0.002]
+"""
+import argparse
+import time
+
+from pymemri.data.schema import Account
+from pymemri.pod.client import PodClient
+from pymemri.pod.pagination import keyset_pages, prefetch
+from pymemri.test_utils import LocalPod
+
+
+def offset_pages(search, query, limit):
+    # Pagination before keyset_pages: first page is requested twice, then pages by _offset
+    query = {**query, "_limit": limit}
+    if not len(search(query)):
+        return
+    offset = 0
+    while True:
+        response = search({**query, "_offset": offset})
+        if not len(response):
+            break
+        offset += limit
+        yield response
+
+
+def run(pages, process_time):
+    start = time.perf_counter()
+    n_pages, n_items = 0, 0
+    for page in pages:
+        n_pages += 1
+        n_items += len(page)
+        time.sleep(process_time)
+    return n_pages, n_items, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--process-time", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with LocalPod() as pod:
+        client = PodClient(url=pod.url)
+        accounts = [Account(identifier=str(i), service="bench") for i in range(args.items)]
+        for i in range(0, args.items, 1000):
+            client.bulk_action(create_items=accounts[i : i + 1000])
+        pod.latency = args.latency
+
+        query = {"type": "Account", "service": "bench"}
+        search = client.api.search
+        methods = {
+            "offset": lambda: offset_pages(search, query, args.limit),
+            "keyset": lambda: keyset_pages(search, query, args.limit),
+            "keyset+prefetch": lambda: prefetch(keyset_pages(search, query, args.limit)),
+        }
+
+        print(f"{'method':>16} {'pages':>6} {'items':>8} {'time (s)':>9} {'pages/s':>8}")
+        for name, pages in methods.items():
+            n_pages, n_items, duration = run(pages(), args.process_time)
+            print(f"{name:>16} {n_pages:>6} {n_items:>8} {duration:9.2f} {n_pages / duration:8.1f}")
+
+
+if __name__ == "__main__":
+    main()